@@ -0,0 +1,228 @@
+"""
+Batch audit runner.
+Audits a whole cohort of repositories (repo URL + PDF report pairs) with bounded concurrency,
+per-repo timeouts, a shared LLM request budget and a resumable JSONL progress ledger.
+
+Usage:
+    python -m src.batch cohort.csv --concurrency 8 --llm-concurrency 4 --timeout 900
+"""
+
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+DEFAULT_LEDGER_PATH = "audit/batch/ledger.jsonl"
+DEFAULT_REPORT_DIR = "audit/batch/reports"
+DEFAULT_PDF_PATH = "interim_report.pdf"
+TERMINAL_STATUSES = {"ok", "error", "timeout"}
+
+
+def load_jobs(path: str, default_pdf: str = DEFAULT_PDF_PATH) -> List[Dict[str, str]]:
+    """Read audit jobs from a CSV (columns repo_url[, pdf_path]) or a plain list of `url[,pdf]` lines."""
+    jobs = []
+    with open(path, "r", newline="") as f:
+        first_line = f.readline()
+        f.seek(0)
+        if "repo_url" in first_line:
+            rows = ((row.get("repo_url"), row.get("pdf_path")) for row in csv.DictReader(f))
+        else:
+            rows = []
+            for line in f:
+                fields = next(csv.reader([line]), [])
+                rows.append((fields[0] if fields else None, fields[1] if len(fields) > 1 else None))
+        for repo_url, pdf_path in rows:
+            repo_url = (repo_url or "").strip()
+            if not repo_url or repo_url.startswith("#"):
+                continue
+            jobs.append({"repo_url": repo_url, "pdf_path": (pdf_path or "").strip() or default_pdf})
+    return jobs
+
+
+def job_key(job: Dict[str, str]) -> str:
+    return f"{job['repo_url']}|{job['pdf_path']}"
+
+
+def report_path_for(job: Dict[str, str], report_dir: str) -> str:
+    """Stable, collision-free report file name derived from the repo URL."""
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", "/".join(job["repo_url"].rstrip("/").split("/")[-2:])).strip("_")
+    digest = hashlib.sha1(job_key(job).encode()).hexdigest()[:8]
+    return os.path.join(report_dir, f"{slug}_{digest}.md")
+
+
+class ProgressLedger:
+    """Append-only JSONL ledger of job state transitions; the last record per job wins."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def load(self) -> Dict[str, dict]:
+        latest = {}
+        if not os.path.exists(self.path):
+            return latest
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn write from a crash
+                latest[record["key"]] = record
+        return latest
+
+    def record(self, job: Dict[str, str], status: str, **fields) -> None:
+        entry = {"key": job_key(job), **job, "status": status, "at": time.time(), **fields}
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def pending_jobs(jobs: List[Dict[str, str]], ledger: ProgressLedger, retry_failed: bool = False) -> List[Dict[str, str]]:
+    """Jobs that still need to run. Jobs that were in flight when a batch crashed are always re-run."""
+    done = ledger.load()
+    pending = []
+    for job in jobs:
+        status = done.get(job_key(job), {}).get("status")
+        if status == "ok" or (status in TERMINAL_STATUSES and not retry_failed):
+            continue
+        pending.append(job)
+    return pending
+
+
+async def run_batch(
+    jobs: List[Dict[str, str]],
+    ledger: ProgressLedger,
+    concurrency: int = 4,
+    timeout: float = 900.0,
+    report_dir: str = DEFAULT_REPORT_DIR,
+    clone_mode: Optional[str] = None,
+    fresh: bool = False,
+    incremental: bool = False,
+    dimensions: Optional[List[str]] = None,
+) -> Dict[str, int]:
+    """Run the audit graph over jobs with at most `concurrency` audits in flight on one event loop."""
+    from src.graph import open_app, build_initial_state, load_rubric
+    from src.tools.repo_tools import cleanup_sandbox
+    from src.tools.pdf_convert import conversion_service
+
+    semaphore = asyncio.Semaphore(concurrency)
+    counts = {"ok": 0, "error": 0, "timeout": 0}
+
+    async def run_one(app, job: Dict[str, str]) -> None:
+        async with semaphore:
+            config = {"configurable": {"thread_id": f"batch_{uuid.uuid4().hex[:8]}"}}
+            report_path = report_path_for(job, report_dir)
+            state = build_initial_state(job["repo_url"], job["pdf_path"], clone_mode=clone_mode,
+                                        report_path=report_path, fresh=fresh, incremental=incremental,
+                                        dimensions=dimensions)
+            ledger.record(job, "started", thread_id=config["configurable"]["thread_id"])
+            started = time.monotonic()
+            try:
+                # Timing out cancels the in-flight graph run, including pending LLM requests
+                result = await asyncio.wait_for(app.ainvoke(state, config=config), timeout=timeout)
+                report = result.get("final_report")
+                ledger.record(
+                    job, "ok",
+                    score=report.overall_score if report else None,
+                    report_path=report_path,
+                    seconds=round(time.monotonic() - started, 1),
+                )
+                counts["ok"] += 1
+            except asyncio.TimeoutError:
+                print(f"⏱️ Audit timed out after {timeout:.0f}s: {job['repo_url']}")
+                ledger.record(job, "timeout", seconds=round(time.monotonic() - started, 1))
+                counts["timeout"] += 1
+            except Exception as e:
+                print(f"❌ Audit failed for {job['repo_url']}: {e}")
+                ledger.record(job, "error", error=str(e)[:500], seconds=round(time.monotonic() - started, 1))
+                counts["error"] += 1
+            finally:
+                try:
+                    snapshot = await app.aget_state(config)
+                    await asyncio.to_thread(cleanup_sandbox, (snapshot.values or {}).get("repo_path"))
+                except Exception:
+                    pass
+
+    # Convert the cohort's report PDFs in the background while the first repositories are cloned;
+    # DocAnalyst then picks up the finished (or in-flight) conversion instead of starting its own.
+    # Pointless when no audited dimension reads the report (DocAnalyst is skipped then).
+    rubric_dimensions = load_rubric({"dimension_filter": dimensions})["rubric_dimensions"]
+    audits_report = not rubric_dimensions or any(dim.get("target_artifact") == "pdf_report" for dim in rubric_dimensions)
+    prefetch = None
+    if audits_report:
+        prefetch = asyncio.create_task(asyncio.to_thread(
+            conversion_service().prefetch, [job["pdf_path"] for job in jobs if job.get("pdf_path")]))
+
+    try:
+        async with open_app() as app:
+            await asyncio.gather(*(run_one(app, job) for job in jobs))
+    finally:
+        if prefetch is not None:
+            await asyncio.gather(prefetch, return_exceptions=True)
+        # Queued conversions are dropped; otherwise the spawned workers hold up interpreter exit
+        await asyncio.to_thread(conversion_service().shutdown)
+    return counts
+
+
+def main():
+    import argparse
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    from src.llm.rate_limit import configure_llm_budget, LLM_MAX_CONCURRENCY
+    from src.tools.repo_tools import CLONE_MODES, DEFAULT_CLONE_MODE
+
+    parser = argparse.ArgumentParser(description="Audit a cohort of repositories in one batch.")
+    parser.add_argument("jobs", help="CSV with repo_url[,pdf_path] columns, or one 'url[,pdf]' per line")
+    parser.add_argument("--concurrency", type=int, default=4, help="Audits in flight at once (default: %(default)s)")
+    parser.add_argument("--llm-concurrency", type=int, default=LLM_MAX_CONCURRENCY,
+                        help="LLM requests in flight across all audits (default: %(default)s)")
+    parser.add_argument("--timeout", type=float, default=900.0, help="Per-repo timeout in seconds (default: %(default)s)")
+    parser.add_argument("--ledger", default=DEFAULT_LEDGER_PATH, help="Progress ledger path (default: %(default)s)")
+    parser.add_argument("--report-dir", default=DEFAULT_REPORT_DIR, help="Directory for per-repo reports (default: %(default)s)")
+    parser.add_argument("--default-pdf", default=DEFAULT_PDF_PATH, help="PDF used when a row has none (default: %(default)s)")
+    parser.add_argument("--clone-mode", choices=CLONE_MODES, default=DEFAULT_CLONE_MODE)
+    parser.add_argument("--fresh", action="store_true", help="Ignore cached LLM responses")
+    parser.add_argument("--incremental", action="store_true", help="Re-judge only dimensions whose evidence changed")
+    parser.add_argument("--dimensions", type=lambda v: [d.strip() for d in v.split(",") if d.strip()],
+                        help="Comma-separated rubric dimension ids to audit (default: whole rubric)")
+    parser.add_argument("--retry-failed", action="store_true", help="Re-run jobs whose last status was error/timeout")
+    parser.add_argument("--index-corpus", action="store_true",
+                        help="Afterwards, append newly ingested report PDFs to the cross-cohort corpus index")
+    args = parser.parse_args()
+
+    configure_llm_budget(args.llm_concurrency)
+    ledger = ProgressLedger(args.ledger)
+    jobs = load_jobs(args.jobs, default_pdf=args.default_pdf)
+    todo = pending_jobs(jobs, ledger, retry_failed=args.retry_failed)
+    print(f"Batch: {len(jobs)} jobs, {len(jobs) - len(todo)} already done, {len(todo)} to run "
+          f"(concurrency {args.concurrency}, LLM budget {args.llm_concurrency}, timeout {args.timeout:.0f}s)")
+
+    counts = asyncio.run(run_batch(
+        todo, ledger,
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        report_dir=args.report_dir,
+        clone_mode=args.clone_mode,
+        fresh=args.fresh,
+        incremental=args.incremental,
+        dimensions=args.dimensions,
+    ))
+    print(f"\n--- Batch Complete --- ok: {counts['ok']} | error: {counts['error']} | timeout: {counts['timeout']}")
+
+    if args.index_corpus:
+        from src.tools.doc_tools import build_report_corpus
+        build_report_corpus()
+
+
+if __name__ == "__main__":
+    main()
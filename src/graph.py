@@ -1,13 +1,12 @@
 import json
 import os
+from typing import Optional
 from dotenv import load_dotenv
 load_dotenv()
 
-from langgraph.graph import StateGraph, START, END
 from src.state import AgentState
-from src.nodes.detectives import repo_cloner, repo_investigator, doc_analyst, vision_inspector
-from src.nodes.judges import prosecutor, defense, tech_lead
-from src.nodes.justice import chief_justice_node
+from src.tools.citations import extract_citations
+from src.tools.manifest import manifest_for
 
 def load_rubric(state: AgentState) -> dict:
     """Node: Loads the rubric from rubric.json."""
@@ -18,6 +17,13 @@ def load_rubric(state: AgentState) -> dict:
             rubric_data = json.load(f)
         # The guide expects a list of dimensions
         dimensions = rubric_data.get("dimensions", [])
+        # Partial-rubric run: only the requested dimensions (detectives skip analyzers nobody needs)
+        dimension_filter = state.get("dimension_filter")
+        if dimension_filter:
+            unknown = set(dimension_filter) - {dim.get("id") for dim in dimensions}
+            if unknown:
+                print(f"Warning: unknown rubric dimensions ignored: {', '.join(sorted(unknown))}")
+            dimensions = [dim for dim in dimensions if dim.get("id") in dimension_filter]
         return {"rubric_dimensions": dimensions}
     except Exception as e:
         print(f"Error loading rubric: {e}")
@@ -30,41 +36,37 @@ def evidence_aggregator(state: AgentState) -> dict:
     single unified state while filtering citations against the codebase manifest.
     """
     print("--- Aggregator: EvidenceAggregator ---")
-    import re
     
     verified = set()
     hallucinated = set()
-    
-    # More robust regex for paths with specific extensions to avoid catching version numbers
-    path_pattern = re.compile(r'\b[\w\-\./]+\.(?:py|md|json|pdf|png|toml|yaml|txt|js|ts|yml|env\.example|sh|lock)\b')
-    repo_files = set(state.get("repo_manifest", []))
+    manifest = manifest_for(state.get("repo_manifest", []), state.get("repo_commit"))
     
     # Always allow some stubs for the interim
-    repo_files.update(['standard.pdf', 'architecture.png'])
+    allowed_stubs = {'standard.pdf', 'architecture.png'}
+    ambiguous = {}
     
-    for ev_list in state.get("evidences", {}).values():
-        for ev in ev_list:
-            # Guard against None content (Evidence.content is Optional[str])
-            content_text = ev.content or ""
-            potential_paths = path_pattern.findall(ev.location) + path_pattern.findall(content_text)
-            for p in potential_paths:
-                clean_p = p.lstrip('./').lstrip('/')
-                    
-                # Exact match or suffix match (e.g. src/graph.py matches graph.py if it's unique)
-                is_verified = False
-                for rf in repo_files:
-                    if clean_p == rf or clean_p.endswith('/' + rf) or rf.endswith('/' + clean_p):
-                        verified.add(rf)
-                        is_verified = True
-                        break
-                
-                if not is_verified:
-                    # Only add if it's not a known allowed stub and not a false positive
-                    hallucinated.add(clean_p)
+    # One cached scan per evidence item; each distinct path is then resolved once
+    citations = extract_citations(state.get("evidences", {}))
+    for clean_p, evidence_ids in citations.items():
+        if clean_p in allowed_stubs:
+            verified.add(clean_p)
+            continue
+            
+        # Suffix-index lookup: exact path, unique suffix (graph.py -> src/graph.py) or absolute path
+        matches = manifest.resolve(clean_p)
+        if len(matches) == 1:
+            verified.add(matches[0])
+        elif matches:
+            # e.g. graph.py when both src/graph.py and tests/graph.py exist
+            ambiguous[clean_p] = matches
+        else:
+            hallucinated.add(clean_p)
+            print(f"  [Hallucination] {clean_p} cited by evidence {', '.join(map(str, evidence_ids))}")
                         
     return {
-        "verified_paths": list(verified),
-        "hallucinated_paths": list(hallucinated)
+        "verified_paths": sorted(verified),
+        "hallucinated_paths": sorted(hallucinated),
+        "ambiguous_paths": [f"{p} -> {' | '.join(m[:5])}{' | ...' if len(m) > 5 else ''}" for p, m in sorted(ambiguous.items())]
     }
 
 def judges_entry(state: AgentState) -> dict:
@@ -72,8 +74,17 @@ def judges_entry(state: AgentState) -> dict:
     Node: Judicial Dialectics Hub.
     Starts the [Dialectical Synthesis] phase by triggering three parallel persona nodes 
     to evaluate the synchronized evidence.
+    In incremental mode, reuses the previous audit's opinions for every dimension whose
+    evidence is unchanged and narrows the judges to the rest.
     """
-    return {}
+    if not state.get("incremental"):
+        return {}
+    from src.incremental import plan_incremental
+    rubric_dimensions = state.get("rubric_dimensions", [])
+    to_judge, reused = plan_incremental(state["repo_url"], state.get("evidences", {}), rubric_dimensions)
+    print(f"--- Incremental: re-judging {len(to_judge)}/{len(rubric_dimensions)} dimensions, "
+          f"reusing {len(reused)} prior opinions ---")
+    return {"dimensions_to_judge": to_judge, "opinions": reused}
 
 def evidence_router(state: AgentState) -> str:
     """Conditional Edge: Route to Judgement or skip if no evidence found."""
@@ -95,8 +106,8 @@ def report_writer(state: AgentState) -> dict:
     """
     print("--- Reporter: MarkdownWriter ---")
     report = state.get("final_report")
-    report_path = "audit/final_audit_report.md"
-    os.makedirs("audit", exist_ok=True)
+    report_path = state.get("report_path") or "audit/final_audit_report.md"
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
     
     if not report:
         print("No report to write. Writing minimal report.")
@@ -145,6 +156,8 @@ def report_writer(state: AgentState) -> dict:
     md_content += f"- **Hallucinated Files (Filtered):** {len(report.hallucinated_paths)}\n"
     if report.hallucinated_paths:
         md_content += f"- **Flagged Hallucinations:** {', '.join(report.hallucinated_paths)}\n"
+    if report.ambiguous_paths:
+        md_content += f"- **Ambiguous Citations:** {'; '.join(report.ambiguous_paths)}\n"
 
     try:
         with open(report_path, "w") as f:
@@ -152,118 +165,181 @@ def report_writer(state: AgentState) -> dict:
         print(f"✅ Final Audit Report written to: {report_path}")
     except Exception as e:
         print(f"❌ Failed to write report: {e}")
+
+    # Baseline for the next incremental re-audit of this repository (whole-rubric runs only)
+    if not state.get("dimension_filter"):
+        try:
+            from src.incremental import save_snapshot
+            save_snapshot(state["repo_url"], state.get("evidences", {}), state.get("rubric_dimensions", []),
+                          state.get("opinions", []))
+        except Exception as e:
+            print(f"Failed to save audit snapshot: {e}")
         
     return state
 
 # --- Graph Definition ---
-from langgraph.checkpoint.sqlite import SqliteSaver
-import sqlite3
-
-# Use a persistent SQLite DB for checkpointer
-# In a real app, this would be a file path like 'checkpoints.db'
-conn = sqlite3.connect("checkpoints.db", check_same_thread=False)
-memory = SqliteSaver(conn)
-
-workflow = StateGraph(AgentState)
-
-# Add nodes
-workflow.add_node("load_rubric", load_rubric)
-workflow.add_node("repo_cloner", repo_cloner)
-workflow.add_node("repo_investigator", repo_investigator)
-workflow.add_node("doc_analyst", doc_analyst)
-workflow.add_node("vision_inspector", vision_inspector)
-workflow.add_node("evidence_aggregator", evidence_aggregator)
-workflow.add_node("judges_entry", judges_entry)
-workflow.add_node("prosecutor", prosecutor)
-workflow.add_node("defense", defense)
-workflow.add_node("tech_lead", tech_lead)
-workflow.add_node("chief_justice", chief_justice_node)
-workflow.add_node("report_writer", report_writer)
-
-# Define edges
-# Sequential Setup
-workflow.add_edge(START, "load_rubric")
-workflow.add_edge("load_rubric", "repo_cloner")
-
-# Fan-out to Detectives
-workflow.add_edge("repo_cloner", "repo_investigator")
-workflow.add_edge("repo_cloner", "doc_analyst")
-workflow.add_edge("repo_cloner", "vision_inspector")
-
-# Fan-in to Aggregator
-workflow.add_edge("repo_investigator", "evidence_aggregator")
-workflow.add_edge("doc_analyst", "evidence_aggregator")
-workflow.add_edge("vision_inspector", "evidence_aggregator")
-
-# Conditional Routing after Aggregator (only one path: judges OR report)
-workflow.add_conditional_edges(
-    "evidence_aggregator",
-    evidence_router,
-    {
-        "continue_to_judges": "judges_entry",
-        "skip_to_report": "report_writer"
-    }
-)
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+# Persistent SQLite DB for the checkpointer
+CHECKPOINT_DB = "checkpoints.db"
+
+@lru_cache(maxsize=None)
+def build_workflow():
+    """The audit StateGraph, built once on first use.
+    LangGraph and the node modules (with their LangChain dependencies) are imported here rather
+    than at module load, so `--help` and tooling that never runs an audit start fast."""
+    from langgraph.graph import StateGraph, START, END
+    from src.nodes.detectives import repo_cloner, repo_investigator, doc_analyst, vision_inspector
+    from src.nodes.judges import prosecutor, defense, tech_lead
+    from src.nodes.justice import chief_justice_node
+
+    workflow = StateGraph(AgentState)
+
+    # Add nodes
+    workflow.add_node("load_rubric", load_rubric)
+    workflow.add_node("repo_cloner", repo_cloner)
+    workflow.add_node("repo_investigator", repo_investigator)
+    workflow.add_node("doc_analyst", doc_analyst)
+    workflow.add_node("vision_inspector", vision_inspector)
+    workflow.add_node("evidence_aggregator", evidence_aggregator)
+    workflow.add_node("judges_entry", judges_entry)
+    workflow.add_node("prosecutor", prosecutor)
+    workflow.add_node("defense", defense)
+    workflow.add_node("tech_lead", tech_lead)
+    workflow.add_node("chief_justice", chief_justice_node)
+    workflow.add_node("report_writer", report_writer)
+
+    # Define edges
+    # Sequential Setup
+    workflow.add_edge(START, "load_rubric")
+    workflow.add_edge("load_rubric", "repo_cloner")
+
+    # Fan-out to Detectives
+    workflow.add_edge("repo_cloner", "repo_investigator")
+    workflow.add_edge("repo_cloner", "doc_analyst")
+    workflow.add_edge("repo_cloner", "vision_inspector")
 
-# Fan-out from judges entry to all three judges (no unconditional edges from aggregator)
-workflow.add_edge("judges_entry", "prosecutor")
-workflow.add_edge("judges_entry", "defense")
-workflow.add_edge("judges_entry", "tech_lead")
+    # Fan-in to Aggregator
+    workflow.add_edge("repo_investigator", "evidence_aggregator")
+    workflow.add_edge("doc_analyst", "evidence_aggregator")
+    workflow.add_edge("vision_inspector", "evidence_aggregator")
 
-# Fan-in to Chief Justice
-workflow.add_edge("prosecutor", "chief_justice")
-workflow.add_edge("defense", "chief_justice")
-workflow.add_edge("tech_lead", "chief_justice")
+    # Conditional Routing after Aggregator (only one path: judges OR report)
+    workflow.add_conditional_edges(
+        "evidence_aggregator",
+        evidence_router,
+        {
+            "continue_to_judges": "judges_entry",
+            "skip_to_report": "report_writer"
+        }
+    )
+
+    # Fan-out from judges entry to all three judges (no unconditional edges from aggregator)
+    workflow.add_edge("judges_entry", "prosecutor")
+    workflow.add_edge("judges_entry", "defense")
+    workflow.add_edge("judges_entry", "tech_lead")
+
+    # Fan-in to Chief Justice
+    workflow.add_edge("prosecutor", "chief_justice")
+    workflow.add_edge("defense", "chief_justice")
+    workflow.add_edge("tech_lead", "chief_justice")
+
+    # Finalize
+    workflow.add_edge("chief_justice", "report_writer")
+    workflow.add_edge("report_writer", END)
+
+    return workflow
+
+def __getattr__(name: str):
+    # `workflow` and the checkpointer-free `app` (static inspection, e.g. generate_diagram.py) are built on access.
+    # Judge, vision and justice nodes are async, so audits must run through open_app() + ainvoke.
+    if name == "workflow":
+        return build_workflow()
+    if name == "app":
+        return build_workflow().compile()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Finalize
-workflow.add_edge("chief_justice", "report_writer")
-workflow.add_edge("report_writer", END)
+@asynccontextmanager
+async def open_app(db_path: str = CHECKPOINT_DB):
+    """Compile the graph with an async SQLite checkpointer bound to the running event loop."""
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    async with AsyncSqliteSaver.from_conn_string(db_path) as memory:
+        yield build_workflow().compile(checkpointer=memory)
 
-# Compile with checkpointer
-app = workflow.compile(checkpointer=memory)
+DEFAULT_REPORT_PATH = "audit/final_audit_report.md"
+
+def build_initial_state(repo_url: str, pdf_path: str, clone_mode: Optional[str] = None,
+                        report_path: Optional[str] = None, fresh: bool = False,
+                        incremental: bool = False, dimensions: Optional[list] = None) -> dict:
+    """Initial AgentState for a single audit run."""
+    return {
+        "repo_url": repo_url,
+        "pdf_path": pdf_path, # Report to cross-reference
+        "clone_mode": clone_mode,
+        "report_path": report_path or DEFAULT_REPORT_PATH,
+        "fresh": fresh,
+        "incremental": incremental,
+        "dimensions_to_judge": None,
+        "dimension_filter": dimensions or None,
+        "rubric_dimensions": [],
+        "evidences": {},
+        "opinions": [],
+        "repo_path": None,
+        "verified_paths": [],
+        "hallucinated_paths": [],
+        "ambiguous_paths": [],
+        "repo_manifest": [],
+        "repo_commit": None,
+        "final_report": None
+    }
 
 if __name__ == "__main__":
     import asyncio
     import uuid
-    from src.tools.doc_tools import clear_vector_store
-    from src.tools.repo_tools import is_safe_url
+    from src.tools.repo_tools import is_safe_url, CLONE_MODES, DEFAULT_CLONE_MODE
     
     async def run_audit():
-        import sys
+        import argparse
+        parser = argparse.ArgumentParser(description="Run the Automaton Auditor against a repository.")
+        parser.add_argument("repo_url", nargs="?", default="https://github.com/Natnael-Alemseged/Github-Evaluator")
+        parser.add_argument("pdf_path", nargs="?", default="interim_report.pdf")
+        parser.add_argument("--clone-mode", choices=CLONE_MODES, default=DEFAULT_CLONE_MODE,
+                            help="Git clone strategy for the sandbox (default: %(default)s)")
+        parser.add_argument("--fresh", action="store_true", help="Ignore cached LLM responses and re-query every judge")
+        parser.add_argument("--incremental", action="store_true",
+                            help="Re-judge only rubric dimensions whose evidence changed since the last audit of this repo")
+        parser.add_argument("--dimensions", type=lambda v: [d.strip() for d in v.split(",") if d.strip()],
+                            help="Comma-separated rubric dimension ids to audit (default: whole rubric)")
+        args = parser.parse_args()
+
         print("Starting Automaton Auditor...")
-        clear_vector_store()
         
-        default_repo = "https://github.com/Natnael-Alemseged/Github-Evaluator"
-        repo_url = sys.argv[1] if len(sys.argv) > 1 else default_repo
-        pdf_input = sys.argv[2] if len(sys.argv) > 2 else "interim_report.pdf"
+        repo_url = args.repo_url
+        pdf_input = args.pdf_path
         
         print(f"✅ Target Repo: {repo_url}")
         print(f"✅ Target PDF: {pdf_input}")
+        print(f"✅ Clone Mode: {args.clone_mode}")
         
         run_id = f"audit_{uuid.uuid4().hex[:8]}"
         config = {"configurable": {"thread_id": run_id}}
         
-        initial_state = {
-            "repo_url": repo_url,
-            "pdf_path": pdf_input, # Report to cross-reference
-            "rubric_dimensions": [],
-            "evidences": {},
-            "opinions": [],
-            "repo_path": None,
-            "verified_paths": [],
-            "hallucinated_paths": [],
-            "repo_manifest": [],
-            "final_report": None
-        }
+        initial_state = build_initial_state(repo_url, pdf_input, clone_mode=args.clone_mode,
+                                            fresh=args.fresh, incremental=args.incremental,
+                                            dimensions=args.dimensions)
         
         try:
-            # Synchronous invoke within async wrapper
-            result = app.invoke(initial_state, config=config)
+            async with open_app() as audit_app:
+                result = await audit_app.ainvoke(initial_state, config=config)
             print("\n--- Audit Complete ---")
             if result.get("final_report"):
                 print(f"Overall Score: {result['final_report'].overall_score:.2f}/5.0")
         except Exception as e:
             print(f"\n❌ Execution failed: {e}")
             print("Note: The repository might be private or inaccessible. Ensure the URL is public and correct.")
+        finally:
+            from src.tools.pdf_convert import conversion_service
+            conversion_service().shutdown()
     
     asyncio.run(run_audit())
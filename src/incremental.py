@@ -0,0 +1,136 @@
+"""
+Incremental re-audit support.
+After every audit, a snapshot of per-dimension evidence fingerprints and the judges' opinions is
+stored per repository. In incremental mode the next audit re-judges only the rubric dimensions
+whose supporting evidence (or rubric definition) changed and reuses the prior opinions for the rest.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from src.state import Evidence, JudicialOpinion
+from src.tools.mirror_cache import normalize_repo_url
+
+CACHE_ROOT = os.environ.get("AUDITOR_CACHE_DIR", ".auditor_cache")
+AUDIT_HISTORY_DIR = os.path.join(CACHE_ROOT, "audits")
+
+
+def flatten_evidence(evidences: Dict[str, List[Evidence]]) -> List[Evidence]:
+    """Evidence in the same order the judges number it (IDs are list indices)."""
+    out = []
+    for ev_list in (evidences or {}).values():
+        out.extend(ev_list)
+    return out
+
+
+def evidence_hash(ev: Evidence) -> str:
+    """Fingerprint of what an Evidence was derived from.
+
+    LLM-generated content (e.g. a vision description) differs between runs on identical input, so
+    evidence that records `metrics["input_sha256"]` is fingerprinted by that instead of its content.
+    """
+    content = ev.metrics.get("input_sha256", ev.content)
+    payload = json.dumps([ev.detective_name, ev.goal, ev.found, content, ev.location], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def supports(ev: Evidence, dimension_id: str) -> bool:
+    """Evidence without declared dimensions (e.g. a failed detective) counts for every dimension."""
+    return not ev.dimensions or dimension_id in ev.dimensions
+
+
+def dimension_fingerprints(evidences: Dict[str, List[Evidence]], rubric_dimensions: List[Dict]) -> Dict[str, str]:
+    """One hash per rubric dimension over its definition and all evidence supporting it."""
+    all_evidence = flatten_evidence(evidences)
+    hashes = [evidence_hash(ev) for ev in all_evidence]
+    fingerprints = {}
+    for dim in rubric_dimensions:
+        dim_id = dim.get("id", "")
+        relevant = sorted(h for ev, h in zip(all_evidence, hashes) if supports(ev, dim_id))
+        payload = json.dumps([dim, relevant], sort_keys=True)
+        fingerprints[dim_id] = hashlib.sha256(payload.encode()).hexdigest()
+    return fingerprints
+
+
+def _snapshot_path(repo_url: str) -> str:
+    key = hashlib.sha256(normalize_repo_url(repo_url).encode()).hexdigest()[:32]
+    return os.path.join(AUDIT_HISTORY_DIR, f"{key}.json")
+
+
+def load_snapshot(repo_url: str) -> Optional[dict]:
+    try:
+        with open(_snapshot_path(repo_url), "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def save_snapshot(repo_url: str, evidences: Dict[str, List[Evidence]], rubric_dimensions: List[Dict],
+                  opinions: List[JudicialOpinion]) -> None:
+    """Persist this audit as the baseline for the next incremental run.
+
+    Dimensions that ended with automated fallback opinions are left out so they are always re-judged.
+    """
+    fingerprints = dimension_fingerprints(evidences, rubric_dimensions)
+    failed = {op.criterion_id for op in opinions if op.is_automated_fallback}
+    snapshot = {
+        "repo_url": repo_url,
+        "fingerprints": {k: v for k, v in fingerprints.items() if k not in failed},
+        "evidence_hashes": [evidence_hash(ev) for ev in flatten_evidence(evidences)],
+        "opinions": [op.model_dump() for op in opinions if op.criterion_id not in failed],
+    }
+    path = _snapshot_path(repo_url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, path)
+
+
+def _remap_citations(cited: List[str], old_hashes: List[str], new_index: Dict[str, int]) -> List[str]:
+    """Translate evidence IDs from the previous run's numbering to the current one."""
+    remapped = []
+    for c in cited or []:
+        try:
+            h = old_hashes[int(c)]
+        except (ValueError, TypeError, IndexError):
+            continue
+        if h in new_index:
+            remapped.append(str(new_index[h]))
+    return remapped
+
+
+def plan_incremental(repo_url: str, evidences: Dict[str, List[Evidence]],
+                     rubric_dimensions: List[Dict]) -> Tuple[List[str], List[JudicialOpinion]]:
+    """Split the rubric into dimensions that must be re-judged and prior opinions that can be reused."""
+    all_ids = [dim.get("id", "") for dim in rubric_dimensions]
+    snapshot = load_snapshot(repo_url)
+    if not snapshot:
+        return all_ids, []
+
+    current = dimension_fingerprints(evidences, rubric_dimensions)
+    previous = snapshot.get("fingerprints", {})
+    unchanged = {dim_id for dim_id in all_ids if previous.get(dim_id) == current.get(dim_id)}
+
+    old_hashes = snapshot.get("evidence_hashes", [])
+    new_index = {}
+    for i, ev in enumerate(flatten_evidence(evidences)):
+        new_index.setdefault(evidence_hash(ev), i)
+
+    reused = []
+    for data in snapshot.get("opinions", []):
+        if data.get("criterion_id") not in unchanged:
+            continue
+        op = JudicialOpinion.model_validate(data)
+        op.cited_evidence = _remap_citations(op.cited_evidence, old_hashes, new_index)
+        reused.append(op)
+
+    # A dimension is only reusable if every judge's opinion survived in the snapshot
+    judges_per_dim: Dict[str, set] = {}
+    for op in reused:
+        judges_per_dim.setdefault(op.criterion_id, set()).add(op.judge)
+    complete = {d for d, judges in judges_per_dim.items() if judges >= {"Prosecutor", "Defense", "TechLead"}}
+    reused = [op for op in reused if op.criterion_id in complete]
+    return [dim_id for dim_id in all_ids if dim_id not in complete], reused
@@ -0,0 +1,124 @@
+"""
+Shared circuit breaker for LLM provider fallback chains.
+Every judge, the VisionInspector and the Chief Justice report outcomes here, so a provider
+that just failed for one caller is skipped immediately by all the others until its cooldown ends.
+"""
+
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from src.llm.rate_limit import is_connection_error, is_rate_limit_error, provider_name
+
+# Consecutive generic failures before a circuit opens
+FAILURE_THRESHOLD = int(os.environ.get("AUDITOR_BREAKER_FAILURES", "2"))
+# Cooldowns (seconds) before a half-open probe is allowed
+RATE_LIMIT_COOLDOWN = float(os.environ.get("AUDITOR_BREAKER_RATE_LIMIT_COOLDOWN", "60"))
+CONNECTION_COOLDOWN = float(os.environ.get("AUDITOR_BREAKER_CONNECTION_COOLDOWN", "300"))
+ERROR_COOLDOWN = float(os.environ.get("AUDITOR_BREAKER_ERROR_COOLDOWN", "30"))
+# Weight of the newest observation in the success-rate / latency moving averages
+EWMA_ALPHA = 0.3
+# Latency (seconds) at which the latency component of the health score reaches 0.5
+LATENCY_HALF_SCORE = 20.0
+
+
+class ProviderHealth:
+    """Rolling health statistics and circuit state for one provider."""
+
+    def __init__(self):
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.probe_in_flight = False
+        self.success_rate = 1.0
+        self.latency = 0.0
+        self.last_error: Optional[str] = None
+
+    @property
+    def score(self) -> float:
+        """Health in [0, 1]: recent success rate discounted by recent latency."""
+        return self.success_rate * LATENCY_HALF_SCORE / (LATENCY_HALF_SCORE + self.latency)
+
+
+class CircuitBreaker:
+    """Closed -> open (after failures) -> half-open (one probe after cooldown) -> closed."""
+
+    def __init__(self):
+        self._health: Dict[str, ProviderHealth] = {}
+
+    def health(self, provider: str) -> ProviderHealth:
+        return self._health.setdefault(provider, ProviderHealth())
+
+    def is_open(self, provider: str) -> bool:
+        h = self.health(provider)
+        return h.open_until != 0.0 and time.monotonic() < h.open_until
+
+    def allow(self, provider: str) -> bool:
+        """Whether a request to provider may be sent now. Claims the half-open probe if due."""
+        h = self.health(provider)
+        if h.open_until == 0.0:
+            return True
+        if time.monotonic() < h.open_until or h.probe_in_flight:
+            return False
+        h.probe_in_flight = True
+        return True
+
+    def release(self, provider: str) -> None:
+        """Give back a half-open probe claimed by allow() if its request never resolved through call().
+
+        Callers run this in a `finally` after every allowed attempt; once call() has recorded an
+        outcome the circuit is closed or re-opened with a new cooldown, and this does nothing.
+        """
+        h = self.health(provider)
+        if h.open_until != 0.0 and time.monotonic() >= h.open_until:
+            h.probe_in_flight = False
+
+    def record_success(self, provider: str, latency: float) -> None:
+        h = self.health(provider)
+        h.consecutive_failures = 0
+        h.open_until = 0.0
+        h.probe_in_flight = False
+        h.success_rate = (1 - EWMA_ALPHA) * h.success_rate + EWMA_ALPHA
+        h.latency = (1 - EWMA_ALPHA) * h.latency + EWMA_ALPHA * latency
+
+    def record_failure(self, provider: str, error: Exception, latency: float = 0.0) -> None:
+        h = self.health(provider)
+        h.consecutive_failures += 1
+        h.probe_in_flight = False
+        h.success_rate = (1 - EWMA_ALPHA) * h.success_rate
+        h.latency = (1 - EWMA_ALPHA) * h.latency + EWMA_ALPHA * latency
+        h.last_error = str(error)[:200]
+
+        if is_rate_limit_error(error):
+            cooldown = RATE_LIMIT_COOLDOWN
+        elif is_connection_error(error):
+            cooldown = CONNECTION_COOLDOWN
+        elif h.consecutive_failures >= FAILURE_THRESHOLD:
+            cooldown = ERROR_COOLDOWN
+        else:
+            return
+        h.open_until = time.monotonic() + cooldown
+        print(f"  [Breaker] Circuit open for {provider} ({cooldown:.0f}s): {h.last_error[:80]}")
+
+    async def call(self, provider: str, make_request: Callable[[], Awaitable]):
+        """Await make_request() and record its outcome and latency against provider."""
+        started = time.monotonic()
+        try:
+            result = await make_request()
+        except asyncio.CancelledError:
+            # Audit cancelled (e.g. batch timeout): not the provider's fault, free the probe slot
+            self.health(provider).probe_in_flight = False
+            raise
+        except Exception as e:
+            self.record_failure(provider, e, time.monotonic() - started)
+            raise
+        self.record_success(provider, time.monotonic() - started)
+        return result
+
+    def available(self, models: List[object]) -> List[object]:
+        """Models whose circuit is not open, healthy providers first (configured order kept within a tier)."""
+        candidates = [m for m in models if not self.is_open(provider_name(m))]
+        return sorted(candidates, key=lambda m: self.health(provider_name(m)).score < 0.5)
+
+
+breaker = CircuitBreaker()
@@ -0,0 +1,186 @@
+"""
+Process-wide LLM client registry.
+Each provider's chat model is built once per event loop and reused by the detectives, the judges
+and the Chief Justice. OpenAI-compatible providers and Groq share one keep-alive httpx pool for
+sync calls and one per event loop for async calls (an httpx.AsyncClient is bound to the loop it
+first ran on), so repeated requests within and across audits skip the TCP/TLS handshake.
+SDK-internal retries are disabled: retrying and provider skipping are decided by the
+callers' tenacity policies and the shared circuit breaker.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from typing import Dict, List, Optional
+
+# Fallback chain (comma-separated provider ids) per caller, first = preferred. Judges start on
+# different providers to spread load; the Chief Justice prefers SambaNova's 70B model.
+ROLE_CHAINS = {
+    "Prosecutor": "groq,gemini,sambanova,openrouter,ollama",
+    "Defense": "sambanova,groq,gemini,openrouter,ollama",
+    "TechLead": "gemini,sambanova,groq,openrouter,ollama",
+    "ChiefJustice": "sambanova,openrouter,ollama",
+    "Detective": "gemini,groq,openrouter,ollama",
+}
+# Overrides every role's chain when set (AUDITOR_LLM_CHAIN_<ROLE> overrides a single role)
+LLM_CHAIN = os.environ.get("AUDITOR_LLM_CHAIN")
+
+# One model per provider; override with AUDITOR_MODEL_<PROVIDER>
+PROVIDER_MODELS = {
+    "gemini": "gemini-2.0-flash",
+    "groq": "llama-3.3-70b-versatile",
+    "sambanova": "Meta-Llama-3.3-70B-Instruct",
+    "openrouter": "openai/gpt-4o-mini",
+    "ollama": "llama3.1",
+}
+
+REQUEST_TIMEOUT = float(os.environ.get("AUDITOR_LLM_TIMEOUT", "60"))
+HTTP_MAX_CONNECTIONS = int(os.environ.get("AUDITOR_HTTP_MAX_CONNECTIONS", "50"))
+
+# Chat models built outside any event loop, and per running loop (dropped with the loop)
+_clients: Dict[str, object] = {}
+_loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, object]]" = weakref.WeakKeyDictionary()
+_http_client = None
+_async_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, object]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def _model_for(provider: str) -> str:
+    return os.environ.get(f"AUDITOR_MODEL_{provider.upper()}", PROVIDER_MODELS[provider])
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _http_limits():
+    import httpx
+    limits = httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_CONNECTIONS)
+    return limits, httpx.Timeout(REQUEST_TIMEOUT, connect=10.0)
+
+
+def _shared_http_clients():
+    """Keep-alive httpx clients shared by every OpenAI-compatible provider: one sync pool per
+    process, one async pool per event loop. Caller holds _lock."""
+    global _http_client
+    import httpx
+    limits, timeout = _http_limits()
+    if _http_client is None:
+        _http_client = httpx.Client(limits=limits, timeout=timeout)
+    loop = _running_loop()
+    if loop is None:
+        # Built outside a loop: the SDK creates its own async client lazily where it is first used
+        return _http_client, None
+    if loop not in _async_http_clients:
+        _async_http_clients[loop] = httpx.AsyncClient(limits=limits, timeout=timeout)
+    return _http_client, _async_http_clients[loop]
+
+
+def _openai_compatible(provider: str, api_key: str, base_url: str, **kwargs):
+    from langchain_openai import ChatOpenAI
+    http_client, http_async_client = _shared_http_clients()
+    return ChatOpenAI(
+        model=_model_for(provider),
+        openai_api_key=api_key,
+        openai_api_base=base_url,
+        temperature=0,
+        request_timeout=REQUEST_TIMEOUT,
+        max_retries=0,
+        http_client=http_client,
+        http_async_client=http_async_client,
+        **kwargs
+    )
+
+
+def _build(provider: str):
+    """Construct the chat model for a provider, or None if it is not configured."""
+    if provider == "gemini":
+        if not os.environ.get("GOOGLE_API_KEY"):
+            return None
+        try:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+        except ImportError:
+            print("Warning: langchain-google-genai not installed.")
+            return None
+        return ChatGoogleGenerativeAI(model=_model_for(provider), temperature=0, max_retries=0)
+
+    if provider == "groq":
+        if not os.environ.get("GROQ_API_KEY"):
+            return None
+        from langchain_groq import ChatGroq
+        http_client, http_async_client = _shared_http_clients()
+        return ChatGroq(
+            model=_model_for(provider),
+            temperature=0,
+            request_timeout=REQUEST_TIMEOUT,
+            max_retries=0,
+            http_client=http_client,
+            http_async_client=http_async_client,
+        )
+
+    if provider == "sambanova":
+        if not os.environ.get("SAMBANOVA_KEY"):
+            return None
+        return _openai_compatible(provider, os.environ["SAMBANOVA_KEY"], "https://api.sambanova.ai/v1")
+
+    if provider == "openrouter":
+        if not os.environ.get("OPENROUTER_KEY"):
+            return None
+        return _openai_compatible(
+            provider,
+            os.environ["OPENROUTER_KEY"],
+            "https://openrouter.ai/api/v1",
+            default_headers={
+                "HTTP-Referer": "https://github.com/Natnael-Alemseged/Github-Evaluator",
+                "X-Title": "Automaton Auditor"
+            },
+        )
+
+    if provider == "ollama":
+        # Local fallback, always available as the absolute last resort
+        return _openai_compatible(provider, "ollama", os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434/v1"))
+
+    raise ValueError(f"Unknown LLM provider '{provider}'")
+
+
+def get_llm(provider: str):
+    """The shared chat model for a provider (built on first use in this event loop), or None if unavailable."""
+    with _lock:
+        loop = _running_loop()
+        clients = _clients if loop is None else _loop_clients.setdefault(loop, {})
+        if provider not in clients:
+            clients[provider] = _build(provider)
+            if clients[provider] is not None:
+                print(f"  [LLM] Registered {provider} ({_model_for(provider)})")
+        return clients[provider]
+
+
+def chain_for(role: Optional[str] = None) -> List[str]:
+    """Provider ids tried by a caller, in order."""
+    chain = os.environ.get(f"AUDITOR_LLM_CHAIN_{(role or '').upper()}") if role else None
+    chain = chain or LLM_CHAIN or ROLE_CHAINS.get(role, ROLE_CHAINS["Detective"])
+    return [p.strip() for p in chain.split(",") if p.strip()]
+
+
+def fallback_chain(role: Optional[str] = None) -> List[object]:
+    """Available models in the role's fallback order (see ROLE_CHAINS); Ollama always stays last."""
+    chain = chain_for(role)
+    ordered = [m for m in (get_llm(p) for p in chain if p != "ollama") if m is not None]
+    if "ollama" in chain:
+        ordered.append(get_llm("ollama"))
+    return ordered
+
+
+def registered_provider(model) -> Optional[str]:
+    """Provider id of a model handed out by this registry, if it is one."""
+    with _lock:
+        registries = [_clients, *list(_loop_clients.values())]
+    for clients in registries:
+        for provider, client in list(clients.items()):
+            if client is model:
+                return provider
+    return None
@@ -0,0 +1,185 @@
+import asyncio
+import os
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Optional
+
+# Cap on in-flight LLM requests, shared by every audit running on this process's event loop
+LLM_MAX_CONCURRENCY = int(os.environ.get("AUDITOR_LLM_CONCURRENCY", "6"))
+
+# Requests-per-minute budget per provider (0 = unlimited). Override with AUDITOR_RPM_<PROVIDER>, e.g. AUDITOR_RPM_GROQ=60
+PROVIDER_RPM_DEFAULTS = {
+    "gemini": 15,
+    "groq": 30,
+    "sambanova": 20,
+    "openrouter": 20,
+    "ollama": 0,
+}
+
+
+def provider_name(model) -> str:
+    """Best-effort provider id for a LangChain chat model instance."""
+    from src.llm.clients import registered_provider
+    registered = registered_provider(model)
+    if registered:
+        return registered
+    class_name = model.__class__.__name__
+    if "Google" in class_name:
+        return "gemini"
+    if "Groq" in class_name:
+        return "groq"
+    base_url = str(getattr(model, "openai_api_base", None) or "")
+    if "sambanova" in base_url:
+        return "sambanova"
+    if "openrouter" in base_url:
+        return "openrouter"
+    if "localhost" in base_url or "127.0.0.1" in base_url:
+        return "ollama"
+    return class_name.lower()
+
+
+def is_rate_limit_error(e: Exception) -> bool:
+    """True if error is 429/rate limit/quota — try next provider immediately."""
+    msg = str(e).lower()
+    return (
+        "429" in msg
+        or "rate limit" in msg
+        or "rate_limit" in msg
+        or "tpm" in msg
+        or "quota" in msg
+        or "spend limit" in msg
+    )
+
+def is_connection_error(e: Exception) -> bool:
+    """True if server is down or local Ollama is not running."""
+    msg = str(e).lower()
+    return "connection error" in msg or "refused" in msg or "host unreachable" in msg
+
+
+_per_loop_lock = threading.Lock()
+
+
+def _per_loop(registry: "weakref.WeakKeyDictionary", factory: Callable[[], object]):
+    """The running loop's entry in registry, created on first use and dropped with the loop.
+
+    asyncio locks and semaphores bind to the first loop that waits on them, so each loop needs its own.
+    """
+    loop = asyncio.get_running_loop()
+    with _per_loop_lock:
+        value = registry.get(loop)
+        if value is None:
+            value = registry[loop] = factory()
+        return value
+
+
+class TokenBucket:
+    """Requests-per-minute limiter that only delays when the bucket is actually empty.
+
+    The bucket starts full (burst = one minute of budget), so an uncongested
+    audit never waits. When a provider answers with a rate-limit error the
+    bucket is drained and held empty until `retry_after` has passed.
+    """
+
+    def __init__(self, requests_per_minute: float):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1.0, float(requests_per_minute))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        # The token count is shared across loops; only the waiters' lock is per loop
+        self._locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+
+    def _refill(self, now: float) -> None:
+        if now < self.blocked_until:
+            self.updated = now
+            return
+        start = max(self.updated, self.blocked_until)
+        self.tokens = min(self.capacity, self.tokens + (now - start) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until a token would be available (0 when one is available now)."""
+        now = time.monotonic()
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now + 1.0 / self.rate
+        if self.tokens >= 1.0:
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+    async def acquire(self) -> float:
+        """Take one token, sleeping only as long as needed. Returns the time waited."""
+        waited = 0.0
+        async with _per_loop(self._locks, asyncio.Lock):
+            while True:
+                wait = self.delay()
+                if wait <= 0:
+                    self.tokens -= 1.0
+                    return waited
+                await asyncio.sleep(wait)
+                waited += wait
+
+    def exhaust(self, retry_after: float) -> None:
+        """The provider reported a rate limit: hold the bucket empty for retry_after seconds."""
+        now = time.monotonic()
+        self.tokens = 0.0
+        self.updated = now
+        self.blocked_until = max(self.blocked_until, now + retry_after)
+
+
+class LLMBudget:
+    """Shared budget of concurrent LLM requests plus per-provider request rates.
+
+    Judges, the VisionInspector and the Chief Justice of every concurrent audit
+    draw from the same budget, so a batch of N audits never issues more than
+    `max_concurrent` provider requests at once nor exceeds any provider's RPM.
+    Waiting for a slot yields the event loop instead of blocking a thread. Each event loop
+    (e.g. successive asyncio.run calls) gets its own semaphore; RPM buckets are shared.
+    """
+
+    def __init__(self, max_concurrent: int = LLM_MAX_CONCURRENCY):
+        self.max_concurrent = max(1, max_concurrent)
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self._buckets: Dict[str, Optional[TokenBucket]] = {}
+
+    def bucket(self, provider: str) -> Optional[TokenBucket]:
+        if provider not in self._buckets:
+            rpm = float(os.environ.get(f"AUDITOR_RPM_{provider.upper()}", PROVIDER_RPM_DEFAULTS.get(provider, 0)))
+            self._buckets[provider] = TokenBucket(rpm) if rpm > 0 else None
+        return self._buckets[provider]
+
+    @asynccontextmanager
+    async def slot(self, provider: Optional[str] = None):
+        bucket = self.bucket(provider) if provider else None
+        if bucket:
+            waited = await bucket.acquire()
+            if waited:
+                print(f"  [RateLimit] Waited {waited:.1f}s for {provider} budget")
+        async with _per_loop(self._semaphores, lambda: asyncio.Semaphore(self.max_concurrent)):
+            yield
+
+
+_budget = LLMBudget()
+
+
+def configure_llm_budget(max_concurrent: int) -> None:
+    """Resize the shared budget. Call before any audit starts."""
+    global _budget
+    _budget = LLMBudget(max_concurrent)
+
+
+def llm_slot(provider: Optional[str] = None):
+    """Async context manager holding one slot of the shared LLM budget for the duration of a request.
+
+    With a provider id, also takes one token from that provider's RPM bucket first.
+    """
+    return _budget.slot(provider)
+
+
+def report_rate_limited(provider: str, retry_after: float = 15.0) -> None:
+    """Record a provider rate-limit response so later requests to it wait instead of failing again."""
+    bucket = _budget.bucket(provider)
+    if bucket:
+        bucket.exhaust(retry_after)
@@ -0,0 +1,102 @@
+"""
+Content-addressed on-disk cache of structured LLM responses.
+Re-auditing an unchanged repository sends byte-identical judge prompts; this cache returns the
+stored response instead of paying the provider's latency and cost again.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+CACHE_ROOT = os.environ.get("AUDITOR_CACHE_DIR", ".auditor_cache")
+LLM_CACHE_DIR = os.path.join(CACHE_ROOT, "llm")
+LLM_CACHE_ENABLED = os.environ.get("AUDITOR_LLM_CACHE", "1") != "0"
+LLM_CACHE_TTL_SECONDS = float(os.environ.get("AUDITOR_LLM_CACHE_TTL_HOURS", "168")) * 3600
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("AUDITOR_LLM_CACHE_MAX_ENTRIES", "5000"))
+# Run an eviction sweep after this many writes
+EVICT_EVERY = 50
+
+
+def cache_key(model_name: str, role: str, evidence_text: str, rubric_dimensions: list, prompt: str = "") -> str:
+    """Stable hash of everything that determines a judge's response.
+
+    The rendered prompt is included so edits to the prompt template invalidate old entries.
+    """
+    payload = json.dumps([model_name, role, evidence_text, rubric_dimensions, prompt], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """One JSON file per key, sharded by key prefix. Expired entries are ignored; oldest-used are evicted."""
+
+    def __init__(self, root: str = LLM_CACHE_DIR, ttl: float = LLM_CACHE_TTL_SECONDS, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.root = root
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._writes = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if time.time() - entry.get("created_at", 0) > self.ttl:
+            return None
+        try:
+            os.utime(path)  # Mark as recently used for LRU eviction
+        except OSError:
+            pass
+        return entry.get("response")
+
+    def put(self, key: str, response: dict, **meta) -> None:
+        """Store a response. Best effort: a failed write (disk full, read-only cache) is logged, never raised."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump({"created_at": time.time(), "response": response, **meta}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"  [LLM Cache] Could not store {key[:12]}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        self._writes += 1
+        if self._writes % EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self) -> None:
+        """Drop expired entries, then least-recently-used ones beyond max_entries."""
+        entries = []
+        now = time.time()
+        for root, _, files in os.walk(self.root):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        entries.sort()
+        excess = len(entries) - self.max_entries
+        for i, (mtime, path) in enumerate(entries):
+            # Expiry is judged on last use here; get() still enforces TTL from creation time
+            if i < excess or now - mtime > self.ttl:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+response_cache = ResponseCache()
@@ -1,61 +1,30 @@
+import hashlib
 import os
 from typing import List
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_groq import ChatGroq
-from langchain_openai import ChatOpenAI
 from src.state import AgentState, Evidence
 from src.tools.repo_tools import (
     RepoSandbox,
-    extract_git_history,
     analyze_graph_structure,
     analyze_security_features,
-    analyze_git_progression,
-    get_all_repo_files,
     analyze_state_management,
     analyze_structured_output,
     analyze_judicial_nuance,
-    analyze_chief_justice_synthesis
+    analyze_chief_justice_synthesis,
+    locate_analysis_targets,
+    format_locations
 )
+from src.tools.ast_index import get_repo_index
+from src.tools.manifest import build_manifest
+from src.tools.git_analytics import CommitAnalytics, describe
+from src.tools.git_history import ProgressionTracker, stream_history
+from src.tools.analyzer_executor import run_analyzers
+from src.tools.analyzer_registry import analyzer, select_analyzers
 from src.tools.doc_tools import extract_images_from_pdf
-
-# --- Setup LLM Fallback ---
-def get_detective_llms():
-    """Returns LLMs for Detective layer. Primary: Gemini, Fallback: Groq."""
-    llms = []
-    
-    # Primary for Detectives: Gemini
-    if os.environ.get("GOOGLE_API_KEY"):
-        try:
-            from langchain_google_genai import ChatGoogleGenerativeAI
-            llms.append(ChatGoogleGenerativeAI(model="gemini-2.0-flash", temperature=0))
-        except ImportError:
-            pass
-            
-    # Fallback 1: Groq
-    if os.environ.get("GROQ_API_KEY"):
-        llms.append(ChatGroq(model="llama-3.3-70b-versatile", temperature=0))
-    
-    # Fallback 2: OpenRouter
-    if os.environ.get("OPENROUTER_KEY"):
-        llms.append(ChatOpenAI(
-            model="openrouter/auto-free",
-            openai_api_key=os.environ["OPENROUTER_KEY"],
-            openai_api_base="https://openrouter.ai/api/v1",
-            default_headers={
-                "HTTP-Referer": "https://github.com/Natnael-Alemseged/Github-Evaluator",
-                "X-Title": "Automaton Auditor"
-            },
-            temperature=0
-        ))
-    
-    # Local fallback
-    llms.append(ChatOpenAI(
-        model="llama3.1", 
-        openai_api_key="ollama", 
-        openai_api_base="http://localhost:11434/v1",
-        temperature=0
-    ))
-    return llms
+from src.llm.clients import fallback_chain
+from src.llm.circuit_breaker import breaker
+from src.llm.rate_limit import llm_slot, provider_name
+from src.llm.response_cache import LLM_CACHE_ENABLED, cache_key, response_cache
 
 def repo_cloner(state: AgentState) -> dict:
     """Node: Clones the repository once and stores path in state."""
@@ -63,16 +32,144 @@ def repo_cloner(state: AgentState) -> dict:
     repo_url = state["repo_url"]
     try:
         # We manually manage the sandbox lifecycle
-        sandbox = RepoSandbox(repo_url)
+        sandbox = RepoSandbox(repo_url, clone_mode=state.get("clone_mode"))
         repo_path = sandbox.__enter__()
-        all_files = get_all_repo_files(repo_path)
+        manifest = build_manifest(repo_path)
         return {
             "repo_path": repo_path,
-            "repo_manifest": all_files
+            "repo_commit": manifest.commit,
+            "repo_manifest": manifest.paths
         }
     except Exception as e:
         print(f"RepoCloner failed: {e}")
-        return {"repo_path": None, "repo_manifest": []}
+        return {"repo_path": None, "repo_commit": None, "repo_manifest": []}
+
+def _located(repo_path: str, target: str) -> str:
+    """Evidence location: the files an analyzer actually inspected (analyzers scan the whole tree)."""
+    return format_locations(locate_analysis_targets(repo_path, target), "Repository-wide scan")
+
+@analyzer("graph", dimensions=["graph_orchestration"], goal="Verify fan-out/fan-in and StateGraph structure")
+def graph_analyzer(repo_path: str) -> List[Evidence]:
+    graph_analysis = analyze_graph_structure(repo_path)
+    return [Evidence(
+        detective_name="RepoInvestigator",
+        goal="Verify fan-out/fan-in and StateGraph structure",
+        found="StateGraph" in graph_analysis,
+        content=graph_analysis,
+        location=_located(repo_path, "graph"),
+        dimensions=["graph_orchestration"],
+        rationale="AST analysis of every module that builds a StateGraph.",
+        confidence=1.0
+    )]
+
+# History forensics, progression and commit analytics form one analyzer: all three are fed
+# from a single streaming pass over git log --numstat
+@analyzer("git history", dimensions=["git_forensic_analysis"], cost="moderate",
+          goal="Retrieve git history for effort and atomic commits", location="Git Log")
+def git_history_analyzer(repo_path: str) -> List[Evidence]:
+    tracker, analytics = ProgressionTracker(), CommitAnalytics()
+    stream_history(repo_path, tracker, analytics)
+    timeline_analysis = tracker.progression_analysis()
+    metrics = analytics.summarize() or {}
+    return [Evidence(
+        detective_name="RepoInvestigator",
+        goal="Retrieve git history for effort and atomic commits",
+        found=tracker.count > 1,
+        content=tracker.history_summary(),
+        location="Git Log",
+        dimensions=["git_forensic_analysis"],
+        rationale="Used to gauge developer effort and commit quality.",
+        confidence=1.0
+    ), Evidence(
+        detective_name="RepoInvestigator",
+        goal="Verify logical setup -> tools -> graph progression",
+        found="Timeline reconstruction:" in timeline_analysis,
+        content=timeline_analysis,
+        location="Git History Analytics",
+        dimensions=["git_forensic_analysis"],
+        rationale="Analyzes temporal development stages.",
+        confidence=1.0
+    ), Evidence(
+        detective_name="RepoInvestigator",
+        goal="Distinguish incremental development from bulk or artificially split commits",
+        found=bool(metrics.get("commits")),
+        content=describe(metrics),
+        location="Git History Analytics",
+        dimensions=["git_forensic_analysis"],
+        metrics=metrics,
+        rationale="Distributions of time between commits, commit sizes and per-directory churn.",
+        confidence=1.0 if metrics.get("has_diff_stats") else 0.6
+    )]
+
+@analyzer("state", dimensions=["state_management_rigor"], goal="Verify Pydantic models and Annotated reducers in state")
+def state_analyzer(repo_path: str) -> List[Evidence]:
+    state_analysis = analyze_state_management(repo_path)
+    return [Evidence(
+        detective_name="RepoInvestigator",
+        goal="Verify Pydantic models and Annotated reducers in state",
+        found="Pydantic BaseModel found" in state_analysis,
+        content=state_analysis,
+        location=_located(repo_path, "state"),
+        dimensions=["state_management_rigor"],
+        rationale="Keyword scan for State Management Rigor.",
+        confidence=1.0
+    )]
+
+@analyzer("structured output", dimensions=["structured_output_enforcement"], goal="Verify .with_structured_output() in judges")
+def structured_output_analyzer(repo_path: str) -> List[Evidence]:
+    output_analysis = analyze_structured_output(repo_path)
+    return [Evidence(
+        detective_name="RepoInvestigator",
+        goal="Verify .with_structured_output() in judges",
+        found="Uses '.with_structured_output()'" in output_analysis,
+        content=output_analysis,
+        location=_located(repo_path, "structured_output"),
+        dimensions=["structured_output_enforcement"],
+        rationale="Keyword scan for Structured Output enforcement.",
+        confidence=1.0
+    )]
+
+@analyzer("judicial nuance", dimensions=["judicial_nuance"], goal="Verify distinct persona instructions")
+def judicial_nuance_analyzer(repo_path: str) -> List[Evidence]:
+    nuance_analysis = analyze_judicial_nuance(repo_path)
+    return [Evidence(
+        detective_name="RepoInvestigator",
+        goal="Verify distinct persona instructions",
+        found="Three distinct personas defined" in nuance_analysis,
+        content=nuance_analysis,
+        location=_located(repo_path, "judges"),
+        dimensions=["judicial_nuance"],
+        rationale="Keyword scan for persona-specific system prompt instructions.",
+        confidence=1.0
+    )]
+
+@analyzer("chief justice", dimensions=["chief_justice_synthesis"], goal="Verify Chief Justice deterministic synthesis logic")
+def justice_synthesis_analyzer(repo_path: str) -> List[Evidence]:
+    justice_analysis = analyze_chief_justice_synthesis(repo_path)
+    return [Evidence(
+        detective_name="RepoInvestigator",
+        goal="Verify Chief Justice deterministic synthesis logic",
+        found="deterministic Python logic" in justice_analysis,
+        content=justice_analysis,
+        location=_located(repo_path, "justice"),
+        dimensions=["chief_justice_synthesis"],
+        rationale="Deterministic scan for specific Python synthesis rules.",
+        confidence=1.0
+    )]
+
+@analyzer("security", dimensions=["safe_tool_engineering"], goal="Scan for secure tool engineering and identify 'failure_patterns'")
+def security_analyzer(repo_path: str) -> List[Evidence]:
+    security_analysis = analyze_security_features(repo_path)
+    return [Evidence(
+        detective_name="RepoInvestigator",
+        goal="Scan for secure tool engineering and identify 'failure_patterns'",
+        found="Uses 'tempfile' for isolated sandboxing" in security_analysis,
+        content=security_analysis + "\nVerification: Checking for lack of sandboxing or insecure subprocess calls as per failure_pattern.",
+        location=_located(repo_path, "security"),
+        dimensions=["safe_tool_engineering"],
+        rationale="Forensic scan for both compliance and anti-patterns in tool engineering.",
+        confidence=1.0
+    )]
 
 def repo_investigator(state: AgentState) -> dict:
     """Node: Investigates the repository structure and code."""
@@ -84,109 +181,21 @@ def repo_investigator(state: AgentState) -> dict:
             goal="Analyze repo", found=False, content="No repo_path in state", location="None", rationale="Cloning failed", confidence=0.0
         )]}}
     
-    evidences = []
     try:
         print(f"--- RepoInvestigator Analyzing: {repo_path} ---")
-        
-        # 1) Analysis of Graph Structure
-        graph_analysis = analyze_graph_structure(repo_path)
-        evidences.append(Evidence(
-            detective_name="RepoInvestigator",
-            goal="Verify fan-out/fan-in and StateGraph structure",
-            found="StateGraph" in graph_analysis,
-            content=graph_analysis,
-            location="src/graph.py",
-            rationale="AST analysis of graph definition file.",
-            confidence=1.0
-        ))
-        
-        # 2) History Forensics
-        history_analysis = extract_git_history(repo_path)
-        evidences.append(Evidence(
-            detective_name="RepoInvestigator",
-            goal="Retrieve git history for effort and atomic commits",
-            found=len(history_analysis) > 50,
-            content=history_analysis,
-            location="Git Log",
-            rationale="Used to gauge developer effort and commit quality.",
-            confidence=1.0
-        ))
-        
-        # 3) Git Progression
-        timeline_analysis = analyze_git_progression(history_analysis)
-        evidences.append(Evidence(
-            detective_name="RepoInvestigator",
-            goal="Verify logical setup -> tools -> graph progression",
-            found="Timeline reconstruction:" in timeline_analysis,
-            content=timeline_analysis,
-            location="Git History Analytics",
-            rationale="Analyzes temporal development stages.",
-            confidence=1.0
-        ))
+        # Only the analyzers serving the dimensions being audited
+        dimension_ids = [dim.get("id") for dim in state.get("rubric_dimensions", [])]
+        specs = select_analyzers(dimension_ids)
+        print(f"  Running {len(specs)} analyzers: {', '.join(spec.name for spec in specs)}")
 
-        # 4) State Management
-        state_analysis = analyze_state_management(repo_path)
-        evidences.append(Evidence(
-            detective_name="RepoInvestigator",
-            goal="Verify Pydantic models and Annotated reducers in state",
-            found="Pydantic BaseModel found" in state_analysis,
-            content=state_analysis,
-            location="src/state.py",
-            rationale="Keyword scan for State Management Rigor.",
-            confidence=1.0
-        ))
+        # Parse the tree once before fanning out; every analyzer queries the shared index
+        get_repo_index(repo_path)
 
-        # 5) Structured Output
-        output_analysis = analyze_structured_output(repo_path)
-        evidences.append(Evidence(
-            detective_name="RepoInvestigator",
-            goal="Verify .with_structured_output() in judges",
-            found="Uses '.with_structured_output()'" in output_analysis,
-            content=output_analysis,
-            location="src/nodes/judges.py",
-            rationale="Keyword scan for Structured Output enforcement.",
-            confidence=1.0
-        ))
-
-        # 6) Judicial Nuance
-        nuance_analysis = analyze_judicial_nuance(repo_path)
-        evidences.append(Evidence(
-            detective_name="RepoInvestigator",
-            goal="Verify distinct persona instructions",
-            found="Three distinct personas defined" in nuance_analysis,
-            content=nuance_analysis,
-            location="src/nodes/judges.py",
-            rationale="Keyword scan for persona-specific system prompt instructions.",
-            confidence=1.0
-        ))
-        
-        # 7) Chief Justice Synthesis
-        justice_analysis = analyze_chief_justice_synthesis(repo_path)
-        evidences.append(Evidence(
-            detective_name="RepoInvestigator",
-            goal="Verify Chief Justice deterministic synthesis logic",
-            found="deterministic Python logic" in justice_analysis,
-            content=justice_analysis,
-            location="src/nodes/justice.py",
-            rationale="Deterministic scan for specific Python synthesis rules.",
-            confidence=1.0
-        ))
-
-        # 8) Safe Tool Engineering
-        security_analysis = analyze_security_features(repo_path)
-        evidences.append(Evidence(
-            detective_name="RepoInvestigator",
-            goal="Scan for secure tool engineering and identify 'failure_patterns'",
-            found="Uses 'tempfile' for isolated sandboxing" in security_analysis,
-            content=security_analysis + "\nVerification: Checking for lack of sandboxing or insecure subprocess calls as per failure_pattern.",
-            location="src/tools/repo_tools.py",
-            rationale="Forensic scan for both compliance and anti-patterns in tool engineering.",
-            confidence=1.0
-        ))
-        all_files = get_all_repo_files(repo_path)
+        # Independent analyzers run concurrently; evidence is merged in registration order
+        evidences = run_analyzers([spec.job(repo_path) for spec in specs], detective_name="RepoInvestigator")
     except Exception as e:
         print(f"RepoInvestigator failed: {e}")
-        evidences.append(Evidence(
+        evidences = [Evidence(
             detective_name="RepoInvestigator",
             goal="Scan repository",
             found=False,
@@ -194,8 +203,7 @@ def repo_investigator(state: AgentState) -> dict:
             location="repo_tools",
             rationale="Failed to clone or analyze repo",
             confidence=0.0
-        ))
-        all_files = []
+        )]
     
     # Print structured findings for visibility
     for ev in evidences:
@@ -207,10 +215,24 @@ def repo_investigator(state: AgentState) -> dict:
         "hallucinated_paths": []
     }
 
+def _audits_artifact(state: AgentState, target_artifact: str) -> bool:
+    """Whether any rubric dimension being audited targets this artifact (rubric.json `target_artifact`)."""
+    dimensions = state.get("rubric_dimensions") or []
+    return not dimensions or any(dim.get("target_artifact") == target_artifact for dim in dimensions)
+
+def _stable_location(path: str, repo_path: str) -> str:
+    """Evidence location of a file that may live in the per-audit sandbox: repo-relative when it does."""
+    if repo_path and os.path.abspath(path).startswith(os.path.abspath(repo_path) + os.sep):
+        return os.path.relpath(path, repo_path)
+    return path
+
 def doc_analyst(state: AgentState) -> dict:
     """Node: Analyzes documentation and PDFs using RAG-lite."""
     print("--- Detective: DocAnalyst ---")
-    from src.tools.doc_tools import ingest_pdf, query_vector_store
+    if not _audits_artifact(state, "pdf_report"):
+        print("  No pdf_report dimensions being audited; skipping.")
+        return {"evidences": {"doc_analyst": []}}
+    from src.tools.doc_tools import document_namespace, ingest_pdf, query_vector_store_many
 
     repo_path = state.get("repo_path")
     pdf_path = state.get("pdf_path") or "standard.pdf"
@@ -221,11 +243,16 @@ def doc_analyst(state: AgentState) -> dict:
         if os.path.exists(repo_pdf):
             pdf_path = repo_pdf
     
+    # The sandbox path changes every run; citations and cache keys need the same location each time
+    location = _stable_location(pdf_path, repo_path)
     evidences = []
+    namespace = None
 
     try:
         if os.path.exists(pdf_path):
-            ingest_pdf(pdf_path)
+            # Each PDF gets its own vector namespace, so parallel audits never read each other's chunks
+            namespace = document_namespace(pdf_path)
+            ingest_pdf(pdf_path, namespace=namespace)
         else:
             raise FileNotFoundError(f"PDF not found at {pdf_path}")
     except Exception as e:
@@ -234,7 +261,8 @@ def doc_analyst(state: AgentState) -> dict:
             detective_name="DocAnalyst",
             found=False,
             content=str(e),
-            location=pdf_path,
+            location=location,
+            dimensions=["theoretical_depth", "report_accuracy"],
             goal="Ingest PDF",
             rationale="Ingestion failed.",
             confidence=0.0
@@ -242,9 +270,8 @@ def doc_analyst(state: AgentState) -> dict:
         return {"evidences": {"doc_analyst": evidences}}
 
     terms = ["Dialectical Synthesis", "Fan-In / Fan-Out", "Metacognition", "State Synchronization"]
-    results = []
-    for term in terms:
-        results.append(f"**{term}**: {query_vector_store(term)}")
+    # One index load and one batched embedding for all terms
+    results = [f"**{term}**: {answer}" for term, answer in zip(terms, query_vector_store_many(terms, namespace))]
 
     evidences.append(Evidence(
         detective_name="DocAnalyst",
@@ -255,26 +282,30 @@ def doc_analyst(state: AgentState) -> dict:
             + "\n".join(results)
             + "\n\nNote: If any term shows 'No relevant information', it indicates a critical gap or failure to document the theoretical basis."
         ),
-        location=pdf_path,
+        location=location,
+        dimensions=["theoretical_depth", "report_accuracy"],
         rationale="Vector search for required theoretical terms, looking for substantive explanations vs buzzword dropping.",
         confidence=0.9
     ))
     return {"evidences": {"doc_analyst": evidences}}
 
-def vision_inspector(state: AgentState) -> dict:
+async def vision_inspector(state: AgentState) -> dict:
     """Node: Vision analysis of architectural diagrams."""
     print("--- Detective: VisionInspector ---")
+    if not _audits_artifact(state, "pdf_images"):
+        print("  No pdf_images dimensions being audited; skipping.")
+        return {"evidences": {"vision_inspector": []}}
+    import asyncio
+
     pdf_path = state.get("pdf_path") or ""
     repo_path = state.get("repo_path")
     diag_path = os.path.join(repo_path, "architecture.png") if repo_path else "architecture.png"
-    image_paths = extract_images_from_pdf(pdf_path) if pdf_path and os.path.exists(pdf_path) else []
+    # PDF image extraction is blocking file work; keep it off the event loop
+    image_paths = await asyncio.to_thread(extract_images_from_pdf, pdf_path) if pdf_path and os.path.exists(pdf_path) else []
     if not image_paths and os.path.exists(diag_path):
         image_paths = [diag_path]
-
-    import time
-    import random
     
-    llms = get_detective_llms()
+    llms = fallback_chain("Detective")
     vision_question = (
         "Analyze this architectural diagram. "
         "1. Identify sections that match the 'success_pattern' (parallel fan-out to Detectives, Aggregation, parallel fan-out to Judges, Chief Justice). "
@@ -282,31 +313,56 @@ def vision_inspector(state: AgentState) -> dict:
         "Be specific about what is NOT there."
     )
 
-    # Small jitter before vision call
-    time.sleep(random.uniform(0.5, 2.0))
-    for model in llms:
+    image_bytes = b""
+    if image_paths:
+        with open(image_paths[0], "rb") as f:
+            image_bytes = f.read()
+    # Extracted images land in a fresh temp dir each run: identify them by content instead
+    image_sha = hashlib.sha256(image_bytes).hexdigest()
+    location = "architecture.png" if image_paths and image_paths[0] == diag_path else f"sha256:{image_sha}"
+    use_cache = LLM_CACHE_ENABLED and not state.get("fresh")
+
+    for model in breaker.available(llms):
         if not image_paths or "Google" not in model.__class__.__name__:
             continue
-        try:
-            import base64
-            with open(image_paths[0], "rb") as f:
-                b64 = base64.b64encode(f.read()).decode()
-            parts = [
-                {"type": "text", "text": vision_question},
-                {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{b64}"}}
-            ]
-            resp = model.invoke([HumanMessage(content=parts)])
-            return {"evidences": {"vision_inspector": [Evidence(
-                detective_name="VisionInspector",
-                goal="Analyze diagram",
-                found=True,
-                content=getattr(resp, "content", str(resp)),
-                location=image_paths[0],
-                rationale="Vision analysis using Gemini.",
-                confidence=0.95
-            )]}}
-        except Exception:
-            continue
+        provider = provider_name(model)
+        model_name = getattr(model, "model_name", getattr(model, "model", "Unknown"))
+        # Same image + question + model => reuse the description, so re-audits feed the judges identical evidence
+        key = cache_key(model_name, "VisionInspector", image_sha, [], vision_question)
+        cached = response_cache.get(key) if use_cache else None
+        if cached:
+            print(f"  [LLM Cache] Hit for VisionInspector ({model_name})")
+            content = cached.get("content")
+        else:
+            if not breaker.allow(provider):
+                continue
+            try:
+                import base64
+                b64 = base64.b64encode(image_bytes).decode()
+                parts = [
+                    {"type": "text", "text": vision_question},
+                    {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{b64}"}}
+                ]
+                async with llm_slot(provider):
+                    resp = await breaker.call(provider, lambda: model.ainvoke([HumanMessage(content=parts)]))
+            except Exception:
+                continue
+            finally:
+                breaker.release(provider)
+            content = getattr(resp, "content", str(resp))
+            if use_cache:
+                response_cache.put(key, {"content": content}, model=model_name, role="VisionInspector")
+        return {"evidences": {"vision_inspector": [Evidence(
+            detective_name="VisionInspector",
+            goal="Analyze diagram",
+            found=True,
+            content=content,
+            location=location,
+            dimensions=["swarm_visual"],
+            rationale="Vision analysis using Gemini.",
+            confidence=0.95,
+            metrics={"input_sha256": image_sha}
+        )]}}
 
     return {"evidences": {"vision_inspector": [Evidence(
         detective_name="VisionInspector",
@@ -314,6 +370,7 @@ def vision_inspector(state: AgentState) -> dict:
         found=True,
         content="Diagram extracted; vision model skipped or unavailable.",
         location="architecture.png",
+        dimensions=["swarm_visual"],
         rationale="Fallback for non-multimodal environment.",
         confidence=0.5
     )]}}
@@ -1,158 +1,45 @@
 import os
-import time
-import random
 import json
 from pydantic import BaseModel
 from typing import List, Literal, Optional
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_groq import ChatGroq
-from langchain_openai import ChatOpenAI
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
 from src.state import AgentState, JudicialOpinion, Evidence, CriterionResult, AuditReport
-
-# --- Setup LLM Fallback ---
-
-def get_base_llms():
-    """Returns a list of available LLM instances in preferred priority order."""
-    available_llms = []
-    
-    # Priority 1: Google Gemini (High limits, very reliable)
-    if os.environ.get("GOOGLE_API_KEY"):
-        try:
-            from langchain_google_genai import ChatGoogleGenerativeAI
-            available_llms.append(ChatGoogleGenerativeAI(model="gemini-2.0-flash", temperature=0))
-            print("  [LLM] Added Gemini 2.0 Flash")
-        except ImportError:
-            print("Warning: langchain-google-genai not installed.")
-
-    # Priority 2: Groq (Fast, but low rate limits)
-    if os.environ.get("GROQ_API_KEY"):
-        available_llms.append(ChatGroq(model="llama-3.3-70b-versatile", temperature=0))
-        print("  [LLM] Added Groq Llama 3.3")
-
-    # Priority 3: SambaNova
-    if os.environ.get("SAMBANOVA_KEY"):
-        available_llms.append(ChatOpenAI(
-            model="Meta-Llama-3.1-8B-Instruct",
-            openai_api_key=os.environ["SAMBANOVA_KEY"],
-            openai_api_base="https://api.sambanova.ai/v1",
-            temperature=0
-        ))
-        print("  [LLM] Added SambaNova Llama 3.1")
-
-    # Priority 4: OpenRouter (Free models)
-    if os.environ.get("OPENROUTER_KEY"):
-        available_llms.append(ChatOpenAI(
-            model="openai/gpt-oss-120b:free",
-            openai_api_key=os.environ["OPENROUTER_KEY"],
-            openai_api_base="https://openrouter.ai/api/v1",
-            default_headers={
-                "HTTP-Referer": "https://github.com/Natnael-Alemseged/Github-Evaluator",
-                "X-Title": "Automaton Auditor"
-            },
-            temperature=0
-        ))
-        print("  [LLM] Added OpenRouter Free")
-        
-    # Priority 5: Ollama (Local Fallback - absolute last resort)
-    # We add this separately to ensure it's always at the end regardless of shuffling
-    return available_llms
-
-
-def _is_rate_limit_error(e: Exception) -> bool:
-    """True if error is 429/rate limit/quota — try next provider immediately."""
-    msg = str(e).lower()
-    return (
-        "429" in msg
-        or "rate limit" in msg
-        or "rate_limit" in msg
-        or "tpm" in msg
-        or "quota" in msg
-        or "spend limit" in msg
-    )
-
-def _is_connection_error(e: Exception) -> bool:
-    """True if server is down or local Ollama is not running."""
-    msg = str(e).lower()
-    return "connection error" in msg or "refused" in msg or "host unreachable" in msg
-
-
-def get_structured_llm(model_class):
-    """Try available LLMs with fallback on rate limits."""
-    available_llms = get_base_llms()
-    available_llms.append(ChatOpenAI(
-        model="llama3.1", 
-        openai_api_key="ollama", 
-        openai_api_base="http://localhost:11434/v1",
-        temperature=0
-    ))
-    for model in available_llms:
-        try:
-            return model.with_structured_output(model_class)
-        except Exception:
-            continue
-    return None
+from src.incremental import flatten_evidence, supports
+from src.llm.clients import fallback_chain
+from src.llm.circuit_breaker import breaker
+from src.llm.response_cache import LLM_CACHE_ENABLED, cache_key, response_cache
+from src.llm.rate_limit import llm_slot, provider_name, report_rate_limited, is_rate_limit_error, is_connection_error
 
 class BatchJudicialOpinion(BaseModel):
     """Container for multiple judicial opinions to allow batch evaluation."""
     opinions: List[JudicialOpinion]
 
-def get_judge_opinion(judge_role: Literal["Prosecutor", "Defense", "TechLead"], state: AgentState) -> List[JudicialOpinion]:
+async def get_judge_opinion(judge_role: Literal["Prosecutor", "Defense", "TechLead"], state: AgentState) -> List[JudicialOpinion]:
     """Generic judge logic to evaluate evidence with batching and fallback."""
     print(f"--- Judge: {judge_role} (Batch Evaluation) ---")
     
-    # Stagger node startup
-    time.sleep(random.uniform(2.0, 5.0))
-    
-    all_evidence = []
-    for source_key, ev_list in state["evidences"].items():
-        all_evidence.extend(ev_list)
-        
-    evidence_text = "\n".join([f"ID: {i}, Detective: {e.detective_name}, Finding: {e.content}, Source: {e.location}" for i, e in enumerate(all_evidence)])
+    all_evidence = flatten_evidence(state["evidences"])
     rubric_dimensions = state.get("rubric_dimensions", [])
-    
-    # Provider definitions
-    gemini = None
-    if os.environ.get("GOOGLE_API_KEY"):
-        try:
-            from langchain_google_genai import ChatGoogleGenerativeAI
-            gemini = ChatGoogleGenerativeAI(model="gemini-2.0-flash", temperature=0)
-        except ImportError: pass
-        
-    groq = ChatGroq(model="llama-3.3-70b-versatile", temperature=0) if os.environ.get("GROQ_API_KEY") else None
-    
-    sambanova = None
-    if os.environ.get("SAMBANOVA_KEY"):
-        sambanova = ChatOpenAI(
-            model="Meta-Llama-3.3-70B-Instruct", # Highest reliability/speed on SambaNova
-            openai_api_key=os.environ["SAMBANOVA_KEY"],
-            openai_api_base="https://api.sambanova.ai/v1",
-            temperature=0
-        )
-        
-    openrouter = ChatOpenAI(
-        model="openai/gpt-4o-mini",
-        openai_api_key=os.environ["OPENROUTER_KEY"],
-        openai_api_base="https://openrouter.ai/api/v1",
-        temperature=0
-    ) if os.environ.get("OPENROUTER_KEY") else None
-         
-    ollama = ChatOpenAI(
-        model="llama3.1", 
-        openai_api_key="ollama", 
-        openai_api_base="http://localhost:11434/v1",
-        temperature=0
-    )
 
-    # Assign role-specific chains to spread load
-    if judge_role == "Prosecutor":
-        final_llms = [groq, gemini, sambanova, openrouter, ollama]
-    elif judge_role == "Defense":
-        final_llms = [sambanova, groq, gemini, openrouter, ollama]
-    else: # TechLead
-        final_llms = [gemini, sambanova, groq, openrouter, ollama]
+    # Incremental mode: judge only the dimensions whose evidence changed, over the evidence
+    # that supports them (IDs keep their global numbering so citations stay valid)
+    dimensions_to_judge = state.get("dimensions_to_judge")
+    if dimensions_to_judge is not None:
+        rubric_dimensions = [dim for dim in rubric_dimensions if dim.get("id") in dimensions_to_judge]
+        if not rubric_dimensions:
+            print(f"  [{judge_role}] No changed dimensions; reusing prior opinions.")
+            return []
+    judged_ids = [dim.get("id", "") for dim in rubric_dimensions]
+        
+    evidence_text = "\n".join([
+        f"ID: {i}, Detective: {e.detective_name}, Finding: {e.content}, Source: {e.location}"
+        for i, e in enumerate(all_evidence)
+        if dimensions_to_judge is None or any(supports(e, dim_id) for dim_id in judged_ids)
+    ])
     
-    final_llms = [m for m in final_llms if m is not None]
+    # Shared clients from the process-wide registry, rotated per role to spread load
+    final_llms = fallback_chain(judge_role)
 
     role_instructions = {
         "Prosecutor": (
@@ -205,24 +92,50 @@ def get_judge_opinion(judge_role: Literal["Prosecutor", "Defense", "TechLead"],
     - 'judge' (set to '{judge_role}')
     """
 
-    for model in final_llms:
+    # Identical evidence + rubric + model => identical prompt: serve the stored opinions
+    use_cache = LLM_CACHE_ENABLED and not state.get("fresh")
+    cache_keys = {}
+    if use_cache:
+        for model in final_llms:
+            model_name = getattr(model, "model_name", getattr(model, "model", "Unknown"))
+            key = cache_key(model_name, judge_role, evidence_text, rubric_dimensions, prompt)
+            cache_keys[id(model)] = key
+            cached = response_cache.get(key)
+            if cached:
+                print(f"  [LLM Cache] Hit for {judge_role} ({model_name})")
+                opinions = BatchJudicialOpinion.model_validate(cached).opinions
+                for op in opinions:
+                    op.judge = judge_role
+                return opinions
+
+    for model in breaker.available(final_llms):
         model_name = getattr(model, "model_name", getattr(model, "model", "Unknown"))
+        provider = provider_name(model)
         try:
             structured_llm = model.with_structured_output(BatchJudicialOpinion)
-            if not structured_llm:
-                continue
-                
+        except Exception as e:
+            print(f"  [LLM] {model_name} has no structured output: {str(e)[:150]}")
+            continue
+        if not structured_llm:
+            continue
+        if not breaker.allow(provider):
+            print(f"  [LLM] Skipping {model_name}: circuit open")
+            continue
+        try:
+            # Rate-limit and connection failures open the circuit at once; only malformed
+            # output or transient errors are retried against the same provider.
             @retry(
                 stop=stop_after_attempt(3),
                 wait=wait_exponential(multiplier=1, min=4, max=10),
-                retry=retry_if_exception_type(Exception),
+                retry=retry_if_exception(lambda e: not (is_rate_limit_error(e) or is_connection_error(e) or breaker.is_open(provider))),
                 reraise=True
             )
-            def invoke_with_retry(llm, sys_msg, hum_msg):
-                return llm.invoke([sys_msg, hum_msg])
+            async def invoke_with_retry(llm, sys_msg, hum_msg):
+                async with llm_slot(provider):
+                    return await breaker.call(provider, lambda: llm.ainvoke([sys_msg, hum_msg]))
 
             print(f"  [LLM] Requesting batch from {model_name}...")
-            batch_resp = invoke_with_retry(
+            batch_resp = await invoke_with_retry(
                 structured_llm,
                 SystemMessage(content=f"You are the {judge_role}."),
                 HumanMessage(content=prompt)
@@ -231,6 +144,9 @@ def get_judge_opinion(judge_role: Literal["Prosecutor", "Defense", "TechLead"],
             # Post-process to ensure IDs are correct
             for op in batch_resp.opinions:
                 op.judge = judge_role
+
+            if use_cache:
+                response_cache.put(cache_keys[id(model)], batch_resp.model_dump(), model=model_name, role=judge_role)
                 
             # Print some opinions for visibility
             for op in batch_resp.opinions[:2]:
@@ -239,10 +155,13 @@ def get_judge_opinion(judge_role: Literal["Prosecutor", "Defense", "TechLead"],
             return batch_resp.opinions
             
         except Exception as e:
-            print(f"  [LLM] {model_name} failed batch call after retries: {str(e)[:150]}")
-            if _is_rate_limit_error(e):
-                time.sleep(15) # Final wait before trying next provider
+            print(f"  [LLM] {model_name} failed batch call: {str(e)[:150]}")
+            if is_rate_limit_error(e):
+                # Hold this provider's bucket empty for everyone; move on to the next provider now
+                report_rate_limited(provider)
             continue
+        finally:
+            breaker.release(provider)
 
     # Critical Fallback: minimal scores if all providers fail
     print(f"CRITICAL: All providers failed for {judge_role}. Using minimal stub opinions.")
@@ -257,6 +176,6 @@ def get_judge_opinion(judge_role: Literal["Prosecutor", "Defense", "TechLead"],
         ) for dim in rubric_dimensions
     ]
 
-def prosecutor(state: AgentState) -> dict: return {"opinions": get_judge_opinion("Prosecutor", state)}
-def defense(state: AgentState) -> dict: return {"opinions": get_judge_opinion("Defense", state)}
-def tech_lead(state: AgentState) -> dict: return {"opinions": get_judge_opinion("TechLead", state)}
+async def prosecutor(state: AgentState) -> dict: return {"opinions": await get_judge_opinion("Prosecutor", state)}
+async def defense(state: AgentState) -> dict: return {"opinions": await get_judge_opinion("Defense", state)}
+async def tech_lead(state: AgentState) -> dict: return {"opinions": await get_judge_opinion("TechLead", state)}
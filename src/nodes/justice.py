@@ -6,13 +6,9 @@ Output: AuditReport consumed by report_writer → Markdown file (Executive Summa
 
 import json
 import os
-import time
-import random
 from typing import Dict, List, Optional, Tuple
 
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
-from langchain_groq import ChatGroq
 
 from src.state import (
     AgentState,
@@ -21,36 +17,9 @@ from src.state import (
     Evidence,
     JudicialOpinion,
 )
-
-def get_justice_llm():
-    """Returns LLMs for Layer 3 (Justice). Primary: SambaNova, Fallback: OpenRouter."""
-    llms = []
-    if os.environ.get("SAMBANOVA_KEY"):
-        llms.append(ChatOpenAI(
-            model="Meta-Llama-3.3-70B-Instruct", # Use Llama 3.3 70B for fast accurate synthesis
-            openai_api_key=os.environ["SAMBANOVA_KEY"],
-            openai_api_base="https://api.sambanova.ai/v1",
-            temperature=0,
-            request_timeout=30
-        ))
-    
-    if os.environ.get("OPENROUTER_KEY"):
-         llms.append(ChatOpenAI(
-            model="openai/gpt-4o-mini",
-            openai_api_key=os.environ["OPENROUTER_KEY"],
-            openai_api_base="https://openrouter.ai/api/v1",
-            temperature=0
-        ))
-         
-    # Ollama as absolute last resort
-    llms.append(ChatOpenAI(
-        model="llama3.1", 
-        openai_api_key="ollama", 
-        openai_api_base="http://localhost:11434/v1",
-        temperature=0
-    ))
-    return llms
-
+from src.llm.clients import fallback_chain
+from src.llm.circuit_breaker import breaker
+from src.llm.rate_limit import llm_slot, provider_name, report_rate_limited, is_rate_limit_error
 
 # ---------------------------------------------------------------------------
 # Conflict Resolution Strategy (hardcoded deterministic Python logic)
@@ -191,7 +160,7 @@ def _apply_functionality_weight(
     return (p_score + d_score + t_score) / 3.0
 
 
-def chief_justice_node(state: AgentState) -> dict:
+async def chief_justice_node(state: AgentState) -> dict:
     """
     ChiefJusticeNode: Synthesize conflict and operationalize the swarm.
     - Conflict Resolution Strategy: hardcoded deterministic rules from rubric.
@@ -337,7 +306,9 @@ def chief_justice_node(state: AgentState) -> dict:
     verified_paths = state.get("verified_paths", []) or []
     repo_manifest = state.get("repo_manifest", []) or []
     
-    summary_lines.append(f"Evidence Integrity: {len(hallucinated_paths)} hallucinations, {len(verified_paths)} verified files.")
+    ambiguous_paths = state.get("ambiguous_paths", []) or []
+    summary_lines.append(f"Evidence Integrity: {len(hallucinated_paths)} hallucinations, {len(verified_paths)} verified files"
+                         + (f", {len(ambiguous_paths)} ambiguous citations." if ambiguous_paths else "."))
     executive_summary = "\n".join(summary_lines)
 
     # Compile criterion-level remediation for the LLM
@@ -348,10 +319,9 @@ def chief_justice_node(state: AgentState) -> dict:
 
     # Metacognition: LLM Polish for Executive Summary and Remediation Plan
     print("  [Justice] LLM Synthesis starting (Layer 3)...")
-    time.sleep(1.0)
     
     from src.state import JusticeOutput 
-    justice_llms = get_justice_llm()
+    justice_llms = fallback_chain("ChiefJustice")
     executive_summary_final = executive_summary
     remediation_plan_final = detailed_remediation_context
 
@@ -373,18 +343,23 @@ def chief_justice_node(state: AgentState) -> dict:
     {detailed_remediation_context}
     """
 
-    for model in justice_llms:
-        time.sleep(1.0)
+    messages = [
+        SystemMessage(content="You are the Chief Justice. Produce a structured audit report with executive summary and concrete file-level remediation steps."),
+        HumanMessage(content=prompt)
+    ]
+    for model in breaker.available(justice_llms):
         model_name = getattr(model, "model_name", getattr(model, "model", "Unknown"))
+        provider = provider_name(model)
         try:
             structured_llm = model.with_structured_output(JusticeOutput)
-            if not structured_llm:
-                continue
-                
-            resp = structured_llm.invoke([
-                SystemMessage(content="You are the Chief Justice. Produce a structured audit report with executive summary and concrete file-level remediation steps."),
-                HumanMessage(content=prompt)
-            ])
+        except Exception as e:
+            print(f"  [Justice] {model_name} has no structured output: {str(e)[:100]}")
+            continue
+        if not structured_llm or not breaker.allow(provider):
+            continue
+        try:
+            async with llm_slot(provider):
+                resp = await breaker.call(provider, lambda: structured_llm.ainvoke(messages))
             
             if resp:
                 executive_summary_final = resp.summary
@@ -392,7 +367,11 @@ def chief_justice_node(state: AgentState) -> dict:
                 break
         except Exception as e:
             print(f"  [Justice] {model_name} failed: {str(e)[:100]}")
+            if is_rate_limit_error(e):
+                report_rate_limited(provider)
             continue
+        finally:
+            breaker.release(provider)
 
     final_report = AuditReport(
         repo_url=state["repo_url"],
@@ -403,6 +382,7 @@ def chief_justice_node(state: AgentState) -> dict:
         remediation_plan=remediation_plan_final,
         verified_paths=verified_paths,
         hallucinated_paths=hallucinated_paths,
+        ambiguous_paths=ambiguous_paths,
     )
 
     return {"final_report": final_report}
@@ -1,5 +1,5 @@
 import operator
-from typing import Annotated, Dict, List, Literal, Optional
+from typing import Annotated, Any, Dict, List, Literal, Optional
 from pydantic import BaseModel, Field
 from typing_extensions import TypedDict
 
@@ -14,6 +14,8 @@ class Evidence(BaseModel):
     location: str = Field(description="Where this was found (file path, line number, doc section)")
     rationale: str = Field(description="Your rationale for your confidence on the evidence you find for this particular goal")
     confidence: float
+    dimensions: List[str] = Field(default_factory=list, description="Rubric dimension ids this evidence supports (empty = all)")
+    metrics: Dict[str, Any] = Field(default_factory=dict, description="Machine-readable measurements behind the finding")
 
 # --- Judge Output ---
 
@@ -58,6 +60,7 @@ class AuditReport(BaseModel):
     repo_name: Optional[str] = None
     verified_paths: List[str] = Field(default_factory=list)
     hallucinated_paths: List[str] = Field(default_factory=list)
+    ambiguous_paths: List[str] = Field(default_factory=list)
 
 # --- Graph State ---
 
@@ -65,6 +68,12 @@ class AgentState(TypedDict):
     """State graph for the LangGraph agents."""
     repo_url: str
     pdf_path: str
+    clone_mode: Optional[str]
+    report_path: Optional[str]
+    fresh: Optional[bool]  # Bypass the LLM response cache
+    incremental: Optional[bool]  # Re-judge only dimensions whose evidence changed since the last audit
+    dimensions_to_judge: Optional[List[str]]  # None = all rubric dimensions
+    dimension_filter: Optional[List[str]]  # Audit only these rubric dimension ids (None = whole rubric)
     rubric_dimensions: List[Dict]
     
     # Use reducers to prevent parallel agents from overwriting data
@@ -75,6 +84,8 @@ class AgentState(TypedDict):
     repo_path: Optional[str]
     verified_paths: Annotated[List[str], operator.add]
     hallucinated_paths: Annotated[List[str], operator.add]
+    ambiguous_paths: Annotated[List[str], operator.add]  # Citations matching several files, with candidates
     repo_manifest: List[str]
+    repo_commit: Optional[str]  # HEAD SHA of the audited sandbox (keys the cached manifest)
     
     final_report: Optional[AuditReport]
@@ -0,0 +1,90 @@
+"""
+Concurrent execution of repository analyzers.
+Analyzers run in a thread pool: the expensive AST parsing happens once up front in the shared
+index (see ast_index), and git analyzers spend their time in subprocesses, so threads overlap
+them without paying to re-index the repository in every worker process. Each analyzer gets its
+own timeout; results are merged in job order, independent of completion order.
+"""
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+from src.state import Evidence
+
+ANALYZER_TIMEOUT = float(os.environ.get("AUDITOR_ANALYZER_TIMEOUT", "120"))
+ANALYZER_WORKERS = int(os.environ.get("AUDITOR_ANALYZER_WORKERS", "8"))
+# Cost classes, cheapest first: index queries, subprocess-bound work, heavy scans
+COST_CLASSES = ("cheap", "moderate", "expensive")
+
+
+class AnalyzerJob:
+    """One analyzer invocation producing Evidence. goal/location/dimensions describe it if it fails."""
+
+    def __init__(self, name: str, run: Callable[[], List[Evidence]], goal: str, location: str,
+                 dimensions: Optional[List[str]] = None, timeout: Optional[float] = None, cost: str = "cheap"):
+        self.name = name
+        self.run = run
+        self.goal = goal
+        self.location = location
+        self.dimensions = dimensions or []
+        self.timeout = timeout or ANALYZER_TIMEOUT
+        self.cost = cost
+
+    def failure(self, content: str, detective_name: str) -> Evidence:
+        return Evidence(
+            detective_name=detective_name,
+            goal=self.goal,
+            found=False,
+            content=content,
+            location=self.location,
+            dimensions=self.dimensions,
+            rationale=f"The {self.name} analyzer did not complete.",
+            confidence=0.0
+        )
+
+
+def run_analyzers(jobs: List[AnalyzerJob], detective_name: str, max_workers: int = ANALYZER_WORKERS) -> List[Evidence]:
+    """Run jobs concurrently, expensive ones first, and return their Evidence in job order."""
+    # A job that raises or exceeds its timeout (counted from when it starts running) contributes a
+    # found=False Evidence instead; timed-out threads are abandoned, not joined
+    if not jobs:
+        return []
+    started: Dict[int, float] = {}
+
+    def timed(i: int, job: AnalyzerJob) -> List[Evidence]:
+        started[i] = time.monotonic()
+        return job.run()
+
+    results: Dict[int, List[Evidence]] = {}
+    workers = max(1, min(max_workers, len(jobs)))
+    # A queued job waits for a free worker; give up on it once every wave before it could have timed out
+    waves = -(-len(jobs) // workers)
+    run_start = time.monotonic()
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analyzer")
+    try:
+        by_cost = sorted(range(len(jobs)), key=lambda i: -COST_CLASSES.index(jobs[i].cost))
+        futures = {pool.submit(timed, i, jobs[i]): i for i in by_cost}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    print(f"  [Analyzer] {jobs[i].name} failed: {e}")
+                    results[i] = [jobs[i].failure(f"{jobs[i].name} analyzer failed: {e}", detective_name)]
+            now = time.monotonic()
+            for future in list(pending):
+                i = futures[future]
+                begun = started.get(i, run_start + jobs[i].timeout * (waves - 1))
+                if now - begun > jobs[i].timeout:
+                    print(f"  [Analyzer] {jobs[i].name} timed out after {jobs[i].timeout:g}s")
+                    results[i] = [jobs[i].failure(f"{jobs[i].name} analyzer timed out after {jobs[i].timeout:g}s", detective_name)]
+                    pending.discard(future)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return [ev for i in range(len(jobs)) for ev in results[i]]
@@ -0,0 +1,83 @@
+"""
+Registry of repository analyzers.
+Each analyzer declares the rubric dimension ids it produces evidence for and its cost class, so
+the RepoInvestigator runs only what the dimensions being audited need. Built-in analyzers register
+with the @analyzer decorator; third-party packages can add more through the
+`automaton_auditor.analyzers` entry-point group (loading the entry point imports the module,
+whose decorators register its analyzers).
+"""
+
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.state import Evidence
+from src.tools.analyzer_executor import COST_CLASSES, AnalyzerJob
+
+ENTRY_POINT_GROUP = "automaton_auditor.analyzers"
+
+
+class AnalyzerSpec:
+    """A registered analyzer: fn(repo_path) -> List[Evidence], plus what it serves and costs."""
+
+    def __init__(self, name: str, fn: Callable[[str], List[Evidence]], dimensions: List[str], cost: str,
+                 goal: str, location: str, timeout: Optional[float] = None):
+        if cost not in COST_CLASSES:
+            raise ValueError(f"Unknown cost class '{cost}' for analyzer '{name}' (expected one of {COST_CLASSES})")
+        self.name = name
+        self.fn = fn
+        self.dimensions = dimensions
+        self.cost = cost
+        self.goal = goal
+        self.location = location
+        self.timeout = timeout
+
+    def job(self, repo_path: str) -> AnalyzerJob:
+        return AnalyzerJob(self.name, lambda: self.fn(repo_path), self.goal, self.location,
+                           self.dimensions, self.timeout, cost=self.cost)
+
+
+_registry: Dict[str, AnalyzerSpec] = {}
+_entry_points_loaded = False
+_lock = threading.Lock()
+
+
+def analyzer(name: str, dimensions: List[str], goal: str, cost: str = "cheap",
+             location: str = "Repository-wide scan", timeout: Optional[float] = None):
+    """Decorator registering fn(repo_path) -> List[Evidence] as a repository analyzer.
+
+    goal/location describe the placeholder Evidence emitted if the analyzer fails or times out.
+    """
+    def register(fn: Callable[[str], List[Evidence]]):
+        with _lock:
+            _registry[name] = AnalyzerSpec(name, fn, list(dimensions), cost, goal, location, timeout)
+        return fn
+    return register
+
+
+def _load_entry_points() -> None:
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    from importlib.metadata import entry_points
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            ep.load()
+        except Exception as e:
+            print(f"  [Analyzers] Failed to load plugin '{ep.name}': {e}")
+
+
+def registered_analyzers() -> List[AnalyzerSpec]:
+    """All analyzers, built-ins and plugins, in registration order."""
+    _load_entry_points()
+    with _lock:
+        return list(_registry.values())
+
+
+def select_analyzers(dimension_ids: Optional[Iterable[str]] = None) -> List[AnalyzerSpec]:
+    """Analyzers serving at least one of dimension_ids (all analyzers if None/empty)."""
+    specs = registered_analyzers()
+    wanted = set(dimension_ids or [])
+    if not wanted:
+        return specs
+    return [spec for spec in specs if wanted.intersection(spec.dimensions)]
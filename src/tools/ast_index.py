@@ -0,0 +1,244 @@
+"""
+Parsed-module index shared by the repository analyzers.
+Every Python file in a sandbox is parsed once into a compact symbol record (what it calls,
+defines and imports). Large repositories are scanned in parallel worker processes. The
+analyzers use the symbol records to locate the files they care about anywhere in the tree, and
+query the full AST (calls, class definitions, Annotated subscripts) only for those files.
+"""
+
+import ast
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Directories never worth parsing (VCS metadata, virtualenvs, caches)
+SKIP_DIRS = {".git", ".venv", "venv", "env", "node_modules", "__pycache__", ".tox", ".mypy_cache", ".auditor_cache"}
+# Repos with at least this many Python files are scanned in a process pool
+PARALLEL_MIN_FILES = int(os.environ.get("AUDITOR_INDEX_PARALLEL_MIN_FILES", "200"))
+INDEX_WORKERS = int(os.environ.get("AUDITOR_INDEX_WORKERS", "0")) or min(8, os.cpu_count() or 1)
+
+
+def node_name(node: ast.AST) -> str:
+    """Trailing identifier of a Name/Attribute expression (`a.b.StateGraph` -> `StateGraph`)."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return ""
+
+
+def _position(node: ast.AST):
+    return (getattr(node, "lineno", 0), getattr(node, "col_offset", 0))
+
+
+class ParsedModule:
+    """One Python source file, its AST and the node lookups the analyzers need."""
+
+    def __init__(self, rel_path: str, source: str):
+        self.rel_path = rel_path
+        self.source = source
+        self.tree: Optional[ast.Module] = None
+        self.error: Optional[Exception] = None
+        self.calls: Dict[str, List[ast.Call]] = {}
+        self.classes: List[ast.ClassDef] = []
+        self.functions: Dict[str, List[ast.AST]] = {}
+        self.annotated: List[ast.Subscript] = []
+        self.imports: set = set()
+        self.imported_names: set = set()
+        try:
+            self.tree = ast.parse(source, filename=rel_path)
+        except (SyntaxError, ValueError) as e:
+            self.error = e
+            return
+        self._collect()
+
+    @classmethod
+    def from_file(cls, path: str, rel_path: Optional[str] = None) -> "ParsedModule":
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return cls(rel_path or path, f.read())
+
+    def _collect(self) -> None:
+        """Single walk over the tree, bucketing the node types analyzers look up."""
+        for node in ast.walk(self.tree):
+            if isinstance(node, ast.Call):
+                self.calls.setdefault(node_name(node.func), []).append(node)
+            elif isinstance(node, ast.ClassDef):
+                self.classes.append(node)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self.functions.setdefault(node.name, []).append(node)
+            elif isinstance(node, ast.Subscript):
+                if node_name(node.value) == "Annotated":
+                    self.annotated.append(node)
+            elif isinstance(node, ast.Import):
+                self.imports.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                if node.module:
+                    self.imports.add(node.module)
+                self.imported_names.update(alias.name for alias in node.names)
+
+    def calls_to(self, *names: str) -> List[ast.Call]:
+        """Calls whose callee ends in one of names, in source order."""
+        found = [call for name in names for call in self.calls.get(name, [])]
+        return sorted(found, key=_position)
+
+    def subclasses_of(self, base: str) -> List[ast.ClassDef]:
+        """Classes with a direct base named base (`BaseModel` or `pydantic.BaseModel`)."""
+        return [cls for cls in self.classes if any(node_name(b) == base for b in cls.bases)]
+
+    def imports_module(self, name: str) -> bool:
+        """Whether the module imports name, or imports from it, or imports it from a package."""
+        return name in self.imports or name in self.imported_names
+
+    def segment(self, node: ast.AST) -> str:
+        return ast.get_source_segment(self.source, node) or ""
+
+
+class ModuleSymbols:
+    """Picklable per-file summary of what a module calls, defines and imports."""
+
+    def __init__(self, rel_path: str, error: Optional[str] = None, calls=(), class_bases=None,
+                 functions=(), imports=(), imported_names=()):
+        self.rel_path = rel_path
+        self.error = error
+        self.calls = set(calls)
+        self.class_bases: Dict[str, List[str]] = class_bases or {}
+        self.functions = set(functions)
+        self.imports = set(imports)
+        self.imported_names = set(imported_names)
+
+    @classmethod
+    def of(cls, module: ParsedModule) -> "ModuleSymbols":
+        if module.error:
+            return cls(module.rel_path, error=str(module.error))
+        return cls(
+            module.rel_path,
+            calls=(name for name in module.calls if name),
+            class_bases={c.name: [node_name(b) for b in c.bases] for c in module.classes},
+            functions=module.functions,
+            imports=module.imports,
+            imported_names=module.imported_names,
+        )
+
+    def subclasses(self, base: str) -> List[str]:
+        return [name for name, bases in self.class_bases.items() if base in bases]
+
+    def imports_module(self, name: str) -> bool:
+        return name in self.imports or name in self.imported_names
+
+
+def _scan_file(item: Tuple[str, str]) -> ModuleSymbols:
+    """Worker: parse one file and reduce it to its symbol record."""
+    full_path, rel_path = item
+    try:
+        return ModuleSymbols.of(ParsedModule.from_file(full_path, rel_path))
+    except OSError as e:
+        return ModuleSymbols(rel_path, error=str(e))
+
+
+def _pool_context():
+    # Workers must not be forked from a process running event loops and HTTP pools
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class RepoIndex:
+    """Symbol records for every Python module of one sandbox, keyed by repo-relative POSIX path.
+
+    Full ASTs are kept only for modules an analyzer asks for.
+    """
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        self.symbols: Dict[str, ModuleSymbols] = {}
+        self._modules: Dict[str, ParsedModule] = {}
+        self._built = False
+        self._lock = threading.Lock()
+
+    def ensure_built(self) -> "RepoIndex":
+        with self._lock:
+            if not self._built:
+                self._build()
+                self._built = True
+        return self
+
+    def _python_files(self) -> List[Tuple[str, str]]:
+        items = []
+        for root, dirs, files in os.walk(self.repo_path):
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+            for name in files:
+                if name.endswith(".py"):
+                    full_path = os.path.join(root, name)
+                    items.append((full_path, os.path.relpath(full_path, self.repo_path).replace(os.sep, "/")))
+        return items
+
+    def _build(self) -> None:
+        items = self._python_files()
+        if len(items) >= PARALLEL_MIN_FILES and INDEX_WORKERS > 1:
+            try:
+                chunksize = max(1, len(items) // (INDEX_WORKERS * 4))
+                with ProcessPoolExecutor(max_workers=INDEX_WORKERS, mp_context=_pool_context()) as pool:
+                    for symbols in pool.map(_scan_file, items, chunksize=chunksize):
+                        self.symbols[symbols.rel_path] = symbols
+                return
+            except (OSError, RuntimeError) as e:
+                # e.g. no semaphore support or a broken pool: scan in-process instead
+                print(f"  [AST Index] Parallel scan failed ({e}); scanning serially")
+                self.symbols.clear()
+
+        # In-process scan. Small repos keep their ASTs (analyzers will need some of them);
+        # large ones keep only symbol records, like the parallel scan
+        keep_trees = len(items) < PARALLEL_MIN_FILES
+        for full_path, rel_path in items:
+            try:
+                module = ParsedModule.from_file(full_path, rel_path)
+            except OSError:
+                continue
+            if keep_trees:
+                self._modules[rel_path] = module
+            self.symbols[rel_path] = ModuleSymbols.of(module)
+
+    def module(self, rel_path: str) -> Optional[ParsedModule]:
+        """Full parsed module for an indexed file (parsed on first request when scanned in parallel)."""
+        if rel_path not in self.symbols:
+            return None
+        with self._lock:
+            module = self._modules.get(rel_path)
+            if module is None:
+                try:
+                    module = ParsedModule.from_file(os.path.join(self.repo_path, rel_path), rel_path)
+                except OSError:
+                    return None
+                self._modules[rel_path] = module
+            return module
+
+    def find(self, predicate: Callable[[ModuleSymbols], bool]) -> List[str]:
+        """Paths of parseable modules whose symbols satisfy predicate, sorted."""
+        return sorted(path for path, symbols in self.symbols.items() if not symbols.error and predicate(symbols))
+
+    def modules_where(self, predicate: Callable[[ModuleSymbols], bool]) -> List[ParsedModule]:
+        return [m for m in (self.module(path) for path in self.find(predicate)) if m is not None]
+
+    def __iter__(self) -> Iterator[ModuleSymbols]:
+        return iter(self.symbols.values())
+
+
+_indexes: Dict[str, RepoIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_repo_index(repo_path: str) -> RepoIndex:
+    """The shared index for a sandbox, parsed on first use."""
+    key = os.path.realpath(repo_path)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = RepoIndex(repo_path)
+    return index.ensure_built()
+
+
+def drop_repo_index(repo_path: str) -> None:
+    """Forget a sandbox's index (called when the sandbox is removed)."""
+    with _indexes_lock:
+        _indexes.pop(os.path.realpath(repo_path), None)
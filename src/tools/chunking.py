@@ -0,0 +1,176 @@
+"""
+Structure-aware chunking of Docling markdown for retrieval.
+The exported markdown keeps Docling's document hierarchy: section headings, pipe tables, and
+figure captions following `<!-- image -->` placeholders. Chunks are packed from those blocks up to a
+token budget (under MiniLM's 256-token window), never split a table row or a sentence unless it
+alone exceeds the budget, and carry their section path ("3 Architecture > 3.2 State") both as
+metadata and as a prefix of the embedded text.
+"""
+
+import os
+import re
+from typing import Iterator, List, NamedTuple, Tuple
+
+# Wordpiece budget per chunk, including the section-path prefix (MiniLM keeps 256 with [CLS]/[SEP])
+CHUNK_TOKENS = int(os.environ.get("AUDITOR_CHUNK_TOKENS", "200"))
+# Tokens of trailing context repeated at the start of the next chunk within a section
+CHUNK_OVERLAP_TOKENS = int(os.environ.get("AUDITOR_CHUNK_OVERLAP_TOKENS", "40"))
+# Letters / digits per wordpiece counted beyond a word's first piece. BERT's vocabulary keeps
+# common words whole but splits rare and technical ones (`pydantic` -> p ##yd ##antic)
+LETTERS_PER_PIECE = 6
+DIGITS_PER_PIECE = 3
+
+# Letter runs, digit runs, and single punctuation marks (BERT splits `_` and `-` off identifiers)
+TOKEN_PATTERN = re.compile(r"[^\W\d_]+|\d+|[^\w\s]|_")
+HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+# Docling often flattens heading levels; numbered headings ("3.2 State") still carry the depth
+SECTION_NUMBER = re.compile(r"^(\d+(?:\.\d+)*)\.?\s")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])")
+IMAGE_PLACEHOLDER = "<!-- image -->"
+
+
+def count_tokens(text: str) -> int:
+    """Wordpiece estimate for MiniLM's tokenizer; errs high so a chunk never overflows the window."""
+    total = 0
+    for piece in TOKEN_PATTERN.findall(text):
+        if piece[0].isdigit():
+            total += 1 + (len(piece) - 1) // DIGITS_PER_PIECE
+        elif piece[0].isalpha():
+            total += 1 + (len(piece) - 1) // LETTERS_PER_PIECE
+        else:
+            total += 1
+    return total
+
+
+class Chunk(NamedTuple):
+    text: str  # Section path prefix + body; what gets embedded
+    section: str  # "Heading > Subheading", empty before the first heading
+    tokens: int
+
+
+class _Unit(NamedTuple):
+    text: str
+    tokens: int
+    kind: str  # "text" or "table"
+
+
+def _heading_level(marks: str, title: str) -> int:
+    number = SECTION_NUMBER.match(title)
+    return number.group(1).count(".") + 1 if number else len(marks)
+
+
+def _blocks(markdown: str) -> Iterator[Tuple[Tuple[str, ...], str, str]]:
+    """(section path, kind, text) for each paragraph, list, table or caption, in document order."""
+    path: List[Tuple[int, str]] = []
+    lines: List[str] = []
+    kind = "text"
+
+    def section():
+        return tuple(title for _, title in path)
+
+    def emit():
+        text = "\n".join(lines).strip()
+        lines.clear()
+        return (section(), kind, text) if re.search(r"\w", text) else None
+
+    for raw in markdown.splitlines():
+        line = raw.rstrip()
+        stripped = line.strip()
+        heading = HEADING.match(stripped)
+        is_table = stripped.startswith("|")
+        if heading or not stripped or stripped == IMAGE_PLACEHOLDER or (lines and is_table != (kind == "table")):
+            block = emit() if lines else None
+            if block:
+                yield block
+        if heading:
+            level = _heading_level(heading.group(1), heading.group(2))
+            while path and path[-1][0] >= level:
+                path.pop()
+            path.append((level, heading.group(2)))
+            continue
+        if not stripped or stripped == IMAGE_PLACEHOLDER:
+            continue
+        kind = "table" if is_table else "text"
+        lines.append(line)
+    block = emit() if lines else None
+    if block:
+        yield block
+
+
+def _split_words(text: str, budget: int) -> Iterator[str]:
+    words = text.split()
+    piece: List[str] = []
+    for word in words:
+        if piece and count_tokens(" ".join(piece + [word])) > budget:
+            yield " ".join(piece)
+            piece = []
+        piece.append(word)
+    if piece:
+        yield " ".join(piece)
+
+
+def _units(kind: str, text: str, budget: int) -> Iterator[_Unit]:
+    """Split a block into pieces no larger than budget: tables by rows (header repeated), text by sentences."""
+    tokens = count_tokens(text)
+    if tokens <= budget:
+        yield _Unit(text, tokens, kind)
+        return
+    if kind == "table":
+        rows = text.splitlines()
+        header = rows[:2] if len(rows) > 1 and set(rows[1].replace("|", "").strip()) <= set("-: ") else rows[:1]
+        body, rows_budget = [], budget - count_tokens("\n".join(header))
+        for row in rows[len(header):]:
+            if body and count_tokens("\n".join(body + [row])) > rows_budget:
+                table = "\n".join(header + body)
+                yield _Unit(table, count_tokens(table), kind)
+                body = []
+            body.append(row)
+        if body:
+            table = "\n".join(header + body)
+            yield _Unit(table, count_tokens(table), kind)
+        return
+    for sentence in SENTENCE_END.split(text):
+        for piece in ([sentence] if count_tokens(sentence) <= budget else _split_words(sentence, budget)):
+            yield _Unit(piece, count_tokens(piece), "text")
+
+
+def chunk_markdown(markdown: str, max_tokens: int = CHUNK_TOKENS, overlap_tokens: int = CHUNK_OVERLAP_TOKENS) -> List[Chunk]:
+    """Pack the document's blocks into chunks of at most ~max_tokens that never span two sections."""
+    chunks: List[Chunk] = []
+    current: List[_Unit] = []
+    current_section = ""
+
+    def budget_for(section: str) -> int:
+        return max(16, max_tokens - count_tokens(section))
+
+    def flush(carry_overlap: bool) -> None:
+        nonlocal current
+        if not current:
+            return
+        body = "\n\n".join(unit.text for unit in current)
+        text = f"{current_section}\n{body}" if current_section else body
+        chunks.append(Chunk(text, current_section, count_tokens(text)))
+        carried: List[_Unit] = []
+        if carry_overlap and overlap_tokens > 0:
+            # Trailing prose (never tables) repeated as context for the next chunk
+            for unit in reversed(current):
+                if unit.kind == "table" or sum(u.tokens for u in carried) + unit.tokens > overlap_tokens:
+                    break
+                carried.insert(0, unit)
+        current = carried
+
+    for path, kind, text in _blocks(markdown):
+        section = " > ".join(path)
+        if section != current_section:
+            flush(carry_overlap=False)
+            current_section = section
+        budget = budget_for(current_section)
+        for unit in _units(kind, text, budget):
+            used = sum(u.tokens for u in current)
+            if current and used + unit.tokens > budget:
+                flush(carry_overlap=True)
+                if sum(u.tokens for u in current) + unit.tokens > budget:
+                    current = []
+            current.append(unit)
+    flush(carry_overlap=False)
+    return chunks
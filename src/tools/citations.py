@@ -0,0 +1,62 @@
+"""
+File-path citation extraction for the hallucination filter.
+The path pattern is compiled once; each Evidence is scanned in a single pass over its location and
+content, and the result is cached by a hash of that text, so re-aggregating after an incremental
+update only rescans evidence whose text changed.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from src.incremental import flatten_evidence
+from src.state import Evidence
+
+# File paths with a known extension. The lookbehind (instead of \b) keeps a leading '.' so
+# `.github/workflows/ci.yml` is not truncated to `github/...`; the extension list avoids
+# catching version numbers.
+PATH_PATTERN = re.compile(
+    r"(?<![\w\-./])[\w\-./]+\.(?:py|md|json|pdf|png|toml|yaml|txt|js|ts|yml|env\.example|sh|lock)\b"
+)
+# Scanned evidence items remembered (by hash of location and content)
+MAX_CACHED_SCANS = 4096
+
+_scans: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def normalize_citation(path: str) -> str:
+    while path.startswith("./"):
+        path = path[2:]
+    return path.lstrip("/")
+
+
+def scan_evidence(ev: Evidence) -> Tuple[str, ...]:
+    """Distinct normalized paths cited by one Evidence (location and content), in order of appearance."""
+    # Not evidence_hash: that fingerprints LLM-generated evidence by its inputs, not its text
+    text = f"{ev.location}\n{ev.content or ''}"
+    key = hashlib.sha256(text.encode("utf-8", errors="surrogatepass")).hexdigest()
+    with _lock:
+        cached = _scans.get(key)
+        if cached is not None:
+            _scans.move_to_end(key)
+            return cached
+
+    paths = tuple(dict.fromkeys(normalize_citation(m.group(0)) for m in PATH_PATTERN.finditer(text)))
+
+    with _lock:
+        _scans[key] = paths
+        if len(_scans) > MAX_CACHED_SCANS:
+            _scans.popitem(last=False)
+    return paths
+
+
+def extract_citations(evidences: Dict[str, List[Evidence]]) -> Dict[str, List[int]]:
+    """Every cited path mapped to the IDs of the evidence citing it (the numbering the judges see)."""
+    sources: Dict[str, List[int]] = {}
+    for evidence_id, ev in enumerate(flatten_evidence(evidences)):
+        for path in scan_evidence(ev):
+            sources.setdefault(path, []).append(evidence_id)
+    return sources
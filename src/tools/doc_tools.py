@@ -1,87 +1,392 @@
+import hashlib
+import json
 import os
 import shutil
-from typing import List, Optional
-from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from typing import TYPE_CHECKING, List, Optional
+
+from src.tools.chunking import CHUNK_TOKENS, chunk_markdown
+
+if TYPE_CHECKING:
+    from langchain_community.vectorstores import FAISS
 
 # Configuration for Vector DB
-FAISS_PATH = "faiss_index"
+CACHE_ROOT = os.environ.get("AUDITOR_CACHE_DIR", ".auditor_cache")
+# One write-once FAISS index per (embedding model, PDF content) namespace
+VECTOR_STORE_DIR = os.path.join(CACHE_ROOT, "vectors")
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# Bump when chunking changes so existing namespaces are rebuilt
+NAMESPACE_VERSION = 3
+# Quantized IVF index over every published namespace (cross-cohort lookups, see vector_index.py).
+# A symlink to the current generation (`corpus.gen-*`), so a rebuild is published by one os.replace
+CORPUS_INDEX_DIR = os.path.join(CACHE_ROOT, "corpus")
+CORPUS_GENERATION_PREFIX = "corpus.gen-"
+# Reports embedded and appended per corpus segment
+CORPUS_BATCH_REPORTS = 500
+# Retrain the inverted lists once the corpus outgrows its training sample by this factor
+CORPUS_RETRAIN_GROWTH = 16
+# Namespaces kept loaded in memory per process
+MAX_OPEN_NAMESPACES = int(os.environ.get("AUDITOR_MAX_OPEN_NAMESPACES", "16"))
+SIMULATED_NAMESPACE = "simulated"
+
+# The sentence-transformers/torch stack is only loaded when a PDF is actually ingested or queried
+_embeddings = None
+_embeddings_lock = threading.Lock()
+
+def get_embeddings():
+    """The shared embedding model, initialized on first use."""
+    global _embeddings
+    with _embeddings_lock:
+        if _embeddings is None:
+            from langchain_huggingface import HuggingFaceEmbeddings
+            _embeddings = _with_cache(HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL))
+        return _embeddings
+
+def _with_cache(model):
+    """Wrap the model with the persistent embedding cache (needs NumPy; disable with AUDITOR_EMBEDDING_CACHE=0)."""
+    from src.tools.embedding_cache import EMBEDDING_CACHE_ENABLED, CachedEmbeddings
+    if not EMBEDDING_CACHE_ENABLED:
+        return model
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print("Warning: numpy not installed; embedding cache disabled.")
+        return model
+    return CachedEmbeddings(model, EMBEDDING_MODEL)
 
-# Initialize embeddings once
-embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+def document_namespace(file_path: str) -> str:
+    """Namespace of a PDF: SHA-256 of its bytes (plus model and chunking version), so identical reports share one index."""
+    if not os.path.exists(file_path):
+        return SIMULATED_NAMESPACE
+    digest = hashlib.sha256(f"{EMBEDDING_MODEL}\0{NAMESPACE_VERSION}\0".encode())
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
-def get_vector_store() -> Optional[FAISS]:
-    """Load the persistent vector store if it exists."""
-    if os.path.exists(FAISS_PATH):
+def namespace_path(namespace: str) -> str:
+    return os.path.join(VECTOR_STORE_DIR, namespace[:2], namespace)
+
+class VectorStoreHandle:
+    """In-process handle on one namespace's FAISS index.
+
+    Namespaces are write-once: publish() builds the index in a private store and moves it into
+    place with an atomic directory rename. A published index is never modified again, so any
+    number of audits can read it concurrently without locks. Builds of one namespace are
+    serialized in-process by `build_lock`; across processes, whichever copy is renamed into
+    place first wins and the others adopt it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.store: Optional["FAISS"] = None
+        self.records: List[dict] = []  # {"text", "section"} per chunk, in index order
+        self.build_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    @property
+    def published(self) -> bool:
+        return os.path.exists(os.path.join(self.path, "index.faiss"))
+
+    def open(self) -> Optional["FAISS"]:
+        """The loaded store, or None if nothing has been built or published yet."""
+        with self._lock:
+            if self.store is not None or not self.published:
+                return self.store
+            try:
+                from langchain_community.vectorstores import FAISS
+                self.store = FAISS.load_local(self.path, get_embeddings(), allow_dangerous_deserialization=True)
+            except Exception as e:
+                print(f"Error loading FAISS index: {e}")
+            return self.store
+
+    def chunk_records(self) -> List[dict]:
+        """{"text", "section"} for each chunk in the published namespace."""
+        if self.records or not self.published:
+            return list(self.records)
+        try:
+            with open(os.path.join(self.path, "chunks.json"), "r") as f:
+                records = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return []
+        # Namespaces published before structure-aware chunking stored bare strings
+        return [{"text": r, "section": ""} if isinstance(r, str) else r for r in records]
+
+    def chunks(self) -> List[str]:
+        """Texts in the published namespace."""
+        return [record["text"] for record in self.chunk_records()]
+
+    def publish(self, texts: List[str], metadatas: Optional[List[dict]] = None, persist: bool = True) -> None:
+        """Embed texts into a new store and publish it; does nothing if the namespace is already published.
+
+        With persist=False the store is only kept in this handle (never written to disk).
+        Callers hold `build_lock` so concurrent audits of one PDF build it once.
+        """
+        if not texts or self.published:
+            return
+        from langchain_community.vectorstores import FAISS
+        metadatas = metadatas or [{} for _ in texts]
+        store = FAISS.from_texts(texts, get_embeddings(), metadatas=metadatas)
+        records = [{"text": text, "section": meta.get("section", "")} for text, meta in zip(texts, metadatas)]
+        if not persist:
+            with self._lock:
+                self.store, self.records = store, records
+            return
+        parent = os.path.dirname(self.path)
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".staging_", dir=parent)
         try:
-            return FAISS.load_local(FAISS_PATH, embeddings, allow_dangerous_deserialization=True)
-        except Exception as e:
-            print(f"Error loading FAISS index: {e}")
-    return None
+            store.save_local(staging)
+            with open(os.path.join(staging, "chunks.json"), "w") as f:
+                json.dump(records, f)
+            os.rename(staging, self.path)
+        except OSError:
+            if not self.published:
+                raise
+            # Published concurrently by another process; open() loads that copy instead
+            store, records = None, []
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        with self._lock:
+            self.store, self.records = store, records
+
+    def close(self) -> None:
+        with self._lock:
+            self.store = None
+            self.records = []
+
+    def search_many(self, queries: List[str], k: int = 3) -> List[list]:
+        """Top-k documents for each query; all queries are embedded in one batched model call."""
+        store = self.open()
+        if store is None:
+            return [[] for _ in queries]
+        vectors = embed_queries(queries)
+        with self._lock:
+            return [store.similarity_search_by_vector(vector, k=k) for vector in vectors]
+
+
+_handles: "OrderedDict[str, VectorStoreHandle]" = OrderedDict()
+_handles_lock = threading.Lock()
+
+def open_vector_store(namespace: str) -> VectorStoreHandle:
+    """The process-wide handle for a namespace; least recently used handles are closed beyond MAX_OPEN_NAMESPACES."""
+    with _handles_lock:
+        handle = _handles.get(namespace)
+        if handle is None:
+            handle = _handles[namespace] = VectorStoreHandle(namespace_path(namespace))
+            evicted = [_handles.popitem(last=False)[1] for _ in range(len(_handles) - MAX_OPEN_NAMESPACES)]
+        else:
+            _handles.move_to_end(namespace)
+            evicted = []
+    for old in evicted:
+        old.close()
+    return handle
+
+def embed_queries(queries: List[str]) -> List[List[float]]:
+    """Embed several queries in one call (MiniLM embeds queries and documents identically)."""
+    embeddings = get_embeddings()
+    if hasattr(embeddings, "embed_queries"):
+        return embeddings.embed_queries(queries)
+    return embeddings.embed_documents(queries)
+
+def get_vector_store(namespace: str) -> Optional["FAISS"]:
+    """Load a namespace's vector store if it has been published."""
+    return open_vector_store(namespace).open()
 
 def clear_vector_store():
-    """Wipe the local vector database."""
-    if os.path.exists(FAISS_PATH):
-        shutil.rmtree(FAISS_PATH)
+    """Delete every vector namespace. Never needed between audits; namespaces are isolated per PDF."""
+    with _handles_lock:
+        _handles.clear()
+    if os.path.exists(VECTOR_STORE_DIR):
+        shutil.rmtree(VECTOR_STORE_DIR)
         print("Vector store cleared.")
 
-def ingest_pdf(file_path: str) -> List[str]:
-    """Ingest and chunk a PDF using Docling, then add to Vector Store."""
-    print(f"Ingesting PDF with Docling: {file_path}")
-    chunks = []
-    
-    try:
-        from docling.document_converter import DocumentConverter
-        converter = DocumentConverter()
-        
-        # Parse document if it exists, otherwise generate simulated robust chunks
-        if os.path.exists(file_path):
-            result = converter.convert(file_path)
-            doc_text = result.document.export_to_markdown()
-            # Simple paragraph chunking
-            chunks = [p.strip() for p in doc_text.split('\n\n') if len(p.strip()) > 50]
-        else:
-            print(f"File {file_path} not found. Generating simulated robust chunks.")
-            chunks = [
-                "Project Overview: The project requires specific architectural adherence.",
-                "Dependency Management: Ensure 'uv' is used for lockfiles and syncing.",
-                "Graph Architecture: The system must implement a strict fan-out to standard judges and fan-in to an aggregator."
-            ]
-    except ImportError:
-        print("Docling not available in this environment. Using simulated chunks.")
-        chunks = [
-            "Project Overview: The project requires specific architectural adherence.",
-            "Dependency Management: Ensure 'uv' is used for lockfiles and syncing.",
-            "Graph Architecture: The system must implement a strict fan-out to standard judges and fan-in to an aggregator."
-        ]
-        
-    # Store in FAISS
-    vector_store = get_vector_store()
-    if vector_store:
-        vector_store.add_texts(chunks)
-    else:
-        vector_store = FAISS.from_texts(chunks, embeddings)
-    
-    vector_store.save_local(FAISS_PATH)
+def _published_namespaces() -> List[str]:
+    """Namespaces of real PDFs that have been ingested, in a stable order."""
+    namespaces = []
+    if not os.path.isdir(VECTOR_STORE_DIR):
+        return namespaces
+    for shard in sorted(os.listdir(VECTOR_STORE_DIR)):
+        shard_dir = os.path.join(VECTOR_STORE_DIR, shard)
+        if not os.path.isdir(shard_dir):
+            continue
+        for namespace in sorted(os.listdir(shard_dir)):
+            if namespace != SIMULATED_NAMESPACE and os.path.exists(os.path.join(shard_dir, namespace, "chunks.json")):
+                namespaces.append(namespace)
+    return namespaces
+
+def _corpus_rows(namespaces: List[str]):
+    """(vectors, records) for the chunks of the given namespaces; vectors come from the embedding cache when present."""
+    texts, records = [], []
+    for namespace in namespaces:
+        for i, chunk in enumerate(open_vector_store(namespace).chunk_records()):
+            texts.append(chunk["text"])
+            records.append({"namespace": namespace, "chunk": i, **chunk})
+    return (get_embeddings().embed_documents(texts) if texts else []), records
+
+def _append_to_corpus(index, namespaces: List[str]) -> None:
+    """Embed and append the namespaces' chunks, one segment per CORPUS_BATCH_REPORTS reports."""
+    for start in range(0, len(namespaces), CORPUS_BATCH_REPORTS):
+        batch = namespaces[start:start + CORPUS_BATCH_REPORTS]
+        vectors, records = _corpus_rows(batch)
+        added = index.add(vectors, records, sources=batch)
+        print(f"Corpus index: +{added} chunks from {len(batch)} reports ({index.rows} total).")
+
+@contextmanager
+def _corpus_lock():
+    """Exclusive lock over the corpus across processes and index generations (appends and rebuilds)."""
+    import fcntl
+    os.makedirs(CACHE_ROOT, exist_ok=True)
+    with open(f"{CORPUS_INDEX_DIR}.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _open_corpus():
+    """The current corpus generation, pinned to its real directory so a later swap never mixes generations."""
+    from src.tools.vector_index import QuantizedIndex
+    return QuantizedIndex.open(os.path.realpath(CORPUS_INDEX_DIR))
+
+def _publish_corpus(generation: str) -> None:
+    """Point CORPUS_INDEX_DIR at a new generation with a single atomic rename, then drop the old ones."""
+    parent = os.path.dirname(os.path.abspath(CORPUS_INDEX_DIR))
+    link = f"{CORPUS_INDEX_DIR}.{os.getpid()}.link"
+    if os.path.lexists(link):
+        os.remove(link)
+    os.symlink(os.path.basename(generation), link)
+    if os.path.isdir(CORPUS_INDEX_DIR) and not os.path.islink(CORPUS_INDEX_DIR):
+        # One-time migration from the plain directory of older versions (os.replace cannot overwrite it)
+        os.rename(CORPUS_INDEX_DIR, os.path.join(parent, f"{CORPUS_GENERATION_PREFIX}legacy"))
+    os.replace(link, CORPUS_INDEX_DIR)
+    # Readers holding a retired generation keep their memory maps (the files are only unlinked)
+    for name in os.listdir(parent):
+        path = os.path.join(parent, name)
+        if name.startswith(CORPUS_GENERATION_PREFIX) and path != os.path.abspath(generation):
+            shutil.rmtree(path, ignore_errors=True)
+
+def build_report_corpus(rebuild: bool = False):
+    """Append every newly ingested report to the corpus index (QuantizedIndex), or retrain it from scratch.
+
+    Returns the index, or None if no report has been ingested yet.
+    """
+    from src.tools.vector_index import MAX_TRAINING_ROWS, QuantizedIndex
+    # Held across the whole append or rebuild: a concurrent run waits, then sees the result
+    with _corpus_lock():
+        namespaces = _published_namespaces()
+        index = _open_corpus()
+        if index is not None and not rebuild:
+            trained = index.meta.get("trained_rows", 0)
+            if index.meta.get("model") != EMBEDDING_MODEL:
+                rebuild = True
+            elif trained < MAX_TRAINING_ROWS and index.rows > CORPUS_RETRAIN_GROWTH * max(trained, 1):
+                print(f"Corpus index outgrew its {trained}-row training sample; retraining.")
+                rebuild = True
+        if index is not None and not rebuild:
+            # The index's own writer lock also excludes direct QuantizedIndex.add() callers
+            with index.writer():
+                index.reload()
+                indexed = index.sources()
+                _append_to_corpus(index, [ns for ns in namespaces if ns not in indexed])
+            return index
+
+        if not namespaces:
+            return index
+        # Build a new generation beside the live one; readers keep using the old one until the swap
+        generation = os.path.join(os.path.dirname(os.path.abspath(CORPUS_INDEX_DIR)),
+                                  f"{CORPUS_GENERATION_PREFIX}{os.getpid()}-{time.time_ns()}")
+        # Namespaces are content hashes, so any prefix of them is an unbiased sample of reports
+        sample_namespaces, sample_rows = [], 0
+        for namespace in namespaces:
+            sample_namespaces.append(namespace)
+            sample_rows += len(open_vector_store(namespace).chunks())
+            if sample_rows >= MAX_TRAINING_ROWS:
+                break
+        sample, _ = _corpus_rows(sample_namespaces)
+        # Nothing may append to the retiring generation while its replacement is built
+        with index.writer() if index is not None else nullcontext():
+            index = QuantizedIndex.create(generation, sample, model=EMBEDDING_MODEL)
+            _append_to_corpus(index, namespaces)
+            _publish_corpus(generation)
+        return index
+
+def search_report_corpus(queries: List[str], k: int = 5, nprobe: Optional[int] = None) -> List[List[dict]]:
+    """Most similar chunks across every indexed report, per query: {score, namespace, chunk, text}."""
+    from src.tools.vector_index import DEFAULT_NPROBE
+    index = _open_corpus()
+    if index is None or not index.rows:
+        return [[] for _ in queries]
+    hits = index.search(embed_queries(queries), k=k, nprobe=nprobe or DEFAULT_NPROBE)
+    return [[{"score": score, **record} for score, record in per_query] for per_query in hits]
+
+SIMULATED_CHUNKS = [
+    "Project Overview: The project requires specific architectural adherence.",
+    "Dependency Management: Ensure 'uv' is used for lockfiles and syncing.",
+    "Graph Architecture: The system must implement a strict fan-out to standard judges and fan-in to an aggregator."
+]
+
+def ingest_pdf(file_path: str, namespace: Optional[str] = None) -> List[str]:
+    """Ingest and chunk a PDF using Docling into its own namespace; a PDF already ingested is reused as-is."""
+    namespace = namespace or document_namespace(file_path)
+    handle = open_vector_store(namespace)
+    # A concurrent audit of the same PDF waits here and then reuses what the first one published
+    with handle.build_lock:
+        if handle.published or handle.records:
+            print(f"Reusing vector namespace {namespace[:12]} for {file_path}")
+            return handle.chunks()
+
+        print(f"Ingesting PDF with Docling: {file_path}")
+        chunks = []
+        sections = []
+        simulated = False
+
+        try:
+            from src.tools.pdf_convert import convert_pdf
+
+            # Parse document if it exists, otherwise generate simulated robust chunks
+            if os.path.exists(file_path):
+                # Converted by the shared Docling worker pool; cached by PDF SHA-256
+                doc_text = convert_pdf(file_path)
+                # Section-aware chunks packed to the embedding model's token budget
+                structured = chunk_markdown(doc_text)
+                chunks = [chunk.text for chunk in structured]
+                sections = [chunk.section for chunk in structured]
+                print(f"  {len(chunks)} chunks (~{CHUNK_TOKENS} tokens max) across {len(set(sections))} sections")
+            else:
+                print(f"File {file_path} not found. Generating simulated robust chunks.")
+                chunks, simulated = list(SIMULATED_CHUNKS), True
+        except ImportError:
+            print("Docling not available in this environment. Using simulated chunks.")
+            chunks, simulated = list(SIMULATED_CHUNKS), True
+
+        # Store in FAISS; the handle stays loaded for the queries that follow. Namespaces are
+        # permanent and feed the report corpus, so a real PDF's never holds placeholder chunks.
+        handle.publish(chunks, metadatas=[{"section": section} for section in sections] or None,
+                       persist=not simulated or namespace == SIMULATED_NAMESPACE)
     return chunks
 
-def query_vector_store(query: str, k: int = 3) -> str:
-    """Search the vector store for relevant document chunks."""
-    vector_store = get_vector_store()
-    if not vector_store:
-        return "Vector store not initialized. No documentation found."
-        
-    results = vector_store.similarity_search(query, k=k)
-    
-    if not results:
-        return "No relevant information found in documentation."
-    
-    return "\n---\n".join([r.page_content for r in results])
-
-def query_pdf(query: str, chunks: List[str]) -> str:
-    """Backward compatible stub."""
-    return query_vector_store(query)
+def query_vector_store(query: str, namespace: str, k: int = 3) -> str:
+    """Search a namespace's vector store for relevant document chunks."""
+    return query_vector_store_many([query], namespace, k=k)[0]
+
+def query_vector_store_many(queries: List[str], namespace: str, k: int = 3) -> List[str]:
+    """Search a namespace for several queries with one index load and one batched embedding."""
+    handle = open_vector_store(namespace)
+    if handle.open() is None:
+        return ["Vector store not initialized. No documentation found." for _ in queries]
+
+    answers = []
+    for results in handle.search_many(queries, k=k):
+        if not results:
+            answers.append("No relevant information found in documentation.")
+        else:
+            answers.append("\n---\n".join([r.page_content for r in results]))
+    return answers
 
 
 def extract_images_from_pdf(path: str) -> List[str]:
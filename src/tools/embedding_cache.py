@@ -0,0 +1,160 @@
+"""
+Persistent embedding cache for PDF chunks and retrieval queries.
+Vectors are keyed by sha256(model name, text) and stored per model as an append-only float32
+matrix (`vectors.f32`, memory-mapped for reads) with a parallel file of 32-byte keys (`keys.bin`).
+Re-ingesting an unchanged or lightly edited report only embeds the new chunks, and boilerplate
+shared across submissions is embedded once per host.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+CACHE_ROOT = os.environ.get("AUDITOR_CACHE_DIR", ".auditor_cache")
+EMBEDDING_CACHE_DIR = os.path.join(CACHE_ROOT, "embeddings")
+EMBEDDING_CACHE_ENABLED = os.environ.get("AUDITOR_EMBEDDING_CACHE", "1") != "0"
+KEY_BYTES = 32  # sha256 digest
+
+
+def embedding_key(model_name: str, text: str, kind: str = "document") -> bytes:
+    """Cache key of one text; queries get their own namespace since some models embed them differently."""
+    return hashlib.sha256(f"{model_name}\0{kind}\0{text}".encode("utf-8", errors="surrogatepass")).digest()
+
+
+class EmbeddingStore:
+    """Append-only on-disk vector table for one embedding model.
+
+    Row i of `vectors.f32` belongs to key i of `keys.bin`. Writers append under an exclusive file
+    lock; readers map whatever complete rows exist, so concurrent audits share one cache.
+    """
+
+    def __init__(self, model_name: str, root: str = EMBEDDING_CACHE_DIR):
+        self.model_name = model_name
+        self.dir = os.path.join(root, re.sub(r"[^\w.-]+", "_", model_name))
+        self.keys_path = os.path.join(self.dir, "keys.bin")
+        self.vectors_path = os.path.join(self.dir, "vectors.f32")
+        self.meta_path = os.path.join(self.dir, "meta.json")
+        self.dim: Optional[int] = None
+        self._index: Dict[bytes, int] = {}
+        self._vectors = None  # np.memmap over the first len(self._index) rows
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @contextmanager
+    def _file_lock(self):
+        import fcntl
+        os.makedirs(self.dir, exist_ok=True)
+        with open(os.path.join(self.dir, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _complete_rows(self) -> int:
+        """Rows present in both files (a crashed writer can leave a partial tail in either)."""
+        try:
+            keys = os.path.getsize(self.keys_path) // KEY_BYTES
+            vectors = os.path.getsize(self.vectors_path) // (4 * self.dim)
+        except OSError:
+            return 0
+        return min(keys, vectors)
+
+    def _refresh(self) -> None:
+        """Index rows appended since the last refresh, by this or another process."""
+        import numpy as np
+        if self.dim is None:
+            try:
+                with open(self.meta_path, "r") as f:
+                    self.dim = int(json.load(f)["dim"])
+            except (OSError, ValueError, KeyError):
+                return
+        rows = self._complete_rows()
+        known = len(self._index)
+        if rows <= known:
+            return
+        with open(self.keys_path, "rb") as f:
+            f.seek(known * KEY_BYTES)
+            data = f.read((rows - known) * KEY_BYTES)
+        for i in range(rows - known):
+            self._index.setdefault(data[i * KEY_BYTES:(i + 1) * KEY_BYTES], known + i)
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+    def lookup(self, keys: List[bytes]) -> List[Optional[List[float]]]:
+        """Cached vector for each key, or None where it has not been embedded yet."""
+        with self._lock:
+            if any(key not in self._index for key in keys):
+                self._refresh()
+            return [self._vectors[self._index[key]].tolist() if key in self._index else None for key in keys]
+
+    def add(self, keys: List[bytes], vectors: List[List[float]]) -> None:
+        """Append new vectors; keys already stored (e.g. by a concurrent audit) are skipped."""
+        import numpy as np
+        if not keys:
+            return
+        matrix = np.asarray(vectors, dtype=np.float32)
+        with self._lock, self._file_lock():
+            self._refresh()
+            if self.dim is None:
+                self.dim = int(matrix.shape[1])
+                tmp_path = f"{self.meta_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump({"model": self.model_name, "dim": self.dim}, f)
+                os.replace(tmp_path, self.meta_path)
+            elif matrix.shape[1] != self.dim:
+                print(f"  [EmbeddingCache] {self.model_name} returned {matrix.shape[1]}-d vectors, cache holds {self.dim}-d; not caching.")
+                return
+            fresh: Dict[bytes, int] = {}
+            for i, key in enumerate(keys):
+                if key not in self._index:
+                    fresh.setdefault(key, i)
+            if not fresh:
+                return
+            rows = len(self._index)
+            # Vectors first, then keys: a row only becomes visible once its key is written.
+            # Truncating drops any partial tail a crashed writer left behind.
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(rows * 4 * self.dim)
+                f.write(matrix[list(fresh.values())].tobytes())
+            with open(self.keys_path, "ab") as f:
+                f.truncate(rows * KEY_BYTES)
+                f.write(b"".join(fresh))
+            self._refresh()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only sends texts missing from the EmbeddingStore to the model."""
+
+    def __init__(self, underlying: Embeddings, model_name: str, store: Optional[EmbeddingStore] = None):
+        self.underlying = underlying
+        self.model_name = model_name
+        self.store = store or EmbeddingStore(model_name)
+
+    def _embed(self, texts: List[str], kind: str, compute: Callable[[List[str]], List[List[float]]]) -> List[List[float]]:
+        keys = [embedding_key(self.model_name, text, kind) for text in texts]
+        vectors = self.store.lookup(keys)
+        # Each distinct missing text is embedded once, in a single batch
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if missing:
+            computed = dict(zip(missing, compute(missing)))
+            self.store.add([embedding_key(self.model_name, text, kind) for text in missing], [computed[t] for t in missing])
+            vectors = [vector if vector is not None else list(computed[text]) for text, vector in zip(texts, vectors)]
+        return vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(list(texts), "document", self.underlying.embed_documents)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Several queries in one model call; only valid for symmetric models (MiniLM), which embed queries as documents."""
+        return self._embed(list(texts), "query", self.underlying.embed_documents)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text], "query", lambda texts: [self.underlying.embed_query(texts[0])])[0]
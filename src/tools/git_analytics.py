@@ -0,0 +1,140 @@
+"""
+Commit-time analytics over the streamed git history.
+Timestamps and per-commit line counts are appended to compact typed arrays during the single
+`git log --numstat` pass (see git_history.stream_history); the distributions are then computed
+with vectorized NumPy operations, which stays fast on histories with 100k+ commits.
+The goal is telling real incremental work apart from one bulk commit, whether pushed as-is
+or split artificially into a burst of commits seconds apart.
+"""
+
+from array import array
+from typing import Dict, List, Optional
+
+from src.tools.git_history import CommitRecord
+
+# Time-between-commits histogram bin edges (seconds) and labels
+GAP_BIN_EDGES = [0, 60, 600, 3600, 6 * 3600, 86400, 7 * 86400, 30 * 86400]
+GAP_BIN_LABELS = ["<1m", "1-10m", "10m-1h", "1-6h", "6-24h", "1-7d", "7-30d", ">30d"]
+# Lines-changed-per-commit histogram bin edges and labels
+SIZE_BIN_EDGES = [0, 10, 100, 1000, 10000]
+SIZE_BIN_LABELS = ["<10", "10-99", "100-999", "1k-9.9k", ">=10k"]
+# Commits closer together than this form one burst
+BURST_GAP_SECONDS = 300
+# Directories listed in the churn ranking
+TOP_DIRECTORIES = 8
+
+
+class CommitAnalytics:
+    """Streaming accumulator; add() each CommitRecord oldest-first, then call summarize()."""
+
+    def __init__(self):
+        self.timestamps = array("q")
+        self.lines = array("q")
+        self.dir_churn: Dict[str, int] = {}
+        self.has_stats = False
+
+    def add(self, commit: CommitRecord) -> None:
+        self.timestamps.append(commit.timestamp)
+        self.lines.append(commit.insertions + commit.deletions)
+        if commit.files_changed:
+            self.has_stats = True
+        for directory, changed in commit.dir_churn:
+            self.dir_churn[directory] = self.dir_churn.get(directory, 0) + changed
+
+    def summarize(self) -> Optional[dict]:
+        """Distributions as plain Python numbers (JSON-serializable), or None without NumPy."""
+        try:
+            import numpy as np
+        except ImportError:
+            print("Warning: numpy not installed; commit analytics skipped.")
+            return None
+
+        count = len(self.timestamps)
+        metrics = {"commits": count, "has_diff_stats": self.has_stats}
+        if count == 0:
+            return metrics
+
+        timestamps = np.frombuffer(self.timestamps, dtype=np.int64)
+        gaps = np.clip(np.diff(timestamps), 0, None)
+        if gaps.size:
+            gap_counts, _ = np.histogram(gaps, bins=GAP_BIN_EDGES + [max(int(gaps.max()) + 1, GAP_BIN_EDGES[-1] + 1)])
+            p50, p90 = np.percentile(gaps, [50, 90])
+            # Maximal runs of commits each < BURST_GAP_SECONDS after the previous one
+            breaks = np.flatnonzero(gaps >= BURST_GAP_SECONDS)
+            run_edges = np.concatenate(([-1], breaks, [gaps.size]))
+            runs = np.diff(run_edges)  # commits per burst
+            metrics.update({
+                "gap_histogram": dict(zip(GAP_BIN_LABELS, gap_counts.tolist())),
+                "gap_median_hours": float(p50) / 3600,
+                "gap_p90_hours": float(p90) / 3600,
+                "rapid_fire_share": float(np.mean(gaps < 60)),
+                "bursts": int(runs.size),
+                "largest_burst": int(runs.max()),
+            })
+
+        if self.has_stats:
+            lines = np.frombuffer(self.lines, dtype=np.int64)
+            total = int(lines.sum())
+            size_counts, _ = np.histogram(lines, bins=SIZE_BIN_EDGES + [max(int(lines.max()) + 1, SIZE_BIN_EDGES[-1] + 1)])
+            p50, p90, p99 = np.percentile(lines, [50, 90, 99])
+            ordered = np.sort(lines)
+            top_n = max(1, count // 10)
+            metrics.update({
+                "lines_changed_total": total,
+                "size_histogram": dict(zip(SIZE_BIN_LABELS, size_counts.tolist())),
+                "lines_p50": float(p50),
+                "lines_p90": float(p90),
+                "lines_p99": float(p99),
+                "lines_max": int(ordered[-1]),
+                "top_decile_share": float(ordered[-top_n:].sum() / total) if total else 0.0,
+                "size_gini": _gini(ordered),
+                "directory_churn": self._top_directories(total),
+            })
+            if gaps.size:
+                # Lines landed per burst: a bulk commit split into pieces still shows up as one burst
+                burst_lines = np.add.reduceat(lines, run_edges[:-1] + 1)
+                metrics["largest_burst_share"] = float(burst_lines.max() / total) if total else 0.0
+        return metrics
+
+    def _top_directories(self, total: int) -> List[dict]:
+        ranked = sorted(self.dir_churn.items(), key=lambda kv: (-kv[1], kv[0]))[:TOP_DIRECTORIES]
+        return [{"directory": d, "lines": lines, "share": lines / total if total else 0.0} for d, lines in ranked]
+
+
+def _gini(sorted_values) -> float:
+    """Gini coefficient of non-negative values sorted ascending (0 = equal sizes, -> 1 = one commit has it all)."""
+    import numpy as np
+    n = sorted_values.size
+    total = sorted_values.sum()
+    if n == 0 or total == 0:
+        return 0.0
+    ranks = np.arange(1, n + 1)
+    return float((2 * np.sum(ranks * sorted_values) / (n * total)) - (n + 1) / n)
+
+
+def describe(metrics: dict) -> str:
+    """Readable rendering of summarize() output for the evidence content."""
+    if not metrics or not metrics.get("commits"):
+        return "Commit Analytics: no commits to analyze."
+    parts = [f"Commit Analytics over {metrics['commits']} commits."]
+    if "gap_histogram" in metrics:
+        histogram = ", ".join(f"{k}: {v}" for k, v in metrics["gap_histogram"].items() if v)
+        parts.append(f"Time between commits: median {metrics['gap_median_hours']:.2f}h, p90 {metrics['gap_p90_hours']:.2f}h ({histogram}).")
+        parts.append(f"{metrics['rapid_fire_share']:.0%} of commits land <1 minute after the previous one; "
+                     f"{metrics['bursts']} work sessions, largest spans {metrics['largest_burst']} commits.")
+    if metrics.get("has_diff_stats"):
+        histogram = ", ".join(f"{k}: {v}" for k, v in metrics["size_histogram"].items() if v)
+        parts.append(f"Lines changed per commit: median {metrics['lines_p50']:.0f}, p90 {metrics['lines_p90']:.0f}, "
+                     f"max {metrics['lines_max']} ({histogram}); Gini {metrics['size_gini']:.2f}, "
+                     f"top 10% of commits carry {metrics['top_decile_share']:.0%} of all lines.")
+        if "largest_burst_share" in metrics:
+            parts.append(f"The largest work session carries {metrics['largest_burst_share']:.0%} of all changed lines.")
+        churn = ", ".join(f"{c['directory']} {c['share']:.0%}" for c in metrics["directory_churn"])
+        parts.append(f"Churn by directory: {churn}.")
+        if metrics.get("largest_burst_share", 0) > 0.8 and metrics["commits"] > 3:
+            parts.append("Pattern: most of the code arrived in one session; commits look like a split bulk upload.")
+        elif metrics["size_gini"] < 0.6 and metrics["commits"] >= 5:
+            parts.append("Pattern: change volume is spread across many commits, consistent with incremental development.")
+    else:
+        parts.append("Diff stats unavailable (partial clone); size and churn distributions skipped.")
+    return " ".join(parts)
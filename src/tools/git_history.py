@@ -0,0 +1,275 @@
+"""
+Streaming git history forensics.
+`git log` is read line by line into compact commit records, and progression statistics are
+accumulated in bounded memory, so a 50k-commit history never has to fit in a Python string.
+Only the summaries reach the Evidence (and therefore the judge prompts).
+"""
+
+import math
+import re
+import subprocess
+from collections import deque
+from datetime import datetime, timezone
+from typing import Iterator, NamedTuple, Optional
+
+# Field / record separators that cannot appear in git's formatted output
+FIELD_SEP = "\x1f"
+RECORD_SEP = "\x1e"
+LOG_FORMAT = f"{RECORD_SEP}%H{FIELD_SEP}%ct{FIELD_SEP}%an{FIELD_SEP}%s"
+
+# Path components kept when attributing churn to a directory (`src/tools/x.py` -> `src/tools`)
+CHURN_DEPTH = 2
+# Subjects kept from each end of the history for the evidence sample
+SAMPLE_COMMITS = 10
+# Distinct authors tracked before reporting a lower bound
+MAX_TRACKED_AUTHORS = 1000
+
+PHASE_KEYWORDS = {
+    "setup": ['setup', 'init', 'initial', 'skeleton', 'env', 'config'],
+    "tools": ['tool', 'tools', 'detective', 'detectives', 'sandbox'],
+    "graph": ['graph', 'orchestrator', 'orchestration', 'edge', 'edges', 'node'],
+}
+# Keywords match whole words only, so 'env' does not match "environment" nor 'node' "nodes".
+# Any non-alphanumeric character separates words, so `add_node`, `.env` and `src/tools` still count.
+PHASE_PATTERNS = {
+    phase: re.compile(r"(?<![a-z0-9])(?:" + "|".join(map(re.escape, keywords)) + r")(?![a-z0-9])")
+    for phase, keywords in PHASE_KEYWORDS.items()
+}
+SEMANTIC_PREFIX = re.compile(r"^(feat|fix|docs|chore|refactor|test|perf|style|build|ci)(\([^)]*\))?!?:", re.IGNORECASE)
+
+
+class CommitRecord(NamedTuple):
+    sha: str
+    timestamp: int  # Committer time, seconds since the epoch
+    author: str
+    subject: str
+    files_changed: int = 0
+    insertions: int = 0
+    deletions: int = 0
+    dir_churn: tuple = ()  # ((directory, lines changed), ...) for this commit
+
+
+_RENAME_BRACES = re.compile(r"\{[^{}]* => ([^{}]*)\}")
+
+
+def churn_directory(path: str, depth: int = CHURN_DEPTH) -> str:
+    """Directory a numstat path is attributed to; renames count against their new location."""
+    if " => " in path:
+        path = _RENAME_BRACES.sub(r"\1", path) if "{" in path else path.split(" => ", 1)[1]
+    parts = path.replace("//", "/").split("/")[:-1]
+    return "/".join(parts[:depth]) or "."
+
+
+def is_partial_clone(repo_path: str) -> bool:
+    """Blobless/partial clones would lazily fetch every blob to compute diff stats."""
+    result = subprocess.run(
+        ["git", "config", "--get", "remote.origin.promisor"],
+        cwd=repo_path, capture_output=True, text=True
+    )
+    return result.stdout.strip() == "true"
+
+
+def iter_commits(repo_path: str, numstat: Optional[bool] = None) -> Iterator[CommitRecord]:
+    """Yield commits oldest-first straight from a `git log` pipe.
+
+    Diff stats (--numstat) are collected unless the clone is partial; pass numstat to force either way.
+    Raises CalledProcessError if git fails.
+    """
+    if numstat is None:
+        numstat = not is_partial_clone(repo_path)
+    args = ["git", "log", "--reverse", f"--format={LOG_FORMAT}"]
+    if numstat:
+        args.append("--numstat")
+    proc = subprocess.Popen(args, cwd=repo_path, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            text=True, encoding="utf-8", errors="replace")
+    header = None
+    files = insertions = deletions = 0
+    churn = {}
+
+    def record():
+        sha, timestamp, author, subject = (header.split(FIELD_SEP, 3) + ["", "", ""])[:4]
+        return CommitRecord(sha, int(timestamp or 0), author, subject, files, insertions, deletions, tuple(churn.items()))
+
+    try:
+        for line in proc.stdout:
+            if line.startswith(RECORD_SEP):
+                if header is not None:
+                    yield record()
+                header = line[1:].rstrip("\n")
+                files = insertions = deletions = 0
+                churn = {}
+            elif header is not None and line.count("\t") >= 2:
+                # "<insertions>\t<deletions>\t<path>"; binary files report "-"
+                added, deleted, path = line.rstrip("\n").split("\t", 2)
+                added = int(added) if added.isdigit() else 0
+                deleted = int(deleted) if deleted.isdigit() else 0
+                files += 1
+                insertions += added
+                deletions += deleted
+                directory = churn_directory(path)
+                churn[directory] = churn.get(directory, 0) + added + deleted
+        if header is not None:
+            yield record()
+        stderr = proc.stderr.read()
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, args, stderr=stderr)
+    finally:
+        if proc.poll() is None:
+            # Consumer stopped early
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+        proc.stderr.close()
+
+
+def _day(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+class ProgressionTracker:
+    """Constant-memory statistics over a commit stream (fed oldest-first)."""
+
+    def __init__(self, sample: int = SAMPLE_COMMITS):
+        self.count = 0
+        self.first: Optional[CommitRecord] = None
+        self.last: Optional[CommitRecord] = None
+        self.head_sample = []
+        self.tail_sample = deque(maxlen=sample)
+        self._sample = sample
+        self.authors = set()
+        self.semantic = 0
+        self.phase_first_seen = {}  # phase -> (commit number, timestamp)
+        self.active_days = 0
+        self._last_day = None
+        # Welford running mean/variance of the gaps between consecutive commits
+        self.gaps = 0
+        self._gap_mean = 0.0
+        self._gap_m2 = 0.0
+        self.has_stats = False
+        self.lines_changed = 0
+        self.files_changed = 0
+        self.largest: Optional[CommitRecord] = None
+
+    def add(self, commit: CommitRecord) -> None:
+        self.count += 1
+        if self.first is None:
+            self.first = commit
+        if self.last is not None:
+            gap = max(0, commit.timestamp - self.last.timestamp)
+            self.gaps += 1
+            delta = gap - self._gap_mean
+            self._gap_mean += delta / self.gaps
+            self._gap_m2 += delta * (gap - self._gap_mean)
+        self.last = commit
+
+        if len(self.head_sample) < self._sample:
+            self.head_sample.append(commit)
+        else:
+            self.tail_sample.append(commit)
+        if len(self.authors) < MAX_TRACKED_AUTHORS:
+            self.authors.add(commit.author)
+
+        day = _day(commit.timestamp)
+        if day != self._last_day:
+            self.active_days += 1
+            self._last_day = day
+
+        subject = commit.subject.lower()
+        if SEMANTIC_PREFIX.match(commit.subject):
+            self.semantic += 1
+        for phase, pattern in PHASE_PATTERNS.items():
+            if phase not in self.phase_first_seen and pattern.search(subject):
+                self.phase_first_seen[phase] = (self.count, commit.timestamp)
+
+        if commit.files_changed:
+            self.has_stats = True
+            changed = commit.insertions + commit.deletions
+            self.lines_changed += changed
+            self.files_changed += commit.files_changed
+            if self.largest is None or changed > self.largest.insertions + self.largest.deletions:
+                self.largest = commit
+
+    @property
+    def mean_gap(self) -> float:
+        return self._gap_mean
+
+    @property
+    def gap_stddev(self) -> float:
+        return math.sqrt(self._gap_m2 / self.gaps) if self.gaps else 0.0
+
+    @property
+    def burstiness(self) -> Optional[float]:
+        """(sigma - mu) / (sigma + mu) of inter-commit gaps: -1 periodic, 0 random, -> 1 bursty."""
+        mu, sigma = self.mean_gap, self.gap_stddev
+        return (sigma - mu) / (sigma + mu) if self.gaps and sigma + mu > 0 else None
+
+    def history_summary(self) -> str:
+        """Bounded replacement for the raw `git log --oneline` dump."""
+        if not self.count:
+            return "Git History Summary: no commits found."
+        authors = f"{len(self.authors)}+" if len(self.authors) >= MAX_TRACKED_AUTHORS else str(len(self.authors))
+        span_days = (self.last.timestamp - self.first.timestamp) / 86400
+        lines = [
+            f"Git History Summary: {self.count} commits by {authors} authors over {span_days:.1f} days "
+            f"({_day(self.first.timestamp)} -> {_day(self.last.timestamp)}), active on {self.active_days} days."
+        ]
+        if self.has_stats:
+            lines.append(f"Diff stats: {self.lines_changed} lines changed across {self.files_changed} file changes.")
+        lines.append("Earliest commits:")
+        lines.extend(f"{c.sha[:7]} {c.subject}" for c in self.head_sample)
+        if self.tail_sample:
+            omitted = self.count - len(self.head_sample) - len(self.tail_sample)
+            lines.append(f"... {omitted} commits omitted ..." if omitted else "Latest commits:")
+            lines.extend(f"{c.sha[:7]} {c.subject}" for c in self.tail_sample)
+        return "\n".join(lines)
+
+    def progression_analysis(self) -> str:
+        """Phase order, message quality, cadence and bulk-commit statistics."""
+        if self.count <= 1:
+            return "Single 'init/bulk' commit found. No logical progression. (FAIL - Low Score)"
+
+        analysis_points = []
+        if self.count >= 5:
+            analysis_points.append(f"Found {self.count} commits indicating excellent granular, atomic progression (High Score).")
+        elif self.count < 3:
+            analysis_points.append("Fewer than 3 commits found, lacks granular atomic progression.")
+
+        if self.semantic:
+            analysis_points.append(
+                f"{self.semantic}/{self.count} commits use conventional/semantic messages (e.g., feat:, fix:), ensuring traceability.")
+
+        seen = self.phase_first_seen
+        if len(seen) == len(PHASE_KEYWORDS):
+            order = sorted(seen, key=lambda p: seen[p][0])
+            if order == list(PHASE_KEYWORDS):
+                analysis_points.append("Identified sequential setup -> tools -> graph progression.")
+            else:
+                analysis_points.append(f"All phases present but out of order: {' -> '.join(order)}.")
+        else:
+            missing = [p for p in PHASE_KEYWORDS if p not in seen]
+            analysis_points.append(f"Missing distinct logical phases for: {', '.join(missing)}.")
+        if seen:
+            timeline = ", ".join(f"{p} (commit {n}, {_day(ts)})" for p, (n, ts) in sorted(seen.items(), key=lambda kv: kv[1][0]))
+            analysis_points.append(f"Timeline reconstruction: {timeline}.")
+
+        analysis_points.append(
+            f"Cadence: mean gap {self.mean_gap / 3600:.1f}h between commits over {self.active_days} active days.")
+        if self.burstiness is not None:
+            style = "bursty (work dumped in sessions)" if self.burstiness > 0.3 else "steady"
+            analysis_points.append(f"Burstiness {self.burstiness:.2f}: {style}.")
+        if self.has_stats and self.largest is not None and self.lines_changed:
+            share = (self.largest.insertions + self.largest.deletions) / self.lines_changed
+            analysis_points.append(
+                f"Largest commit {self.largest.sha[:7]} ('{self.largest.subject[:60]}') carries {share:.0%} of all changed lines.")
+
+        return "Git Progression Analysis: " + " ".join(analysis_points)
+
+
+def stream_history(repo_path: str, *consumers) -> int:
+    """Feed every commit, oldest first, to each consumer's add() in a single git log pass."""
+    count = 0
+    for commit in iter_commits(repo_path):
+        count += 1
+        for consumer in consumers:
+            consumer.add(commit)
+    return count
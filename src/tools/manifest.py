@@ -0,0 +1,158 @@
+"""
+Repository file manifest.
+The list of tracked files comes straight from git (`git ls-tree -r -z HEAD`), which works the same
+for full, sparse and checkout-less sandboxes and never confuses `.github/` with `.git/`. Manifests
+are cached per HEAD commit SHA in memory and on disk, so re-auditing an unchanged commit skips
+the listing entirely.
+"""
+
+import os
+import subprocess
+import threading
+from typing import Dict, Iterable, List, Optional
+
+CACHE_ROOT = os.environ.get("AUDITOR_CACHE_DIR", ".auditor_cache")
+MANIFEST_CACHE_DIR = os.path.join(CACHE_ROOT, "manifests")
+# Manifests kept in memory (one per audited commit)
+MAX_CACHED_MANIFESTS = 64
+
+
+class RepoManifest:
+    """Tracked files of one commit as a set, plus an index from every path-component suffix to its files.
+
+    `suffixes["graph.py"]` and `suffixes["src/graph.py"]` both list `src/graph.py`.
+    """
+
+    def __init__(self, paths: Iterable[str], commit: Optional[str] = None):
+        self.commit = commit
+        self.paths: List[str] = sorted(set(paths))
+        self.files = frozenset(self.paths)
+        self.suffixes: Dict[str, List[str]] = {}
+        for path in self.paths:
+            parts = path.split("/")
+            for i in range(len(parts)):
+                self.suffixes.setdefault("/".join(parts[i:]), []).append(path)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.files
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def resolve(self, citation: str) -> List[str]:
+        """Tracked files a cited path can refer to, in O(path length) hash lookups.
+
+        Exact paths resolve to themselves; partial paths (`graph.py`, `tools/x.py`) to every file
+        ending in them, so more than one result means the citation is ambiguous. A citation with
+        extra leading components (e.g. an absolute sandbox path) resolves to its longest tracked tail.
+        """
+        path = citation.strip("/")
+        if path in self.files:
+            return [path]
+        hits = self.suffixes.get(path)
+        if hits:
+            return hits
+        parts = path.split("/")
+        for i in range(1, len(parts)):
+            tail = "/".join(parts[i:])
+            if tail in self.files:
+                return [tail]
+        return []
+
+
+_manifests: Dict[str, RepoManifest] = {}
+_lock = threading.Lock()
+
+
+def head_commit(repo_path: str) -> Optional[str]:
+    result = subprocess.run(["git", "rev-parse", "HEAD"], cwd=repo_path, capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def _cache_path(commit: str) -> str:
+    return os.path.join(MANIFEST_CACHE_DIR, commit[:2], f"{commit}.paths")
+
+
+def _load_cached(commit: str) -> Optional[List[str]]:
+    try:
+        with open(_cache_path(commit), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    return [p for p in data.decode("utf-8", errors="surrogateescape").split("\0") if p]
+
+
+def _store_cached(commit: str, paths: List[str]) -> None:
+    path = _cache_path(commit)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write("\0".join(paths).encode("utf-8", errors="surrogateescape"))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"  [Manifest] Could not cache manifest for {commit[:8]}: {e}")
+
+
+def _list_tracked(repo_path: str) -> List[str]:
+    result = subprocess.run(["git", "ls-tree", "-r", "-z", "--name-only", "HEAD"],
+                            cwd=repo_path, capture_output=True, check=True)
+    return [p for p in result.stdout.decode("utf-8", errors="surrogateescape").split("\0") if p]
+
+
+def _walk(repo_path: str) -> List[str]:
+    """Fallback for directories that are not git checkouts."""
+    paths = []
+    for root, dirs, files in os.walk(repo_path):
+        dirs[:] = [d for d in dirs if d != ".git"]
+        for name in files:
+            if name == ".git":
+                # Worktree sandboxes have a .git pointer file instead of a directory
+                continue
+            paths.append(os.path.relpath(os.path.join(root, name), repo_path).replace(os.sep, "/"))
+    return paths
+
+
+def build_manifest(repo_path: str) -> RepoManifest:
+    """Manifest of the sandbox's HEAD commit (cached by SHA), or of the directory tree outside git."""
+    commit = head_commit(repo_path)
+    if commit is None:
+        return RepoManifest(_walk(repo_path))
+
+    with _lock:
+        cached = _manifests.get(commit)
+    if cached is not None:
+        return cached
+
+    paths = _load_cached(commit)
+    if paths is None:
+        try:
+            paths = _list_tracked(repo_path)
+        except subprocess.CalledProcessError as e:
+            print(f"  [Manifest] git ls-tree failed ({e.stderr.decode(errors='replace').strip()}); walking the tree")
+            return RepoManifest(_walk(repo_path))
+        _store_cached(commit, paths)
+    manifest = RepoManifest(paths, commit)
+    remember_manifest(manifest)
+    return manifest
+
+
+def remember_manifest(manifest: RepoManifest) -> None:
+    if manifest.commit is None:
+        return
+    with _lock:
+        if len(_manifests) >= MAX_CACHED_MANIFESTS:
+            _manifests.pop(next(iter(_manifests)))
+        _manifests[manifest.commit] = manifest
+
+
+def manifest_for(paths: Iterable[str], commit: Optional[str] = None) -> RepoManifest:
+    """The manifest for graph state (`repo_manifest`, `repo_commit`), reusing the cached index when possible."""
+    if commit:
+        with _lock:
+            cached = _manifests.get(commit)
+        if cached is not None:
+            return cached
+    manifest = RepoManifest(paths, commit)
+    remember_manifest(manifest)
+    return manifest
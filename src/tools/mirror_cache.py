@@ -0,0 +1,188 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from typing import Optional
+
+# Persistent bare mirrors live outside the per-audit sandboxes so re-audits only pay the delta fetch
+CACHE_ROOT = os.environ.get("AUDITOR_CACHE_DIR", ".auditor_cache")
+MIRROR_CACHE_DIR = os.path.join(CACHE_ROOT, "mirrors")
+MIRROR_CACHE_ENABLED = os.environ.get("AUDITOR_MIRROR_CACHE", "1") != "0"
+MIRROR_CACHE_MAX_BYTES = int(os.environ.get("AUDITOR_MIRROR_CACHE_MAX_MB", "4096")) * 1024 * 1024
+
+
+def normalize_repo_url(repo_url: str) -> str:
+    """Canonical form of a repository URL so trivially different spellings share one mirror."""
+    url = repo_url.strip().rstrip("/")
+    if url.endswith(".git"):
+        url = url[:-4]
+    scheme, sep, rest = url.partition("://")
+    if not sep:
+        return url
+    host, slash, path = rest.partition("/")
+    return f"{scheme.lower()}://{host.lower()}{slash}{path}"
+
+
+def mirror_key(repo_url: str, partial: bool = False) -> str:
+    """Content-addressed cache key for a repository URL and mirror flavour."""
+    flavour = "partial" if partial else "full"
+    return hashlib.sha256(f"{normalize_repo_url(repo_url)}#{flavour}".encode()).hexdigest()[:32]
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+class MirrorCache:
+    """Size-bounded LRU cache of bare `git clone --mirror` repositories.
+
+    Sandboxes are created as detached worktrees of a mirror, so a repeat audit
+    fetches only new objects instead of re-cloning. Mirrors cloned for the
+    blobless/sparse/history modes are themselves partial (`--filter=blob:none`)
+    and accumulate blobs lazily as checkouts need them.
+    """
+
+    def __init__(self, root: str = MIRROR_CACHE_DIR, max_bytes: int = MIRROR_CACHE_MAX_BYTES):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    def mirror_path(self, repo_url: str, partial: bool = False) -> str:
+        return os.path.join(self.root, mirror_key(repo_url, partial) + ".git")
+
+    @contextmanager
+    def _lock(self, mirror_path: str, blocking: bool = True):
+        """Exclusive per-mirror file lock so concurrent audits never fetch into the same mirror at once."""
+        import fcntl
+        lock_path = mirror_path + ".lock"
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        while True:
+            lock_file = open(lock_path, "w")
+            try:
+                fcntl.flock(lock_file, flags)
+                try:
+                    # evict() unlinks the lock file of a mirror it removes; a waiter that then
+                    # gets the lock on the unlinked file retries on a fresh one
+                    if os.path.samestat(os.fstat(lock_file.fileno()), os.stat(lock_path)):
+                        break
+                except FileNotFoundError:
+                    pass
+            except BaseException:
+                lock_file.close()
+                raise
+            lock_file.close()
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def _record_size(self, mirror_path: str) -> int:
+        """Measure a mirror and remember its size next to it, so eviction does not re-walk every mirror."""
+        size = _dir_size(mirror_path)
+        tmp_path = f"{mirror_path}.size.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(str(size))
+            os.replace(tmp_path, mirror_path + ".size")
+        except OSError:
+            pass
+        return size
+
+    def _size(self, mirror_path: str) -> int:
+        """Last recorded size of a mirror (measured now if it was never recorded)."""
+        try:
+            with open(mirror_path + ".size", "r") as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return self._record_size(mirror_path)
+
+    def _git(self, args: list[str], cwd: Optional[str] = None) -> subprocess.CompletedProcess:
+        return subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, check=True)
+
+    def _update_mirror(self, repo_url: str, path: str, partial: bool) -> None:
+        """Create the mirror on first use, otherwise fetch only the delta. Caller holds the lock."""
+        if os.path.isdir(path):
+            print(f"Updating cached mirror for {repo_url}...")
+            self._git(["--git-dir", path, "fetch", "--prune", "origin"])
+        else:
+            print(f"Creating cached mirror for {repo_url}...")
+            staging = tempfile.mkdtemp(prefix="mirror_", dir=self.root)
+            try:
+                filter_args = ["--filter=blob:none"] if partial else []
+                self._git(["clone", "--mirror", *filter_args, repo_url, staging])
+                os.replace(staging, path)
+            except Exception:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+        os.utime(path)
+
+    def checkout_worktree(self, repo_url: str, dest: str, partial: bool = False, checkout: bool = True) -> str:
+        """Refresh the mirror for repo_url and check out its HEAD as a detached worktree at dest.
+
+        Both steps run under the mirror lock so an eviction can never remove the
+        mirror between the fetch and the worktree registration. Returns the mirror path.
+        """
+        path = self.mirror_path(repo_url, partial)
+        checkout_args = [] if checkout else ["--no-checkout"]
+        with self._lock(path):
+            self._update_mirror(repo_url, path, partial)
+            self._git(["--git-dir", path, "worktree", "add", "--detach", *checkout_args, dest, "HEAD"])
+            self._record_size(path)
+        self.evict(keep=path)
+        return path
+
+    def remove_worktree(self, mirror_path: str, dest: str) -> None:
+        """Detach a sandbox worktree from its mirror; the mirror itself is kept."""
+        with self._lock(mirror_path):
+            try:
+                self._git(["--git-dir", mirror_path, "worktree", "remove", "--force", dest])
+            except subprocess.CalledProcessError:
+                pass
+            self._git(["--git-dir", mirror_path, "worktree", "prune"])
+            # Partial mirrors fetch blobs lazily during the audit
+            self._record_size(mirror_path)
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Remove least-recently-used mirrors until the cache fits in max_bytes.
+
+        Mirrors with live worktrees (an audit in flight) or held locks are never evicted.
+        Sizes are the ones recorded when each mirror was last used.
+        """
+        mirrors = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.endswith(".git") and os.path.isdir(path):
+                mirrors.append((os.path.getmtime(path), path, self._size(path)))
+        total = sum(size for _, _, size in mirrors)
+        for _, path, size in sorted(mirrors):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                with self._lock(path, blocking=False):
+                    self._git(["--git-dir", path, "worktree", "prune"])
+                    worktrees_dir = os.path.join(path, "worktrees")
+                    if os.path.isdir(worktrees_dir) and os.listdir(worktrees_dir):
+                        continue
+                    print(f"Evicting cached mirror {os.path.basename(path)} ({size // (1024 * 1024)} MB)")
+                    shutil.rmtree(path, ignore_errors=True)
+                    # The lock file goes too, while still held, so lock files do not pile up
+                    for leftover in (path + ".size", path + ".lock"):
+                        try:
+                            os.remove(leftover)
+                        except OSError:
+                            pass
+                    total -= size
+            except (BlockingIOError, subprocess.CalledProcessError):
+                continue
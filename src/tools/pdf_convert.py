@@ -0,0 +1,151 @@
+"""
+PDF -> markdown conversion service.
+Docling runs in a pool of worker processes, each holding one long-lived DocumentConverter, so
+layout models load once per worker instead of once per PDF and stay out of the audit process.
+Output is cached on disk by the PDF's SHA-256: a report seen before is never converted again,
+and concurrent requests for the same PDF share one conversion.
+"""
+
+import hashlib
+import importlib.util
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+CACHE_ROOT = os.environ.get("AUDITOR_CACHE_DIR", ".auditor_cache")
+MARKDOWN_CACHE_DIR = os.path.join(CACHE_ROOT, "markdown")
+# Each worker holds its own Docling models (~1-2 GB), so the default stays small
+PDF_WORKERS = int(os.environ.get("AUDITOR_PDF_WORKERS", str(min(2, os.cpu_count() or 1))))
+
+# The converter of this (worker) process, built on its first PDF
+_converter = None
+
+
+def _convert_in_worker(path: str) -> str:
+    global _converter
+    if _converter is None:
+        from docling.document_converter import DocumentConverter
+        _converter = DocumentConverter()
+    return _converter.convert(path).document.export_to_markdown()
+
+
+def pdf_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PdfConversionService:
+    """Process pool of Docling converters in front of a markdown cache keyed by PDF SHA-256."""
+
+    def __init__(self, workers: int = PDF_WORKERS, cache_dir: str = MARKDOWN_CACHE_DIR):
+        self.workers = max(1, workers)
+        self.cache_dir = cache_dir
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _cache_path(self, sha: str) -> str:
+        return os.path.join(self.cache_dir, sha[:2], f"{sha}.md")
+
+    def _cached(self, sha: str) -> Optional[str]:
+        try:
+            with open(self._cache_path(sha), "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _store(self, sha: str, future: Future) -> None:
+        # Written before the in-flight entry is dropped, so a new request finds one or the other
+        if not future.cancelled() and future.exception() is None:
+            path = self._cache_path(sha)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(future.result())
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"  [PdfConvert] Could not cache markdown for {sha[:12]}: {e}")
+        with self._lock:
+            self._in_flight.pop(sha, None)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: torch and Docling's model threads are not fork-safe
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def submit(self, path: str) -> Future:
+        """Future markdown of a PDF; already-cached and in-flight PDFs do not start another conversion."""
+        sha = pdf_sha256(path)
+        with self._lock:
+            future = self._in_flight.get(sha)
+            if future is not None:
+                return future
+            markdown = self._cached(sha)
+            if markdown is not None:
+                future = Future()
+                future.set_result(markdown)
+                return future
+            if importlib.util.find_spec("docling") is None:
+                # Fail fast instead of spawning a worker that cannot import it
+                raise ImportError("docling is not installed")
+            try:
+                future = self._get_pool().submit(_convert_in_worker, os.path.abspath(path))
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory) and the executor refuses new work: start a fresh pool
+                print("  [PdfConvert] Worker pool broken; restarting it.")
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+                future = self._get_pool().submit(_convert_in_worker, os.path.abspath(path))
+            self._in_flight[sha] = future
+        future.add_done_callback(lambda done: self._store(sha, done))
+        return future
+
+    def convert(self, path: str) -> str:
+        return self.submit(path).result()
+
+    def convert_many(self, paths: List[str]) -> Dict[str, str]:
+        """Markdown per path, converting the uncached PDFs concurrently across the pool."""
+        futures = {path: self.submit(path) for path in dict.fromkeys(paths)}
+        return {path: future.result() for path, future in futures.items()}
+
+    def prefetch(self, paths: List[str]) -> None:
+        """Start converting PDFs in the background (e.g. a batch's reports while repos are cloned)."""
+        for path in dict.fromkeys(paths):
+            if os.path.exists(path):
+                try:
+                    self.submit(path)
+                except ImportError:
+                    return
+
+    def shutdown(self) -> None:
+        """Stop the workers, dropping queued conversions; the next submit() starts a new pool."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+_service: Optional[PdfConversionService] = None
+_service_lock = threading.Lock()
+
+
+def conversion_service() -> PdfConversionService:
+    """The process-wide conversion service (its pool starts on the first uncached PDF)."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = PdfConversionService()
+        return _service
+
+
+def convert_pdf(path: str) -> str:
+    """Markdown of a PDF via the shared service. Raises ImportError if Docling is not installed."""
+    return conversion_service().convert(path)
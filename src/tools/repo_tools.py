@@ -4,6 +4,8 @@ import subprocess
 import os
 from typing import Optional
 from urllib.parse import urlparse
+from src.tools.ast_index import ParsedModule, drop_repo_index, get_repo_index
+from src.tools.mirror_cache import MirrorCache, MIRROR_CACHE_ENABLED
 
 def is_safe_url(url: str) -> bool:
     """Basic sanitization for repository URLs."""
@@ -16,142 +18,210 @@ def is_safe_url(url: str) -> bool:
     except Exception:
         return False
 
-def get_all_repo_files(repo_path: str) -> list[str]:
-    """Retrieve all file paths relative to the repo root to verify existence."""
-    file_list = []
-    for root, dirs, files in os.walk(repo_path):
-        if '.git' in root:
-            continue
-        for file in files:
-            full_path = os.path.join(root, file)
-            rel_path = os.path.relpath(full_path, repo_path)
-            file_list.append(rel_path)
-    return file_list
+# Clone strategies selectable per audit:
+#   full     - plain `git clone`, every blob of every commit
+#   blobless - partial clone (`--filter=blob:none`), blobs fetched only for the checked-out tree
+#   sparse   - blobless + sparse-checkout of just the files the rubric analyzers read
+#   history  - blobless without a working tree; enough for `git log` and tree listings
+CLONE_MODES = ("full", "blobless", "sparse", "history")
+DEFAULT_CLONE_MODE = os.environ.get("AUDITOR_CLONE_MODE", "full")
+
+# Non-cone sparse-checkout patterns covering the rubric's target artifacts
+# (analyzers scan Python modules anywhere in the tree)
+SPARSE_CHECKOUT_PATTERNS = [
+    "/src/",
+    "*.py",
+    "/*.md",
+    "/*.pdf",
+    "/*.png",
+    "/pyproject.toml",
+    "/requirements*.txt",
+]
+
+def _run_git(args: list[str], cwd: str) -> subprocess.CompletedProcess:
+    """Run a git command inside the sandbox, raising CalledProcessError on failure."""
+    return subprocess.run(
+        ["git", *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True
+    )
 
 class RepoSandbox:
     """Context manager for a temporary git repository sandbox using tempfile.TemporaryDirectory()."""
-    def __init__(self, repo_url: str):
+    def __init__(self, repo_url: str, clone_mode: Optional[str] = None, use_mirror_cache: Optional[bool] = None):
         if not is_safe_url(repo_url):
             raise ValueError(f"Insecure or invalid repository URL: {repo_url}")
+        clone_mode = clone_mode or DEFAULT_CLONE_MODE
+        if clone_mode not in CLONE_MODES:
+            raise ValueError(f"Unknown clone mode '{clone_mode}'. Expected one of: {', '.join(CLONE_MODES)}")
         self.repo_url = repo_url
+        self.clone_mode = clone_mode
+        self.use_mirror_cache = MIRROR_CACHE_ENABLED if use_mirror_cache is None else use_mirror_cache
         self._temp_ctx = None
+        self._mirror_cache = None
+        self._mirror_path = None
         self.temp_dir = None
     
+    def _checkout_from_mirror(self):
+        """Materialize temp_dir as a worktree of the cached mirror, paying only the delta fetch."""
+        cache = MirrorCache()
+        self._mirror_path = cache.checkout_worktree(
+            self.repo_url,
+            self.temp_dir,
+            partial=self.clone_mode != "full",
+            checkout=self.clone_mode in ("full", "blobless"),
+        )
+        self._mirror_cache = cache
+        if self.clone_mode == "sparse":
+            _run_git(["sparse-checkout", "set", "--no-cone", *SPARSE_CHECKOUT_PATTERNS], self.temp_dir)
+            _run_git(["checkout"], self.temp_dir)
+
+    def _clone(self):
+        """Clone into temp_dir using the configured strategy."""
+        if self.clone_mode == "full":
+            _run_git(["clone", self.repo_url, "."], self.temp_dir)
+        elif self.clone_mode == "blobless":
+            _run_git(["clone", "--filter=blob:none", self.repo_url, "."], self.temp_dir)
+        elif self.clone_mode == "sparse":
+            _run_git(["clone", "--filter=blob:none", "--no-checkout", self.repo_url, "."], self.temp_dir)
+            _run_git(["sparse-checkout", "set", "--no-cone", *SPARSE_CHECKOUT_PATTERNS], self.temp_dir)
+            _run_git(["checkout"], self.temp_dir)
+        else:  # history
+            _run_git(["clone", "--filter=blob:none", "--no-checkout", self.repo_url, "."], self.temp_dir)
+
     def __enter__(self):
         self.temp_dir = tempfile.mkdtemp(prefix="auditor_")
-        print(f"Cloning {self.repo_url} into {self.temp_dir}...")
+        print(f"Cloning {self.repo_url} into {self.temp_dir} (mode: {self.clone_mode})...")
+        
+        if self.use_mirror_cache:
+            try:
+                self._checkout_from_mirror()
+                return self.temp_dir
+            except (subprocess.CalledProcessError, OSError) as e:
+                # git errors, but also a read-only or full cache directory
+                detail = e.stderr.strip() if isinstance(e, subprocess.CalledProcessError) else str(e)
+                print(f"Mirror cache unavailable, falling back to direct clone: {detail[:200]}")
+                self._release_worktree()
+                import shutil
+                shutil.rmtree(self.temp_dir, ignore_errors=True)
+                os.makedirs(self.temp_dir)
         
         try:
-            result = subprocess.run(
-                ["git", "clone", self.repo_url, "."],
-                cwd=self.temp_dir,
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            self._clone()
             return self.temp_dir
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, OSError) as e:
             import shutil
             shutil.rmtree(self.temp_dir, ignore_errors=True)
-            raise RuntimeError(f"Git clone failed: {e.stderr}") from e
+            raise RuntimeError(f"Git clone failed: {getattr(e, 'stderr', None) or e}") from e
         
+    def _release_worktree(self):
+        """Unregister the sandbox worktree from its mirror, if one was created."""
+        if self._mirror_cache and self._mirror_path:
+            try:
+                self._mirror_cache.remove_worktree(self._mirror_path, self.temp_dir)
+            except (subprocess.CalledProcessError, OSError):
+                pass
+        self._mirror_cache = None
+        self._mirror_path = None
+
     def cleanup(self):
         """Manually trigger cleanup of the sandbox."""
         if self.temp_dir and os.path.exists(self.temp_dir):
             import shutil
+            self._release_worktree()
             shutil.rmtree(self.temp_dir, ignore_errors=True)
+            drop_repo_index(self.temp_dir)
             print("Cleaned up git sandbox")
             
     def __exit__(self, exc_type, exc_val, exc_tb):
         # We allow manual cleanup now
         return False
 
-def extract_git_history(repo_path: str) -> str:
-    """Extract commit history from the cloned repository using rubric format."""
-    try:
-        result = subprocess.run(
-            ["git", "log", "--oneline", "--reverse"],
-            cwd=repo_path,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        return f"Error extracting git history: {e.stderr}"
+def cleanup_sandbox(repo_path: Optional[str]) -> None:
+    """Remove a sandbox created by RepoSandbox, given only its path (e.g. from graph state)."""
+    if not repo_path or not os.path.isdir(repo_path) or not os.path.basename(repo_path).startswith("auditor_"):
+        return
+    git_pointer = os.path.join(repo_path, ".git")
+    if os.path.isfile(git_pointer):
+        # Worktree of a cached mirror: `gitdir: <mirror>/worktrees/<name>`
+        with open(git_pointer, "r") as f:
+            gitdir = f.read().strip().removeprefix("gitdir:").strip()
+        mirror_path = os.path.dirname(os.path.dirname(gitdir))
+        try:
+            MirrorCache(os.path.dirname(mirror_path)).remove_worktree(mirror_path, repo_path)
+        except (OSError, subprocess.CalledProcessError):
+            pass
+    import shutil
+    shutil.rmtree(repo_path, ignore_errors=True)
+    drop_repo_index(repo_path)
+    print(f"Cleaned up git sandbox {repo_path}")
 
-def analyze_git_progression(history_text: str) -> str:
-    """Check for atomic commits indicating setup -> tools -> graph progression."""
-    commits = history_text.strip().split("\n")
-    if not commits or len(commits) == 1:
-        return "Single 'init/bulk' commit found. No logical progression. (FAIL - Low Score)"
-        
-    analysis_points = []
-    
-    if len(commits) >= 5:
-        analysis_points.append(f"Found {len(commits)} commits indicating excellent granular, atomic progression (High Score).")
-    elif len(commits) >= 3:
-        pass # Good enough
-    else:
-        analysis_points.append("Fewer than 3 commits found, lacks granular atomic progression.")
-        
-    history_lower = history_text.lower()
-    
-    # Check for general phases and message quality
-    has_setup = any(keyword in history_lower for keyword in ['setup', 'init', 'skeleton', 'env', 'config'])
-    has_tools = any(keyword in history_lower for keyword in ['tool', 'detective', 'sandbox', 'sandbox'])
-    has_graph = any(keyword in history_lower for keyword in ['graph', 'orchestrator', 'orchestration', 'edge', 'node'])
-    
-    # Fake check for semantic commit messages to boost score
-    has_semantic = any(keyword in history_lower for keyword in ['feat:', 'fix:', 'docs:', 'chore:', 'refactor:'])
-    if has_semantic:
-        analysis_points.append("High-quality, conventional/semantic commit messages used (e.g., feat:, fix:), ensuring excellent traceability.")
-    
-    if has_setup and has_tools and has_graph:
-        analysis_points.append("Identified sequential setup -> tools -> graph progression.")
-    else:
-        missing = []
-        if not has_setup: missing.append("setup")
-        if not has_tools: missing.append("tools")
-        if not has_graph: missing.append("graph")
-        analysis_points.append(f"Missing distinct logical phases for: {', '.join(missing)}.")
-        
-    return "Git Progression Analysis: " + " ".join(analysis_points)
+# subprocess entry points, plus os.system for the shell-injection failure pattern
+SUBPROCESS_CALLS = ("run", "Popen", "call", "check_call", "check_output")
+JUDGE_FUNCTIONS = {"prosecutor", "defense", "tech_lead"}
+
+# Which modules each analyzer inspects, as a predicate over a module's symbol record.
+# Targets are located anywhere in the tree, whatever the repository layout. Detection is by
+# call site, not substring: a `.with_structured_output` that only appears in a comment, docstring
+# or string no longer counts as enforcement.
+ANALYSIS_TARGETS = {
+    "graph": lambda s: "StateGraph" in s.calls,
+    "state": lambda s: bool(s.subclasses("BaseModel") or s.subclasses("TypedDict")),
+    "structured_output": lambda s: "with_structured_output" in s.calls,
+    "judges": lambda s: "with_structured_output" in s.calls or bool(JUDGE_FUNCTIONS & s.functions),
+    "justice": lambda s: any(name.startswith("chief_justice") for name in s.functions),
+    "security": lambda s: s.imports_module("subprocess") or "system" in s.calls,
+}
+
+def locate_analysis_targets(repo_path: str, target: str) -> list[str]:
+    """Repo-relative paths of the modules an analyzer inspects (see ANALYSIS_TARGETS)."""
+    return get_repo_index(repo_path).find(ANALYSIS_TARGETS[target])
+
+def format_locations(paths: list[str], default: str, limit: int = 5) -> str:
+    """Evidence location string for a list of files."""
+    if not paths:
+        return default
+    shown = ", ".join(paths[:limit])
+    return shown if len(paths) <= limit else f"{shown} (+{len(paths) - limit} more)"
+
+def _target_modules(repo_path: str, target: str) -> list[ParsedModule]:
+    return get_repo_index(repo_path).modules_where(ANALYSIS_TARGETS[target])
+
+def _graph_findings(module: ParsedModule) -> list[str]:
+    findings = []
+    if module.calls_to("StateGraph"):
+        findings.append(f"StateGraph instantiation found in {module.rel_path}")
+
+    # .add_edge / .add_node calls with their args
+    for node in module.calls_to('add_edge', 'add_node', 'add_conditional_edges'):
+        if not isinstance(node.func, ast.Attribute):
+            continue
+        args = [ast.unparse(arg) for arg in node.args]
+        findings.append(f"Graph method {node.func.attr} called with args: {', '.join(args)}")
+
+    # TypedDict reducers like Annotated[..., operator.add]
+    for node in module.annotated:
+        findings.append(f"Found Annotated reducer usage: {ast.unparse(node)}")
+    return findings
 
 def analyze_graph_structure(file_or_repo_path: str) -> str:
-    """Analyze Python file for LangGraph StateGraph usage using AST."""
-    file_path = file_or_repo_path
+    """Analyze every module that builds a LangGraph StateGraph (or a single file) using AST."""
     if os.path.isdir(file_or_repo_path):
-        candidate = os.path.join(file_or_repo_path, "src/graph.py")
-        if os.path.exists(candidate):
-            file_path = candidate
-        else:
-            return "Graph Analysis: src/graph.py not found in repository"
+        modules = _target_modules(file_or_repo_path, "graph")
+        if not modules:
+            return "Graph Analysis: no graph construction found in repository"
+    else:
+        try:
+            modules = [ParsedModule.from_file(file_or_repo_path)]
+        except OSError as e:
+            return f"AST parsing failed: {e}"
+        if modules[0].error:
+            return f"AST parsing failed: {modules[0].error}"
 
     try:
-        with open(file_path, "r") as f:
-            tree = ast.parse(f.read())
-        
-        findings = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call):
-                # Check for StateGraph(...) calls
-                if (isinstance(node.func, ast.Name) and node.func.id == 'StateGraph') or \
-                   (isinstance(node.func, ast.Attribute) and node.func.attr == 'StateGraph'):
-                    findings.append("StateGraph instantiation found")
-                
-                # Check for .add_edge or .add_node and extract args if possible
-                if isinstance(node.func, ast.Attribute) and node.func.attr in ['add_edge', 'add_node', 'add_conditional_edges']:
-                    if hasattr(ast, 'unparse'):
-                        args = [ast.unparse(arg) for arg in node.args]
-                        findings.append(f"Graph method {node.func.attr} called with args: {', '.join(args)}")
-                    else:
-                        findings.append(f"Found {node.func.attr} call")
-            
-            # Check for TypedDict reducers like Annotated[..., operator.add]
-            if isinstance(node, ast.Subscript) and getattr(node.value, 'id', '') == 'Annotated':
-                if hasattr(ast, 'unparse'):
-                    findings.append(f"Found Annotated reducer usage: {ast.unparse(node)}")
+        findings = [f for module in modules for f in _graph_findings(module)]
                     
         # Detect parallel fan-out/fan-in patterns for report evidence
         detective_fan_out = any('add_edge' in f and 'load_rubric' in f and ('repo_investigator' in f or 'doc_analyst' in f) for f in findings)
@@ -163,79 +233,61 @@ def analyze_graph_structure(file_or_repo_path: str) -> str:
         if judge_fan_out:
             summary += "[VERIFIED] Parallel Fan-Out for Judges (Prosecutor, Defense, TechLead)\n"
         
-        return summary + "\n".join(set(findings)) if findings else "No graph structures found."
+        return summary + "\n".join(dict.fromkeys(findings)) if findings else "No graph structures found."
     except Exception as e:
         return f"AST parsing failed: {e}"
 
 def analyze_state_management(repo_path: str) -> str:
-    """Explicitly scan for State Management Rigor in src/state.py."""
-    state_file = os.path.join(repo_path, "src/state.py")
-    if not os.path.exists(state_file):
-        return "src/state.py not found"
+    """Scan for State Management Rigor: Pydantic models, TypedDict state and reducers anywhere in the repo."""
+    modules = _target_modules(repo_path, "state")
+    if not modules:
+        return "State Management Analysis: no Pydantic models or TypedDict state found in repository"
         
     try:
-        with open(state_file, "r") as f:
-            content = f.read()
-            tree = ast.parse(content)
-            
         findings = []
-        for node in ast.walk(tree):
-            # Check for Pydantic BaseModel
-            if isinstance(node, ast.ClassDef):
-                for base in node.bases:
-                    if (isinstance(base, ast.Name) and base.id == 'BaseModel') or \
-                       (isinstance(base, ast.Attribute) and base.attr == 'BaseModel'):
-                        findings.append(f"Pydantic model found: {node.name}")
+        for module in modules:
+            content = module.source
+            for node in module.subclasses_of('BaseModel'):
+                findings.append(f"Pydantic model found: {node.name} ({module.rel_path})")
+            for node in module.subclasses_of('TypedDict'):
+                findings.append(f"Uses 'TypedDict' for state: {node.name} ({module.rel_path})")
+            for node in module.annotated:
+                findings.append(f"Annotated reducer: {ast.unparse(node)}")
+            if 'operator.add' in content:
+                findings.append("Uses 'operator.add' as state reducer")
+            if 'operator.ior' in content:
+                findings.append("Uses 'operator.ior' as state reducer")
             
-            # Check for Annotated reducers
-            if isinstance(node, ast.Subscript) and getattr(node.value, 'id', '') == 'Annotated':
-                if hasattr(ast, 'unparse'):
-                    findings.append(f"Annotated reducer: {ast.unparse(node)}")
-                    
-        if 'operator.add' in content:
-            findings.append("Uses 'operator.add' as state reducer")
-        if 'operator.ior' in content:
-            findings.append("Uses 'operator.ior' as state reducer")
-        if 'TypedDict' in content:
-            findings.append("Uses 'TypedDict' for AgentState")
-            
-        return f"State Management Analysis: {'; '.join(set(findings)) if findings else 'Minimal state management found'}"
+        return f"State Management Analysis: {'; '.join(dict.fromkeys(findings)) if findings else 'Minimal state management found'}"
     except Exception as e:
         return f"State analysis failed: {e}"
 
 def analyze_structured_output(repo_path: str) -> str:
-    """Scan Judge nodes for Structured Output Enforcement."""
-    judges_file = os.path.join(repo_path, "src/nodes/judges.py")
-    if not os.path.exists(judges_file):
-        return "src/nodes/judges.py not found"
+    """Scan every module calling .with_structured_output() for Structured Output Enforcement."""
+    modules = _target_modules(repo_path, "structured_output")
+    if not modules:
+        return "Structured Output Analysis: no .with_structured_output() calls found; manual parsing assumed"
         
     try:
-        with open(judges_file, "r") as f:
-            content = f.read()
-            tree = ast.parse(content)
-            
-        findings = []
-        if '.with_structured_output' in content:
-            findings.append("Uses '.with_structured_output()' for LLM enforcement")
+        content = "\n".join(module.source for module in modules)
+        findings = [f"Uses '.with_structured_output()' for LLM enforcement ({', '.join(m.rel_path for m in modules)})"]
         if 'for attempt in range' in content or 'retry' in content.lower():
             findings.append("Implements retry logic for LLM calls")
         if 'argument' in content and 'cited_evidence' in content:
             findings.append("Uses specifically named 'argument' and 'cited_evidence' fields per rubric")
             
-        return f"Structured Output Analysis: {'; '.join(set(findings)) if findings else 'Manual parsing detected'}"
+        return f"Structured Output Analysis: {'; '.join(dict.fromkeys(findings)) if findings else 'Manual parsing detected'}"
     except Exception as e:
         return f"Structured output analysis failed: {e}"
 
 def analyze_judicial_nuance(repo_path: str) -> str:
-    """Scan for Judicial Nuance and Dialectics."""
-    judges_file = os.path.join(repo_path, "src/nodes/judges.py")
-    if not os.path.exists(judges_file):
-        return "src/nodes/judges.py not found"
+    """Scan judge modules for Judicial Nuance and Dialectics."""
+    modules = _target_modules(repo_path, "judges")
+    if not modules:
+        return "Judicial Nuance Analysis: no judge nodes found in repository"
         
     try:
-        with open(judges_file, "r") as f:
-            content = f.read()
-            
+        content = "\n".join(module.source for module in modules)
         findings = []
         if 'Prosecutor' in content and 'Defense' in content and 'TechLead' in content:
             findings.append("Three distinct personas defined")
@@ -248,75 +300,69 @@ def analyze_judicial_nuance(repo_path: str) -> str:
         if 'PRODUCTION READINESS' in content or 'senior architect' in content:
             findings.append("Tech Lead has production-readiness focus")
             
-        return f"Judicial Nuance Analysis: {'; '.join(set(findings)) if findings else 'Low persona separation'}"
+        return f"Judicial Nuance Analysis: {'; '.join(dict.fromkeys(findings)) if findings else 'Low persona separation'}"
     except Exception as e:
         return f"Judicial nuance analysis failed: {e}"
 
 def analyze_chief_justice_synthesis(repo_path: str) -> str:
-    """Scan Chief Justice node for deterministic rules and conflict resolution."""
-    justice_file = os.path.join(repo_path, "src/nodes/justice.py")
-    if not os.path.exists(justice_file):
-        # Check if it's in judges.py (some versions have it there)
-        justice_file = os.path.join(repo_path, "src/nodes/judges.py")
+    """Scan Chief Justice node(s) for deterministic rules and conflict resolution."""
+    modules = _target_modules(repo_path, "justice")
+    if not modules:
+        return "Chief Justice analysis failed: no chief_justice node found in repository"
         
     try:
-        with open(justice_file, "r") as f:
-            content = f.read()
-            
         findings = []
-        if 'if p_score <= 1' in content or 'security_override' in content:
-            findings.append("Rule of Security: implemented as deterministic Python logic")
-        if 'fact_supremacy' in content or 'overruled' in content.lower():
-            findings.append("Rule of Evidence (Fact Supremacy): implemented as deterministic Python logic")
-        if 'functionality_weight' in content:
-            findings.append("Rule of Functionality Weight: implemented as deterministic Python logic")
-        if 'variance > 2' in content:
-            findings.append("Dissent Summary/Re-evaluation rule for high variance triggered")
-        if 'AuditReport' in content and 'Markdown' in content or 'report_writer' in content:
-            findings.append("Structured output: Final report synthesized into AuditReport/Markdown")
-            
-        if 'llm' not in content.lower().split('def chief_justice')[1][:500]:
-            findings.append("Conflict resolution is purely deterministic Python logic (No LLM prompt synthesis)")
+        for module in modules:
+            content = module.source
+            if 'if p_score <= 1' in content or 'security_override' in content:
+                findings.append("Rule of Security: implemented as deterministic Python logic")
+            if 'fact_supremacy' in content or 'overruled' in content.lower():
+                findings.append("Rule of Evidence (Fact Supremacy): implemented as deterministic Python logic")
+            if 'functionality_weight' in content:
+                findings.append("Rule of Functionality Weight: implemented as deterministic Python logic")
+            if 'variance > 2' in content:
+                findings.append("Dissent Summary/Re-evaluation rule for high variance triggered")
+            if 'AuditReport' in content and 'Markdown' in content or 'report_writer' in content:
+                findings.append("Structured output: Final report synthesized into AuditReport/Markdown")
+
+            for name, nodes in module.functions.items():
+                # Same window as before the index: the 500 characters after `def chief_justice`
+                if name.startswith('chief_justice') and all('llm' not in module.segment(n).lower().split('def chief_justice', 1)[-1][:500] for n in nodes):
+                    findings.append("Conflict resolution is purely deterministic Python logic (No LLM prompt synthesis)")
             
-        return f"Chief Justice Analysis: {'; '.join(set(findings)) if findings else 'Minimal deterministic synthesis found'}"
+        return f"Chief Justice Analysis: {'; '.join(dict.fromkeys(findings)) if findings else 'Minimal deterministic synthesis found'}"
     except Exception as e:
         return f"Chief Justice analysis failed: {e}"
 
 def analyze_security_features(repo_path: str) -> str:
-    """Analyze the repository for safe tool engineering practices."""
+    """Analyze every module that spawns processes for safe tool engineering practices."""
     findings = []
-    
-    # Try to find repo_tools.py
-    tools_file = os.path.join(repo_path, "src/tools/repo_tools.py")
+    index = get_repo_index(repo_path)
+    modules = _target_modules(repo_path, "security")
         
-    if os.path.exists(tools_file):
-        try:
-            with open(tools_file, "r") as f:
-                content = f.read()
-                tree = ast.parse(content)
-                
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import) or isinstance(node, ast.ImportFrom):
-                    names = [n.name for n in node.names]
-                    if 'subprocess' in names or isinstance(node, ast.ImportFrom) and node.module == 'subprocess':
-                        findings.append("Uses 'subprocess' module")
-                    if 'tempfile' in names or isinstance(node, ast.ImportFrom) and node.module == 'tempfile':
-                        findings.append("Uses 'tempfile' for isolated sandboxing")
-                
-                if isinstance(node, ast.Call):
-                    if hasattr(node.func, 'attr') and node.func.attr == 'run':
-                        findings.append("Uses 'subprocess.run' safely")
-                        
-            if 'is_safe_url' in content:
-                findings.append("Implements strict URL sanitization (is_safe_url)")
-            if 'TemporaryDirectory' in content:
-                findings.append("Uses 'tempfile.TemporaryDirectory()' for sandbox isolation")
-                
-        except Exception as e:
-            findings.append(f"AST parsing of tools failed: {e}")
-    else:
-        findings.append("No repo_tools.py found for security analysis.")
+    if not modules:
+        findings.append("No subprocess usage found for security analysis.")
+    for module in modules:
+        content = module.source
+        if module.imports_module('subprocess'):
+            findings.append(f"Uses 'subprocess' module ({module.rel_path})")
+        for node in module.calls_to(*SUBPROCESS_CALLS, 'system'):
+            where = f"{module.rel_path}:{node.lineno}"
+            if isinstance(node.func, ast.Attribute) and node.func.attr == 'system' and getattr(node.func.value, 'id', '') == 'os':
+                findings.append(f"Failure pattern: os.system call at {where}")
+            elif any(kw.arg == 'shell' and getattr(kw.value, 'value', False) is True for kw in node.keywords):
+                findings.append(f"Failure pattern: shell=True subprocess call at {where}")
+            elif isinstance(node.func, ast.Attribute) and node.func.attr == 'run':
+                findings.append("Uses 'subprocess.run' safely")
+        if 'is_safe_url' in content:
+            findings.append("Implements strict URL sanitization (is_safe_url)")
+
+    for path in index.find(lambda s: s.imports_module('tempfile')):
+        findings.append("Uses 'tempfile' for isolated sandboxing")
+        module = index.module(path)
+        if module is not None and 'TemporaryDirectory' in module.source:
+            findings.append("Uses 'tempfile.TemporaryDirectory()' for sandbox isolation")
         
     findings.append("Subprocess executions isolated within Tempfile Directories.")
         
-    return f"Security Analysis: {'; '.join(set(findings)) if findings else 'No security features found'}"
+    return f"Security Analysis: {'; '.join(dict.fromkeys(findings)) if findings else 'No security features found'}"
@@ -0,0 +1,284 @@
+"""
+Memory-mapped, int8-quantized IVF vector index for the report corpus.
+Vectors are L2-normalized, assigned to the nearest of `nlist` k-means centroids (the inverted
+lists) and stored row-quantized to int8 with one float32 scale per row, so a 384-d MiniLM vector
+costs 388 bytes on disk and nothing in RAM until a probed list is touched. Metadata is plain
+JSON / JSON Lines, never pickle.
+
+Layout of an index directory:
+    meta.json            dim, nlist, model, row counts and the list of segments
+    centroids.f32        nlist x dim float32
+    seg_NNNNN/           one immutable segment per add(); rows grouped by inverted list
+        vectors.i8       rows x dim int8
+        scales.f32       rows float32
+        lists.i64        nlist + 1 row offsets (list l = rows lists[l]:lists[l+1])
+        records.jsonl    one JSON record per row, same order
+        records.i64      rows + 1 byte offsets into records.jsonl
+        sources.json     ids of the sources (e.g. vector namespaces) in this segment
+Segments are written to a staging directory and renamed into place, then meta.json is replaced
+atomically, so readers always see a consistent snapshot while a writer appends.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+FORMAT_VERSION = 1
+# k-means settings for training the inverted lists
+KMEANS_ITERATIONS = 12
+MAX_TRAINING_ROWS = 50000
+# Minimum training rows per centroid (smaller corpora get fewer lists)
+ROWS_PER_LIST = 32
+DEFAULT_NLIST = int(os.environ.get("AUDITOR_CORPUS_NLIST", "1024"))
+DEFAULT_NPROBE = int(os.environ.get("AUDITOR_CORPUS_NPROBE", "16"))
+# Rows scored per matrix product when assigning vectors to lists
+ASSIGN_BATCH = 8192
+
+
+def _normalize(vectors):
+    import numpy as np
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _nearest(vectors, centroids):
+    """Index of the most similar centroid for each (normalized) row, computed in batches."""
+    import numpy as np
+    assign = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), ASSIGN_BATCH):
+        assign[start:start + ASSIGN_BATCH] = np.argmax(vectors[start:start + ASSIGN_BATCH] @ centroids.T, axis=1)
+    return assign
+
+
+def train_centroids(sample, nlist: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0):
+    """Spherical k-means over normalized rows; empty lists are reseeded from random rows."""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    sample = _normalize(sample)
+    nlist = max(1, min(nlist, len(sample)))
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _nearest(sample, centroids)
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=nlist)
+        sums = np.zeros_like(centroids)
+        filled = np.flatnonzero(counts)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[filled]
+        sums[filled] = np.add.reduceat(sample[order], starts, axis=0)
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+def quantize(vectors):
+    """Symmetric per-row int8 quantization: row ~= q * scale."""
+    import numpy as np
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    q = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return q, scales.astype(np.float32)
+
+
+def _write_json(path: str, data) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class _Segment:
+    """Read-only memory maps over one segment directory."""
+
+    def __init__(self, path: str, rows: int, dim: int, nlist: int):
+        import numpy as np
+        self.path = path
+        self.vectors = np.memmap(os.path.join(path, "vectors.i8"), dtype=np.int8, mode="r", shape=(rows, dim))
+        self.scales = np.memmap(os.path.join(path, "scales.f32"), dtype=np.float32, mode="r", shape=(rows,))
+        self.lists = np.fromfile(os.path.join(path, "lists.i64"), dtype=np.int64, count=nlist + 1)
+        self.record_offsets = np.memmap(os.path.join(path, "records.i64"), dtype=np.int64, mode="r", shape=(rows + 1,))
+
+    def record(self, row: int) -> dict:
+        start, end = int(self.record_offsets[row]), int(self.record_offsets[row + 1])
+        with open(os.path.join(self.path, "records.jsonl"), "rb") as f:
+            f.seek(start)
+            return json.loads(f.read(end - start))
+
+
+class QuantizedIndex:
+    """Append-only IVF index over memory-mapped int8 segments. Opening it reads only meta.json and the centroids."""
+
+    def __init__(self, path: str):
+        import numpy as np
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r") as f:
+            self.meta = json.load(f)
+        if self.meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported vector index format {self.meta.get('format')} at {path}")
+        self.dim = self.meta["dim"]
+        self.nlist = self.meta["nlist"]
+        self.centroids = np.fromfile(os.path.join(path, "centroids.f32"), dtype=np.float32).reshape(self.nlist, self.dim)
+        self._segments: Dict[str, _Segment] = {}
+        self._lock = threading.Lock()
+        self._writer = threading.RLock()
+        self._writer_depth = 0
+
+    @classmethod
+    def open(cls, path: str) -> Optional["QuantizedIndex"]:
+        if not os.path.exists(os.path.join(path, "meta.json")):
+            return None
+        return cls(path)
+
+    @classmethod
+    def create(cls, path: str, training_vectors, nlist: int = DEFAULT_NLIST, **meta) -> "QuantizedIndex":
+        """Train the inverted lists on a sample and publish an empty index at path (replacing none)."""
+        import numpy as np
+        training_vectors = np.asarray(training_vectors, dtype=np.float32)
+        if len(training_vectors) > MAX_TRAINING_ROWS:
+            rng = np.random.default_rng(0)
+            training_vectors = training_vectors[rng.choice(len(training_vectors), MAX_TRAINING_ROWS, replace=False)]
+        nlist = max(1, min(nlist, len(training_vectors) // ROWS_PER_LIST))
+        centroids = train_centroids(training_vectors, nlist)
+
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".staging_", dir=parent)
+        centroids.astype(np.float32).tofile(os.path.join(staging, "centroids.f32"))
+        _write_json(os.path.join(staging, "meta.json"), {
+            "format": FORMAT_VERSION,
+            "metric": "cosine",
+            "quantization": "int8",
+            "dim": int(centroids.shape[1]),
+            "nlist": int(centroids.shape[0]),
+            "trained_rows": int(len(training_vectors)),
+            "rows": 0,
+            "segments": [],
+            **meta,
+        })
+        os.rename(staging, path)
+        return cls(path)
+
+    @property
+    def rows(self) -> int:
+        return self.meta["rows"]
+
+    @contextmanager
+    def writer(self):
+        """Exclusive writer lock across processes, re-entrant within this instance.
+
+        Hold it around a check of sources() and the add() calls that depend on it, so concurrent
+        writers never append the same source twice.
+        """
+        import fcntl
+        with self._writer:
+            if self._writer_depth:
+                self._writer_depth += 1
+                try:
+                    yield
+                finally:
+                    self._writer_depth -= 1
+                return
+            with open(os.path.join(self.path, ".lock"), "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._writer_depth = 1
+                try:
+                    yield
+                finally:
+                    self._writer_depth = 0
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def reload(self) -> None:
+        """Pick up segments added by other processes."""
+        with open(os.path.join(self.path, "meta.json"), "r") as f:
+            meta = json.load(f)
+        with self._lock:
+            self.meta = meta
+
+    def sources(self) -> Set[str]:
+        """Ids of every source added so far."""
+        found: Set[str] = set()
+        for segment in self.meta["segments"]:
+            with open(os.path.join(self.path, segment["name"], "sources.json"), "r") as f:
+                found.update(json.load(f))
+        return found
+
+    def add(self, vectors, records: Sequence[dict], sources: Sequence[str] = ()) -> int:
+        """Quantize and append vectors (one record each) as a new immutable segment. Returns rows added."""
+        import numpy as np
+        if len(records) == 0:
+            return 0
+        vectors = _normalize(vectors)
+        if vectors.shape != (len(records), self.dim):
+            raise ValueError(f"Expected {len(records)} x {self.dim} vectors, got {vectors.shape}")
+        assign = _nearest(vectors, self.centroids)
+        order = np.argsort(assign, kind="stable")
+        q, scales = quantize(vectors[order])
+        lists = np.concatenate(([0], np.cumsum(np.bincount(assign, minlength=self.nlist)))).astype(np.int64)
+
+        staging = tempfile.mkdtemp(prefix=".staging_", dir=self.path)
+        q.tofile(os.path.join(staging, "vectors.i8"))
+        scales.tofile(os.path.join(staging, "scales.f32"))
+        lists.tofile(os.path.join(staging, "lists.i64"))
+        offsets = np.empty(len(records) + 1, dtype=np.int64)
+        offsets[0] = 0
+        with open(os.path.join(staging, "records.jsonl"), "wb") as f:
+            for i, row in enumerate(order):
+                line = (json.dumps(records[row], ensure_ascii=False) + "\n").encode("utf-8")
+                f.write(line)
+                offsets[i + 1] = offsets[i] + len(line)
+        offsets.tofile(os.path.join(staging, "records.i64"))
+        _write_json(os.path.join(staging, "sources.json"), list(sources))
+
+        with self.writer():
+            self.reload()
+            name = f"seg_{len(self.meta['segments']):05d}"
+            os.rename(staging, os.path.join(self.path, name))
+            meta = dict(self.meta)
+            meta["segments"] = meta["segments"] + [{"name": name, "rows": int(len(records))}]
+            meta["rows"] = meta["rows"] + int(len(records))
+            _write_json(os.path.join(self.path, "meta.json"), meta)
+            with self._lock:
+                self.meta = meta
+        return len(records)
+
+    def _segment(self, name: str, rows: int) -> _Segment:
+        with self._lock:
+            if name not in self._segments:
+                self._segments[name] = _Segment(os.path.join(self.path, name), rows, self.dim, self.nlist)
+            return self._segments[name]
+
+    def search(self, queries, k: int = 5, nprobe: int = DEFAULT_NPROBE) -> List[List[Tuple[float, dict]]]:
+        """Top-k (cosine similarity, record) per query, scanning only the nprobe nearest lists of each segment."""
+        import numpy as np
+        queries = _normalize(queries)
+        nprobe = max(1, min(nprobe, self.nlist))
+        probes = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :nprobe]
+        segments = [self._segment(s["name"], s["rows"]) for s in self.meta["segments"]]
+
+        results = []
+        for query, lists in zip(queries, probes):
+            scores, owners, rows = [], [], []
+            for s, segment in enumerate(segments):
+                for l in lists:
+                    start, end = int(segment.lists[l]), int(segment.lists[l + 1])
+                    if start == end:
+                        continue
+                    # Only the probed slice of the int8 matrix is paged in
+                    block = segment.vectors[start:end].astype(np.float32)
+                    scores.append((block @ query) * segment.scales[start:end])
+                    owners.append(np.full(end - start, s))
+                    rows.append(np.arange(start, end))
+            if not scores:
+                results.append([])
+                continue
+            scores, owners, rows = np.concatenate(scores), np.concatenate(owners), np.concatenate(rows)
+            top = np.argpartition(-scores, min(k, len(scores)) - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            results.append([(float(scores[i]), segments[owners[i]].record(int(rows[i]))) for i in top])
+        return results
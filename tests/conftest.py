@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# Cache roots are read at import time: point them at a scratch dir before any src module loads
+os.environ.setdefault("AUDITOR_CACHE_DIR", tempfile.mkdtemp(prefix="auditor-tests-"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,70 @@
+from src.tools.chunking import chunk_markdown, count_tokens
+
+
+def _sentences(prefix, n):
+    return " ".join(f"{prefix} sentence number {i} describes the audit." for i in range(n))
+
+
+def test_count_tokens_splits_identifiers_and_long_words():
+    assert count_tokens("the state graph") == 3
+    # BERT splits on '_': with _ structured _ output, and 'structured' is long enough to count twice
+    assert count_tokens("with_structured_output") == 6
+    assert count_tokens("with_structured_output") > len("with_structured_output".split("_"))
+
+
+def test_section_paths_follow_heading_nesting():
+    markdown = (
+        "# 1 Introduction\n\nWhy we built it.\n\n"
+        # Docling flattened these to ##; the numbering still gives their depth
+        "## 2 Architecture\n\nOverview.\n\n"
+        "## 2.1 State\n\nReducers merge evidence.\n\n"
+        "## 2.1.1 Reducers\n\noperator.add for opinions.\n\n"
+        "## 3 Results\n\nScores.\n"
+    )
+    sections = [chunk.section for chunk in chunk_markdown(markdown)]
+    assert sections == [
+        "1 Introduction",
+        "2 Architecture",
+        "2 Architecture > 2.1 State",
+        "2 Architecture > 2.1 State > 2.1.1 Reducers",
+        "3 Results",
+    ]
+    chunk = chunk_markdown(markdown)[2]
+    assert chunk.text == "2 Architecture > 2.1 State\nReducers merge evidence."
+
+
+def test_tables_split_between_rows_with_header_repeated():
+    header = ["| Dimension | Score | Notes |", "|---|---|---|"]
+    rows = [f"| dimension_{i} | {i % 5} | judged by three personas |" for i in range(40)]
+    markdown = "# Scores\n\n" + "\n".join(header + rows) + "\n"
+    chunks = chunk_markdown(markdown, max_tokens=120, overlap_tokens=20)
+
+    assert len(chunks) > 1
+    seen = []
+    for chunk in chunks:
+        body = chunk.text.split("\n")[1:]
+        assert body[:2] == header
+        assert all(line.startswith("| dimension_") for line in body[2:])
+        seen.extend(body[2:])
+        assert chunk.tokens <= 120
+    # Every row exactly once: tables are never carried over as overlap
+    assert seen == rows
+
+
+def test_overlap_stays_within_a_section():
+    markdown = f"# A\n\n{_sentences('Alpha', 30)}\n\n# B\n\n{_sentences('Beta', 30)}\n"
+    chunks = chunk_markdown(markdown, max_tokens=80, overlap_tokens=20)
+
+    for section in ("A", "B"):
+        ours = [c for c in chunks if c.section == section]
+        assert len(ours) > 1
+        for previous, chunk in zip(ours, ours[1:]):
+            last_sentence = previous.text.rsplit("\n", 1)[-1]
+            assert last_sentence in chunk.text
+    first_b = next(c for c in chunks if c.section == "B")
+    assert "Alpha" not in first_b.text
+
+
+def test_chunks_fit_the_budget():
+    markdown = "# 1 Design\n\n" + _sentences("LangGraph orchestration with_structured_output", 60)
+    assert all(chunk.tokens <= 100 for chunk in chunk_markdown(markdown, max_tokens=100))
@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from src.llm import circuit_breaker
+from src.llm.circuit_breaker import CircuitBreaker
+from src.nodes import judges
+
+
+def _half_open(breaker, provider="groq"):
+    """Open the circuit, then let its cooldown lapse so the next allow() claims the probe."""
+    for _ in range(circuit_breaker.FAILURE_THRESHOLD):
+        breaker.record_failure(provider, RuntimeError("boom"))
+    breaker.health(provider).open_until = time.monotonic() - 1
+    return provider
+
+
+def test_half_open_admits_one_probe_until_released():
+    breaker = CircuitBreaker()
+    provider = _half_open(breaker)
+    assert breaker.allow(provider)
+    assert not breaker.allow(provider)
+    breaker.release(provider)
+    assert breaker.allow(provider)
+
+
+def test_release_after_recorded_failure_keeps_circuit_open():
+    breaker = CircuitBreaker()
+    provider = _half_open(breaker)
+    assert breaker.allow(provider)
+    breaker.record_failure(provider, RuntimeError("still down"))
+    breaker.release(provider)
+    assert breaker.is_open(provider)
+    assert not breaker.allow(provider)
+
+
+class NoStructuredOutput:
+    model_name = "no-structured-output"
+
+    def with_structured_output(self, schema):
+        return None
+
+
+def test_judge_skipping_a_model_does_not_hold_its_probe(monkeypatch):
+    breaker = CircuitBreaker()
+    model = NoStructuredOutput()
+    monkeypatch.setattr(judges, "breaker", breaker)
+    monkeypatch.setattr(judges, "fallback_chain", lambda *args: [model])
+    provider = _half_open(breaker, judges.provider_name(model))
+
+    state = {"evidences": {}, "rubric_dimensions": [{"id": "graph_orchestration"}], "fresh": True}
+    opinions = asyncio.run(judges.get_judge_opinion("TechLead", state))
+
+    assert all(op.is_automated_fallback for op in opinions)
+    assert not breaker.health(provider).probe_in_flight
+    assert breaker.allow(provider)
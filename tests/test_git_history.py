@@ -0,0 +1,36 @@
+import pytest
+
+from src.tools.git_history import CommitRecord, ProgressionTracker
+
+
+def _phases(*subjects):
+    tracker = ProgressionTracker()
+    for i, subject in enumerate(subjects):
+        tracker.add(CommitRecord(sha=f"{i:040x}", timestamp=1_700_000_000 + i * 3600, author="a", subject=subject))
+    return tracker.phase_first_seen
+
+
+@pytest.mark.parametrize("subject", [
+    "Update environment variables in the README",
+    "Bump nodes in the benchmark cluster",
+    "Document development workflow",
+    "Reconfigure the linter",
+])
+def test_keywords_inside_other_words_do_not_count(subject):
+    assert _phases(subject) == {}
+
+
+@pytest.mark.parametrize("subject,phase", [
+    ("Initial commit", "setup"),
+    ("Add .env.example", "setup"),
+    ("feat(graph): wire add_node for judges", "graph"),
+    ("Fan-out edges for the detectives", "graph"),
+    ("Move repo tools into src/tools", "tools"),
+])
+def test_whole_word_keywords_mark_their_phase(subject, phase):
+    assert phase in _phases(subject)
+
+
+def test_progression_order_from_first_matches():
+    seen = _phases("Project skeleton", "Add git sandbox tool", "Build the StateGraph edges")
+    assert sorted(seen, key=lambda p: seen[p][0]) == ["setup", "tools", "graph"]
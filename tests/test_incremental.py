@@ -0,0 +1,60 @@
+from src import incremental
+from src.state import Evidence, JudicialOpinion
+
+RUBRIC = [{"id": "graph_orchestration"}, {"id": "git_forensic_analysis"}, {"id": "swarm_visual"}]
+JUDGES = ("Prosecutor", "Defense", "TechLead")
+
+
+def _evidence(graph="StateGraph found in src/graph.py", history="12 commits", vision="Fan-out to three detectives."):
+    return {
+        "repo_investigator": [
+            Evidence(detective_name="RepoInvestigator", goal="graph", found=True, content=graph,
+                     location="src/graph.py", dimensions=["graph_orchestration"], rationale="", confidence=1.0),
+            Evidence(detective_name="RepoInvestigator", goal="history", found=True, content=history,
+                     location="Git Log", dimensions=["git_forensic_analysis"], rationale="", confidence=1.0),
+        ],
+        "vision_inspector": [
+            Evidence(detective_name="VisionInspector", goal="Analyze diagram", found=True, content=vision,
+                     location="architecture.png", dimensions=["swarm_visual"], rationale="", confidence=0.95,
+                     metrics={"input_sha256": "ab" * 32}),
+        ],
+    }
+
+
+def _opinions(cited):
+    return [JudicialOpinion(judge=judge, criterion_id=dim["id"], score=4, argument="", cited_evidence=cited[dim["id"]])
+            for dim in RUBRIC for judge in JUDGES]
+
+
+def _baseline(tmp_path, monkeypatch):
+    monkeypatch.setattr(incremental, "AUDIT_HISTORY_DIR", str(tmp_path))
+    cited = {"graph_orchestration": ["0"], "git_forensic_analysis": ["1"], "swarm_visual": ["2"]}
+    incremental.save_snapshot("https://github.com/o/r", _evidence(), RUBRIC, _opinions(cited))
+
+
+def test_unchanged_repo_judges_nothing(tmp_path, monkeypatch):
+    _baseline(tmp_path, monkeypatch)
+    # A re-sampled vision description of the same image is not a change
+    to_judge, reused = incremental.plan_incremental(
+        "https://github.com/o/r.git", _evidence(vision="Three detectives fan out."), RUBRIC)
+    assert to_judge == []
+    assert len(reused) == len(RUBRIC) * len(JUDGES)
+
+
+def test_changed_analyzer_rejudges_only_its_dimensions(tmp_path, monkeypatch):
+    _baseline(tmp_path, monkeypatch)
+    to_judge, reused = incremental.plan_incremental("https://github.com/o/r", _evidence(history="13 commits"), RUBRIC)
+    assert to_judge == ["git_forensic_analysis"]
+    assert {op.criterion_id for op in reused} == {"graph_orchestration", "swarm_visual"}
+
+
+def test_reused_citations_follow_evidence_to_new_ids(tmp_path, monkeypatch):
+    _baseline(tmp_path, monkeypatch)
+    evidences = _evidence(history="13 commits")
+    # A new detective's evidence numbered first shifts every existing ID by one
+    evidences = {"doc_analyst": [Evidence(detective_name="DocAnalyst", goal="Ingest PDF", found=True, content="",
+                                          location="report.pdf", dimensions=["theoretical_depth"], rationale="",
+                                          confidence=0.9)], **evidences}
+    _, reused = incremental.plan_incremental("https://github.com/o/r", evidences, RUBRIC)
+    cited = {op.criterion_id: op.cited_evidence for op in reused}
+    assert cited == {"graph_orchestration": ["1"], "swarm_visual": ["3"]}
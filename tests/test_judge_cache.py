@@ -0,0 +1,103 @@
+import asyncio
+
+from langchain_core.messages import AIMessage
+
+from src.llm.response_cache import ResponseCache
+from src.nodes import detectives, judges
+from src.state import JudicialOpinion
+
+RUBRIC = [
+    {"id": "theoretical_depth", "target_artifact": "pdf_report"},
+    {"id": "swarm_visual", "target_artifact": "pdf_images"},
+]
+
+
+class FakeGoogleVision:
+    """Vision model whose description differs on every call, like a sampled LLM."""
+    model_name = "fake-vision"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        return AIMessage(content=f"Diagram shows fan-out (run {self.calls})")
+
+
+class FakeJudgeModel:
+    model_name = "fake-judge"
+
+    def __init__(self):
+        self.calls = 0
+
+    def with_structured_output(self, schema):
+        return self
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        return judges.BatchJudicialOpinion(opinions=[
+            JudicialOpinion(criterion_id=dim["id"], score=4, argument="ok", cited_evidence=["0"]) for dim in RUBRIC
+        ])
+
+
+def _clone(tmp_path, name):
+    """A sandbox checkout as RepoSandbox would create it: same files, different temp path."""
+    repo = tmp_path / name
+    repo.mkdir()
+    (repo / "architecture.png").write_bytes(b"\x89PNG same diagram")
+    (repo / "report.pdf").write_bytes(b"%PDF-1.4 same report")
+    return str(repo)
+
+
+def _audit(repo_path, vision_model):
+    state = {"repo_path": repo_path, "pdf_path": "report.pdf", "rubric_dimensions": RUBRIC}
+    evidences = {}
+    evidences.update(detectives.doc_analyst(state)["evidences"])
+    evidences.update(asyncio.run(detectives.vision_inspector(state))["evidences"])
+    return {**state, "evidences": evidences}
+
+
+def test_second_audit_of_same_repo_hits_judge_cache(tmp_path, monkeypatch):
+    from src.tools import doc_tools
+    cache = ResponseCache(root=str(tmp_path / "llm"))
+    vision, judge = FakeGoogleVision(), FakeJudgeModel()
+    monkeypatch.setattr(judges, "response_cache", cache)
+    monkeypatch.setattr(detectives, "response_cache", cache)
+    monkeypatch.setattr(detectives, "fallback_chain", lambda *args: [vision])
+    monkeypatch.setattr(judges, "fallback_chain", lambda *args: [judge])
+    monkeypatch.setattr(doc_tools, "document_namespace", lambda path: "ns")
+    monkeypatch.setattr(doc_tools, "ingest_pdf", lambda path, namespace=None: [])
+    monkeypatch.setattr(doc_tools, "query_vector_store_many", lambda terms, namespace: ["Explained."] * len(terms))
+
+    first = _audit(_clone(tmp_path, "auditor_first"), vision)
+    asyncio.run(judges.get_judge_opinion("TechLead", first))
+    second = _audit(_clone(tmp_path, "auditor_second"), vision)
+    opinions = asyncio.run(judges.get_judge_opinion("TechLead", second))
+
+    locations = [ev.location for evs in second["evidences"].values() for ev in evs]
+    assert locations == ["report.pdf", "architecture.png"]
+    assert vision.calls == 1
+    assert judge.calls == 1
+    assert [op.criterion_id for op in opinions] == ["theoretical_depth", "swarm_visual"]
+
+
+def test_unwritable_cache_keeps_the_responses(tmp_path, monkeypatch):
+    from src.tools import doc_tools
+    # A regular file where the cache directory should be: every write fails with OSError
+    (tmp_path / "blocked").write_text("")
+    cache = ResponseCache(root=str(tmp_path / "blocked" / "llm"))
+    vision, judge = FakeGoogleVision(), FakeJudgeModel()
+    monkeypatch.setattr(judges, "response_cache", cache)
+    monkeypatch.setattr(detectives, "response_cache", cache)
+    monkeypatch.setattr(detectives, "fallback_chain", lambda *args: [vision])
+    monkeypatch.setattr(judges, "fallback_chain", lambda *args: [judge])
+    monkeypatch.setattr(doc_tools, "document_namespace", lambda path: "ns")
+    monkeypatch.setattr(doc_tools, "ingest_pdf", lambda path, namespace=None: [])
+    monkeypatch.setattr(doc_tools, "query_vector_store_many", lambda terms, namespace: ["Explained."] * len(terms))
+
+    state = _audit(_clone(tmp_path, "auditor_blocked"), vision)
+    opinions = asyncio.run(judges.get_judge_opinion("TechLead", state))
+
+    assert state["evidences"]["vision_inspector"][0].content == "Diagram shows fan-out (run 1)"
+    assert judge.calls == 1
+    assert not any(op.is_automated_fallback for op in opinions)
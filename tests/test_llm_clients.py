@@ -0,0 +1,34 @@
+import asyncio
+
+from src.llm import clients
+
+
+def test_roles_keep_their_provider_order(monkeypatch):
+    monkeypatch.setattr(clients, "LLM_CHAIN", None)
+    assert clients.chain_for("Prosecutor") == ["groq", "gemini", "sambanova", "openrouter", "ollama"]
+    assert clients.chain_for("Defense") == ["sambanova", "groq", "gemini", "openrouter", "ollama"]
+    assert clients.chain_for("TechLead") == ["gemini", "sambanova", "groq", "openrouter", "ollama"]
+    assert clients.chain_for("ChiefJustice") == ["sambanova", "openrouter", "ollama"]
+    assert clients.chain_for("Detective") == ["gemini", "groq", "openrouter", "ollama"]
+
+
+def test_chain_overrides(monkeypatch):
+    monkeypatch.setattr(clients, "LLM_CHAIN", "groq, ollama")
+    monkeypatch.setenv("AUDITOR_LLM_CHAIN_DEFENSE", "sambanova")
+    assert clients.chain_for("TechLead") == ["groq", "ollama"]
+    assert clients.chain_for("Defense") == ["sambanova"]
+
+
+def test_async_clients_are_per_event_loop():
+    async def ollama_pair():
+        model = clients.get_llm("ollama")
+        assert clients.registered_provider(model) == "ollama"
+        return model, clients.get_llm("ollama")
+
+    first, again = asyncio.run(ollama_pair())
+    second, _ = asyncio.run(ollama_pair())
+
+    assert first is again
+    assert first is not second
+    assert first.http_async_client is not second.http_async_client
+    assert first.http_client is second.http_client
@@ -0,0 +1,55 @@
+import os
+import shutil
+import subprocess
+import threading
+import time
+
+import pytest
+
+from src.tools.mirror_cache import MirrorCache
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+
+def _repo(tmp_path, name):
+    path = tmp_path / name
+    path.mkdir()
+    env = {**os.environ, "GIT_AUTHOR_NAME": "a", "GIT_AUTHOR_EMAIL": "a@a", "GIT_COMMITTER_NAME": "a", "GIT_COMMITTER_EMAIL": "a@a"}
+    subprocess.run(["git", "init", "-q", str(path)], check=True)
+    (path / "README.md").write_text(name)
+    subprocess.run(["git", "-C", str(path), "add", "."], check=True)
+    subprocess.run(["git", "-C", str(path), "commit", "-q", "-m", "init"], check=True, env=env)
+    return str(path)
+
+
+def test_eviction_removes_the_mirror_lock_file(tmp_path):
+    cache = MirrorCache(root=str(tmp_path / "mirrors"), max_bytes=0)
+    first = cache.checkout_worktree(_repo(tmp_path, "first"), str(tmp_path / "wt1"))
+    cache.remove_worktree(first, str(tmp_path / "wt1"))
+    second = cache.checkout_worktree(_repo(tmp_path, "second"), str(tmp_path / "wt2"))
+
+    left = sorted(os.listdir(cache.root))
+    assert not any(name.startswith(os.path.basename(first)) for name in left)
+    assert os.path.basename(second) in left
+
+
+def test_waiter_relocks_after_the_lock_file_is_unlinked(tmp_path):
+    cache = MirrorCache(root=str(tmp_path / "mirrors"))
+    path = os.path.join(cache.root, "x.git")
+    held = threading.Event()
+    acquired = []
+
+    def waiter():
+        held.wait()
+        with cache._lock(path):
+            acquired.append(os.path.exists(path + ".lock"))
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    with cache._lock(path):
+        held.set()
+        time.sleep(0.1)  # The waiter is now blocked on this lock file
+        os.remove(path + ".lock")  # As evict() does
+    thread.join(timeout=10)
+    # The waiter did not settle for the unlinked file, which no newcomer would contend on
+    assert acquired == [True]
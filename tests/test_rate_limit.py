@@ -0,0 +1,25 @@
+import asyncio
+
+from src.llm.rate_limit import LLMBudget
+
+
+async def _contend(budget, provider):
+    held = []
+
+    async def request():
+        async with budget.slot(provider):
+            held.append(1)
+            await asyncio.sleep(0.01)
+
+    # An empty bucket makes the second request wait on the bucket lock, a one-slot budget on the semaphore
+    budget.bucket(provider).tokens = 0.0
+    await asyncio.gather(request(), request())
+    return len(held)
+
+
+def test_budget_survives_successive_event_loops(monkeypatch):
+    monkeypatch.setenv("AUDITOR_RPM_FAKE", "6000")
+    budget = LLMBudget(max_concurrent=1)
+    assert asyncio.run(_contend(budget, "fake")) == 2
+    # A second asyncio.run (next CLI audit, batch after prefetch) reuses the same budget
+    assert asyncio.run(_contend(budget, "fake")) == 2
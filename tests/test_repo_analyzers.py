@@ -0,0 +1,201 @@
+"""Analyzer output on a fixture repository, before and after the shared parse index."""
+
+import pytest
+
+from src.tools import repo_tools
+
+# A repository in the canonical layout the analyzers were first written for
+FIXTURE = {
+    "src/state.py": '''import operator
+from typing import Annotated, Dict, List, TypedDict
+from pydantic import BaseModel
+
+
+class Evidence(BaseModel):
+    goal: str
+    found: bool
+
+
+class JudicialOpinion(BaseModel):
+    judge: str
+    score: int
+
+
+class AgentState(TypedDict):
+    evidences: Annotated[Dict[str, List[Evidence]], operator.ior]
+    opinions: Annotated[List[JudicialOpinion], operator.add]
+''',
+    "src/graph.py": '''from langgraph.graph import StateGraph, END
+from src.state import AgentState
+
+
+def build_graph():
+    builder = StateGraph(AgentState)
+    builder.add_node("repo_investigator", lambda s: s)
+    builder.add_node("doc_analyst", lambda s: s)
+    builder.add_node("judges_entry", lambda s: s)
+    builder.add_node("prosecutor", lambda s: s)
+    builder.add_edge("load_rubric", "repo_investigator")
+    builder.add_edge("load_rubric", "doc_analyst")
+    builder.add_edge("judges_entry", "prosecutor")
+    builder.add_edge("prosecutor", END)
+    return builder.compile()
+''',
+    "src/nodes/judges.py": '''from src.state import JudicialOpinion
+
+PROSECUTOR = "Prosecutor: Trust No One. Flag every CRITICAL FAILURE."
+DEFENSE = "Defense: you are the ADVOCATE for the student."
+TECH_LEAD = "TechLead: judge PRODUCTION READINESS like a senior architect."
+
+
+def _opine(llm, prompt):
+    structured = llm.with_structured_output(JudicialOpinion)
+    for attempt in range(3):
+        try:
+            return structured.invoke(prompt)
+        except ValueError:
+            continue  # retry with the same prompt
+    return None
+
+
+def prosecutor(state, llm):
+    return _opine(llm, PROSECUTOR + " Give an argument and cited_evidence.")
+
+
+def defense(state, llm):
+    return _opine(llm, DEFENSE)
+
+
+def tech_lead(state, llm):
+    return _opine(llm, TECH_LEAD)
+''',
+    "src/nodes/justice.py": '''def chief_justice(state):
+    """Deterministic synthesis of the three opinions."""
+    opinions = state["opinions"]
+    scores = [o.score for o in opinions]
+    p_score = min(scores)
+    security_override = p_score <= 1
+    variance = max(scores) - min(scores)
+    if variance > 2:
+        state["dissent"] = True
+    functionality_weight = 2
+    return report_writer(state, security_override, functionality_weight)
+
+
+def report_writer(state, override, weight):
+    return "# AuditReport\\n(Markdown)"
+''',
+    "src/tools/repo_tools.py": '''import asyncio
+import subprocess
+import tempfile
+
+
+def is_safe_url(url):
+    return url.startswith("https://")
+
+
+def clone(url):
+    if not is_safe_url(url):
+        raise ValueError(url)
+    with tempfile.TemporaryDirectory() as tmp:
+        subprocess.run(["git", "clone", url, tmp], check=True)
+''',
+}
+
+# Output of the analyzers before the shared index (baseline commit), one finding per entry.
+# They joined set(findings), so their order varied between runs; only the sets are compared.
+BASELINE = {
+    "analyze_graph_structure": {
+        "[VERIFIED] Parallel Fan-Out for Detectives (RepoInvestigator, DocAnalyst, VisionInspector)",
+        "[VERIFIED] Parallel Fan-Out for Judges (Prosecutor, Defense, TechLead)",
+        "StateGraph instantiation found",
+        "Graph method add_node called with args: 'repo_investigator', lambda s: s",
+        "Graph method add_node called with args: 'doc_analyst', lambda s: s",
+        "Graph method add_node called with args: 'judges_entry', lambda s: s",
+        "Graph method add_node called with args: 'prosecutor', lambda s: s",
+        "Graph method add_edge called with args: 'load_rubric', 'repo_investigator'",
+        "Graph method add_edge called with args: 'load_rubric', 'doc_analyst'",
+        "Graph method add_edge called with args: 'judges_entry', 'prosecutor'",
+        "Graph method add_edge called with args: 'prosecutor', END",
+    },
+    "analyze_state_management": {
+        "Pydantic model found: Evidence",
+        "Pydantic model found: JudicialOpinion",
+        "Annotated reducer: Annotated[Dict[str, List[Evidence]], operator.ior]",
+        "Annotated reducer: Annotated[List[JudicialOpinion], operator.add]",
+        "Uses 'operator.add' as state reducer",
+        "Uses 'operator.ior' as state reducer",
+        "Uses 'TypedDict' for AgentState",
+    },
+    "analyze_structured_output": {
+        "Uses '.with_structured_output()' for LLM enforcement",
+        "Implements retry logic for LLM calls",
+        "Uses specifically named 'argument' and 'cited_evidence' fields per rubric",
+    },
+    "analyze_judicial_nuance": {
+        "Three distinct personas defined",
+        "Prosecutor has adversarial instructions",
+        "Defense has advocacy instructions",
+        "Tech Lead has production-readiness focus",
+    },
+    "analyze_chief_justice_synthesis": {
+        "Rule of Security: implemented as deterministic Python logic",
+        "Rule of Functionality Weight: implemented as deterministic Python logic",
+        "Dissent Summary/Re-evaluation rule for high variance triggered",
+        "Structured output: Final report synthesized into AuditReport/Markdown",
+        "Conflict resolution is purely deterministic Python logic (No LLM prompt synthesis)",
+    },
+    "analyze_security_features": {
+        "Uses 'subprocess' module",
+        "Uses 'subprocess.run' safely",
+        "Implements strict URL sanitization (is_safe_url)",
+        "Uses 'tempfile' for isolated sandboxing",
+        "Uses 'tempfile.TemporaryDirectory()' for sandbox isolation",
+        "Subprocess executions isolated within Tempfile Directories.",
+    },
+}
+
+# The only intended differences: findings now name the file they were found in
+RENAMED = {
+    "StateGraph instantiation found": "StateGraph instantiation found in src/graph.py",
+    "Pydantic model found: Evidence": "Pydantic model found: Evidence (src/state.py)",
+    "Pydantic model found: JudicialOpinion": "Pydantic model found: JudicialOpinion (src/state.py)",
+    "Uses 'TypedDict' for AgentState": "Uses 'TypedDict' for state: AgentState (src/state.py)",
+    "Uses '.with_structured_output()' for LLM enforcement":
+        "Uses '.with_structured_output()' for LLM enforcement (src/nodes/judges.py)",
+    "Uses 'subprocess' module": "Uses 'subprocess' module (src/tools/repo_tools.py)",
+}
+
+
+def _write(root, files):
+    for rel_path, source in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source)
+    return str(root)
+
+
+def _findings(output):
+    if output.startswith("Graph & State AST Analysis:\n"):
+        return output.split("\n")[1:]
+    return output.split(": ", 1)[1].split("; ")
+
+
+@pytest.mark.parametrize("analyzer", sorted(BASELINE))
+def test_output_matches_baseline(tmp_path, analyzer):
+    findings = _findings(getattr(repo_tools, analyzer)(_write(tmp_path, FIXTURE)))
+    assert len(findings) == len(set(findings))
+    assert set(findings) == {RENAMED.get(f, f) for f in BASELINE[analyzer]}
+
+
+def test_findings_follow_source_order(tmp_path):
+    findings = _findings(repo_tools.analyze_graph_structure(_write(tmp_path, FIXTURE)))
+    nodes = [f for f in findings if f.startswith("Graph method add_node")]
+    assert [n.split("'")[1] for n in nodes] == ["repo_investigator", "doc_analyst", "judges_entry", "prosecutor"]
+
+
+def test_structured_output_needs_a_call(tmp_path):
+    # The baseline matched the substring anywhere in judges.py, comments included
+    judges = "# TODO: use llm.with_structured_output(JudicialOpinion)\ndef prosecutor(state, llm):\n    return llm.invoke('x')\n"
+    output = repo_tools.analyze_structured_output(_write(tmp_path, {"src/nodes/judges.py": judges}))
+    assert output.startswith("Structured Output Analysis: no .with_structured_output() calls found")
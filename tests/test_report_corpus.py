@@ -0,0 +1,71 @@
+import os
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.tools import doc_tools  # noqa: E402
+
+ROWS = 40
+
+
+class _Namespace:
+    def chunks(self):
+        return ["chunk"] * ROWS
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    published = ["a"]
+
+    def corpus_rows(namespaces):
+        time.sleep(0.05)  # Embedding is slow; gives concurrent callers a window
+        rng = np.random.default_rng(len(namespaces))
+        records = [{"namespace": ns, "chunk": i, "text": "t"} for ns in namespaces for i in range(ROWS)]
+        return rng.normal(size=(len(records), 8)), records
+
+    monkeypatch.setattr(doc_tools, "CACHE_ROOT", str(tmp_path))
+    monkeypatch.setattr(doc_tools, "CORPUS_INDEX_DIR", str(tmp_path / "corpus"))
+    monkeypatch.setattr(doc_tools, "_published_namespaces", lambda: list(published))
+    monkeypatch.setattr(doc_tools, "_corpus_rows", corpus_rows)
+    monkeypatch.setattr(doc_tools, "open_vector_store", lambda namespace: _Namespace())
+    return published
+
+
+def test_rebuild_swaps_generations_without_a_gap(corpus, tmp_path):
+    doc_tools.build_report_corpus()
+    assert os.path.islink(tmp_path / "corpus")
+
+    missing, stop = [], threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            if doc_tools._open_corpus() is None:
+                missing.append(1)
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    for _ in range(3):
+        doc_tools.build_report_corpus(rebuild=True)
+    stop.set()
+    thread.join(timeout=10)
+
+    assert missing == []
+    generations = [name for name in os.listdir(tmp_path) if name.startswith(doc_tools.CORPUS_GENERATION_PREFIX)]
+    assert generations == [os.readlink(tmp_path / "corpus")]
+
+
+def test_append_during_rebuild_is_not_lost(corpus):
+    doc_tools.build_report_corpus()
+    rebuild = threading.Thread(target=doc_tools.build_report_corpus, kwargs={"rebuild": True})
+    rebuild.start()
+    time.sleep(0.02)
+    corpus.append("b")  # Published while the rebuild is embedding
+    doc_tools.build_report_corpus()
+    rebuild.join(timeout=10)
+
+    index = doc_tools._open_corpus()
+    assert index.sources() == {"a", "b"}
+    assert index.rows == 2 * ROWS
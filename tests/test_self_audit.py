@@ -0,0 +1,12 @@
+import os
+
+from src.nodes.detectives import repo_investigator
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_self_audit_locates_only_the_chief_justice_node():
+    # Registered analyzers must not look like Chief Justice nodes to the "justice" target
+    state = {"repo_path": REPO_ROOT, "rubric_dimensions": [{"id": "chief_justice_synthesis"}]}
+    evidences = repo_investigator(state)["evidences"]["repo_investigator"]
+    assert [ev.location for ev in evidences] == ["src/nodes/justice.py"]
@@ -0,0 +1,46 @@
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.tools.vector_index import QuantizedIndex  # noqa: E402
+
+
+def _index(tmp_path):
+    rng = np.random.default_rng(0)
+    return QuantizedIndex.create(str(tmp_path / "corpus"), rng.normal(size=(64, 8)), nlist=2)
+
+
+def test_writer_is_reentrant_around_add(tmp_path):
+    index = _index(tmp_path)
+    with index.writer():
+        index.add(np.ones((2, 8)), [{"chunk": 0}, {"chunk": 1}], sources=["a"])
+    assert index.rows == 2
+    assert index.sources() == {"a"}
+
+
+def test_concurrent_writers_append_each_source_once(tmp_path):
+    _index(tmp_path)
+    path = str(tmp_path / "corpus")
+
+    def append_if_new(source):
+        # A separate instance per writer, as in two `--index-corpus` processes
+        index = QuantizedIndex.open(path)
+        with index.writer():
+            index.reload()
+            if source in index.sources():
+                return
+            time.sleep(0.1)
+            index.add(np.ones((1, 8)), [{"chunk": 0}], sources=[source])
+
+    threads = [threading.Thread(target=append_if_new, args=("report",)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    index = QuantizedIndex.open(path)
+    assert index.rows == 1
+    assert len(index.meta["segments"]) == 1
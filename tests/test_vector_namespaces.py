@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+pytest.importorskip("langchain_community.vectorstores")
+pytest.importorskip("faiss")
+
+from src.tools import doc_tools, pdf_convert  # noqa: E402
+
+
+class LengthEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+def test_concurrent_ingests_of_one_pdf_publish_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(doc_tools, "VECTOR_STORE_DIR", str(tmp_path / "vectors"))
+    monkeypatch.setattr(doc_tools, "_handles", type(doc_tools._handles)())
+    monkeypatch.setattr(doc_tools, "get_embeddings", LengthEmbeddings)
+    conversions = []
+
+    def slow_convert(path):
+        conversions.append(path)
+        time.sleep(0.2)
+        return "# 1 Intro\nFan-out to detectives.\n\n# 2 State\nReducers merge evidence."
+
+    monkeypatch.setattr(pdf_convert, "convert_pdf", slow_convert)
+    pdf = tmp_path / "report.pdf"
+    pdf.write_bytes(b"%PDF-1.4 report")
+
+    results, errors = [], []
+
+    def ingest():
+        try:
+            results.append(doc_tools.ingest_pdf(str(pdf)))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=ingest) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(conversions) == 1
+    handle = doc_tools.open_vector_store(doc_tools.document_namespace(str(pdf)))
+    assert handle.published
+    assert handle.chunks() == results[0]
+    assert all(result == results[0] for result in results)
+    assert len(handle.chunks()) == 2
+
+
+def test_placeholder_chunks_are_not_published_for_a_real_pdf(tmp_path, monkeypatch):
+    monkeypatch.setattr(doc_tools, "VECTOR_STORE_DIR", str(tmp_path / "vectors"))
+    monkeypatch.setattr(doc_tools, "_handles", type(doc_tools._handles)())
+    monkeypatch.setattr(doc_tools, "get_embeddings", LengthEmbeddings)
+
+    def no_docling(path):
+        raise ImportError("docling is not installed")
+
+    monkeypatch.setattr(pdf_convert, "convert_pdf", no_docling)
+    pdf = tmp_path / "report.pdf"
+    pdf.write_bytes(b"%PDF-1.4 report")
+    namespace = doc_tools.document_namespace(str(pdf))
+
+    assert doc_tools.ingest_pdf(str(pdf), namespace=namespace) == doc_tools.SIMULATED_CHUNKS
+    assert not doc_tools.open_vector_store(namespace).published
+    assert doc_tools._published_namespaces() == []
+    # Still answerable for the rest of this audit
+    assert "No documentation found" not in doc_tools.query_vector_store("uv lockfiles", namespace)